@@ -4,14 +4,18 @@
 Requires a running local LLM server.
 """
 
-import sqlite3
 from pathlib import Path
 from typing import Any
 
+import click
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.providers.openai import OpenAIProvider
 
+from agentic_labs.db_agent.approximate import Aggregate
+from agentic_labs.db_agent.guard import QueryGuard
+from agentic_labs.db_agent.tools import DatabaseTools, PlanCacheMode
+
 BASE_URL = "http://localhost:1234/v1"
 API_KEY = "lite-llm"
 MODEL = "openai/gpt-oss-20b"
@@ -21,6 +25,13 @@ You are a helpful assistant that answers questions about a SQLite database.
 
 - Use the `get_schema` tool first to understand the available tables and columns.
 - Use the `query_database` tool to run SELECT queries and retrieve data.
+- Aggregate and filter in SQL rather than fetching many rows. Results are
+  paginated; fetch further pages with `cursor` only when you need them.
+- To find products or customers by words in their names, descriptions or
+  cities, use the `search` tool instead of LIKE, then query the returned ids.
+- For exploratory totals, counts or averages over very large tables, where an
+  estimate is enough, use `approximate_aggregate` and report the answer as an
+  estimate with its confidence interval.
 - Only run read-only SELECT queries. Never modify the database.
 - Present results in a clear, concise, human-readable format.
 """
@@ -29,6 +40,31 @@ You are a helpful assistant that answers questions about a SQLite database.
 here = Path(__file__).parent
 db_path = here / "database.db"
 
+# Describe tables in one line per column (with row counts, indexes, and sample
+# values) instead of raw DDL. Set to False to give the model the DDL.
+COMPACT_SCHEMA = True
+
+# Rows returned per `query_database` call; the model pages through the rest.
+MAX_ROWS = 100
+
+# Stop queries after `time_budget` seconds, and warn about ("warn") or refuse
+# ("reject") plans that read every row of a table larger than `max_scan_rows`
+# without an index.
+GUARD = QueryGuard(max_scan_rows=100_000, time_budget=10.0, on_full_scan="warn")
+
+# When a question is asked again, "run" runs the queries that answered it before
+# and gives the model their results; "hint" gives only the SQL. None turns the
+# (on-disk) plan cache off.
+PLAN_CACHE_MODE: PlanCacheMode | None = "run"
+
+tools = DatabaseTools(
+    db_path,
+    compact_schema=COMPACT_SCHEMA,
+    max_rows=MAX_ROWS,
+    guard=GUARD,
+    plan_cache_mode=PLAN_CACHE_MODE,
+)
+
 # --------------------------------------------------------------------------------------
 # Agent
 # --------------------------------------------------------------------------------------
@@ -38,37 +74,107 @@ model = OpenAIChatModel(MODEL, provider=provider)
 
 agent = Agent(model, system_prompt=SYSTEM_PROMPT)
 
+
+@agent.instructions
+async def cached_plan(ctx: RunContext) -> str | None:
+    """Offer the queries that answered the same question before."""
+    if not isinstance(ctx.prompt, str):
+        return None
+    return await tools.plan_instructions(ctx.run_id, ctx.prompt)
+
+
+@agent.output_validator
+async def record_answer_plan(ctx: RunContext, output: str) -> str:
+    """Cache the queries the answer was based on, once the run has an answer."""
+    if not ctx.partial_output and isinstance(ctx.prompt, str):
+        await tools.record_plan(ctx.run_id, ctx.prompt, ctx.messages)
+    return output
+
+
 # --------------------------------------------------------------------------------------
 # Tools
 # --------------------------------------------------------------------------------------
 
 
 @agent.tool()
-def get_schema(ctx: RunContext) -> str:
-    """Return the DDL schema of all tables in the database."""
-    with sqlite3.connect(db_path) as conn:
-        rows = conn.execute(
-            "SELECT name, sql FROM sqlite_master WHERE type='table' ORDER BY name"
-        ).fetchall()
-    return "\n\n".join(f"-- {name}\n{sql}" for name, sql in rows)
+async def get_schema(ctx: RunContext) -> str:
+    """Return the schema of all tables in the database."""
+    return await tools.schema()
 
 
 @agent.tool()
-def query_database(ctx: RunContext, sql: str) -> list[dict[str, Any]]:
+async def query_database(
+    ctx: RunContext, sql: str, cursor: str | None = None
+) -> dict[str, Any]:
     """Run a read-only SELECT query against the database and return the results.
 
     Args:
         sql: A SQL SELECT query to execute.
+        cursor: The `next_cursor` of a previous result of the same query, to get
+            its next page of rows.
+
+    Returns:
+        The column names, the rows as lists of values in column order, the total
+        number of rows, a `next_cursor` if there are more rows, and a summary.
+        Warnings about slow query plans are listed under `warnings`. A query
+        that is too expensive or runs too long returns an `error` and a
+        `message` saying what to change instead.
+    """
+    return await tools.query(sql, cursor)
+
+
+@agent.tool()
+async def approximate_aggregate(
+    ctx: RunContext,
+    table: str,
+    aggregate: Aggregate,
+    expression: str = "*",
+    where: str | None = None,
+    sample_fraction: float = 0.01,
+) -> dict[str, Any]:
+    """Estimate COUNT, SUM or AVG over a table from a random sample of its rows.
+
+    Much faster than an exact query on large tables. Use it when an estimate is
+    enough; use `query_database` for exact answers.
+
+    Args:
+        table: The table to aggregate, e.g. "purchases".
+        aggregate: "count", "sum" or "avg".
+        expression: A SQL expression over the table's columns, e.g.
+            "qty_purchased". Use "*" with "count" to count rows.
+        where: An optional SQL condition over the table's columns, e.g.
+            "purchase_date >= '2025-01-01'".
+        sample_fraction: Fraction of the table to read; larger is slower but
+            gives a narrower confidence interval.
+
+    Returns:
+        The estimate, its 95% confidence interval (`ci_low`, `ci_high`), and the
+        fraction of the table sampled. `exact` is true if the whole table was
+        read. `warnings` says when the interval should not be trusted.
+    """
+    return await tools.estimate(table, aggregate, expression, where, sample_fraction)
+
+
+@agent.tool()
+async def search(
+    ctx: RunContext, query: str, table: str | None = None, limit: int = 10
+) -> dict[str, Any]:
+    """Find products or customers by text, best matches first.
+
+    Searches product names and descriptions and customer names and cities. Each
+    word matches as a prefix, and rows matching more words rank higher. Use the
+    returned ids in `query_database` to fetch other columns.
+
+    Args:
+        query: Words to search for, e.g. "wireless headphones".
+        table: Search only this table: "products" or "customers".
+        limit: Maximum number of matches per table.
 
     Returns:
-        A list of rows, each represented as a dictionary of column names to values.
+        For each table, the matching rows' ids with a relevance score (higher is
+        better) and a snippet with the matched words in [brackets].
     """
-    if not sql.strip().upper().startswith("SELECT"):
-        raise ValueError("Only SELECT queries are allowed.")
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        rows = conn.execute(sql).fetchall()
-    return [dict(row) for row in rows]
+    return await tools.search(query, table, limit)
 
 
 # --------------------------------------------------------------------------------------
@@ -77,3 +183,4 @@ def query_database(ctx: RunContext, sql: str) -> list[dict[str, Any]]:
 
 if __name__ == "__main__":
     agent.to_cli_sync(prog_name="database-agent")
+    click.echo(tools.stats())
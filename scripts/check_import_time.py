@@ -0,0 +1,156 @@
+"""Import-time benchmark for the `agentic-labs` CLI.
+
+Runs CLI entry points under `python -X importtime` and fails if
+
+- a command imports heavy modules it does not use (for example, `check-setup`
+  importing `llama_cpp`), or
+- importing the CLI takes longer than the budget.
+
+Usage:
+    uv run python scripts/check_import_time.py [--budget-ms 400] [--runs 5]
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+
+# Modules that only the commands that need them may import.
+HEAVY_MODULES = {
+    "llama_cpp": {"local-llm"},
+    "uvicorn": {"local-llm"},
+    "fastapi": {"local-llm"},
+    "agentic_labs.server": {"local-llm"},
+    "huggingface_hub": {"local-llm", "download-models", "check-setup"},
+    "faker": {"create-database"},
+}
+
+# (label, command name or None for the CLI itself, python arguments)
+SCENARIOS = [
+    ("import agentic_labs.cli.main", None, ["-c", "import agentic_labs.cli.main"]),
+    ("agentic-labs --help", None, ["-m", "agentic_labs.cli.main", "--help"]),
+    *(
+        (
+            f"agentic-labs {name} --help",
+            name,
+            ["-m", "agentic_labs.cli.main", name, "--help"],
+        )
+        for name in (
+            "bench",
+            "check-setup",
+            "create-database",
+            "download-models",
+            "local-llm",
+        )
+    ),
+]
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportTimes:
+    """Parsed `-X importtime` output of one run."""
+
+    total_us: int
+    modules: dict[str, int]  # top-level module name -> cumulative microseconds
+    imported: set[str]  # every imported module, including nested imports
+
+
+# --------------------------------------------------------------------------------------
+# Main
+# --------------------------------------------------------------------------------------
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=400.0,
+        help="Maximum time to import the CLI and show its help (default: 400).",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Runs per scenario; the fastest is reported (default: 5).",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=5,
+        help="Number of slowest top-level imports to show (default: 5).",
+    )
+    args = parser.parse_args()
+
+    failures = []
+    for label, command, python_args in SCENARIOS:
+        times = min(
+            (_measure(python_args) for _ in range(args.runs)),
+            key=lambda t: t.total_us,
+        )
+        print(f"{label}: {times.total_us / 1000:.1f} ms")
+        slowest = sorted(times.modules.items(), key=lambda item: -item[1])
+        for name, us in slowest[: args.top]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+
+        for module, allowed in HEAVY_MODULES.items():
+            if command not in allowed and _imported(module, times):
+                failures.append(f"{label} imports {module}")
+        if command is None and times.total_us / 1000 > args.budget_ms:
+            failures.append(
+                f"{label} took {times.total_us / 1000:.1f} ms "
+                f"(budget {args.budget_ms:g} ms)"
+            )
+
+    if failures:
+        print("\nImport-time check failed:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+
+    print("\nImport-time check passed.")
+    return 0
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _measure(python_args: list[str]) -> ImportTimes:
+    """Run Python with `-X importtime` and parse the top-level import times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *python_args],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"Failed to run {' '.join(python_args)}:\n{result.stderr}")
+
+    modules: dict[str, int] = {}
+    imported: set[str] = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        imported.add(match.group(4))
+        # Top-level imports have a single space of indentation before the name.
+        if len(match.group(3)) == 1:
+            modules[match.group(4)] = int(match.group(2))
+    return ImportTimes(
+        total_us=sum(modules.values()), modules=modules, imported=imported
+    )
+
+
+def _imported(module: str, times: ImportTimes) -> bool:
+    """Return True if `module` or one of its submodules was imported."""
+    return any(
+        name == module or name.startswith(f"{module}.") for name in times.imported
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
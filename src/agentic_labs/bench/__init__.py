@@ -0,0 +1 @@
+"""Load generation and latency reporting for OpenAI-compatible endpoints."""
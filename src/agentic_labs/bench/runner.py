@@ -0,0 +1,241 @@
+"""Load generator and latency report for OpenAI-compatible chat endpoints.
+
+Requests are sent either closed-loop (a fixed number of concurrent clients, each
+sending its next request as soon as the previous one finishes) or open-loop
+(Poisson arrivals at a fixed rate, capped at the concurrency). Streamed
+responses are timed chunk by chunk to measure time to first token (TTFT) and
+inter-token latency (ITL). In open-loop runs, latencies are measured from each
+request's scheduled arrival, so time spent waiting for a free client counts.
+"""
+
+import asyncio
+import json
+import math
+import random
+import statistics
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import httpx
+
+from agentic_labs.bench.workloads import ChatRequest
+
+# --------------------------------------------------------------------------------------
+# Results
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class RequestResult:
+    """Timings of one benchmark request."""
+
+    ok: bool
+    error: str | None = None
+    ttft_seconds: float | None = None
+    inter_token_seconds: list[float] = field(default_factory=list)
+    e2e_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+@dataclass
+class BenchmarkConfig:
+    """Settings of a benchmark run, included in its report."""
+
+    base_url: str
+    model: str
+    workload: str
+    num_requests: int
+    concurrency: int
+    rate: float | None
+    stream: bool
+
+
+# --------------------------------------------------------------------------------------
+# Running
+# --------------------------------------------------------------------------------------
+
+
+async def run_benchmark(
+    config: BenchmarkConfig,
+    requests: list[ChatRequest],
+    api_key: str,
+    timeout: float = 300.0,
+    seed: int = 42,
+) -> tuple[list[RequestResult], float]:
+    """Send every request and return their results and the wall-clock duration."""
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=config.concurrency)
+    headers = {"Authorization": f"Bearer {api_key}"}
+    semaphore = asyncio.Semaphore(config.concurrency)
+
+    async with httpx.AsyncClient(
+        base_url=config.base_url.rstrip("/"),
+        headers=headers,
+        limits=limits,
+        timeout=timeout,
+    ) as client:
+
+        async def send(body: ChatRequest) -> RequestResult:
+            arrived = time.perf_counter()
+            async with semaphore:
+                if not config.rate:
+                    arrived = time.perf_counter()
+                return await _send(client, config, body, arrived)
+
+        start = time.perf_counter()
+        tasks = []
+        for body in requests:
+            tasks.append(asyncio.create_task(send(body)))
+            if config.rate:
+                await asyncio.sleep(rng.expovariate(config.rate))
+        results = await asyncio.gather(*tasks)
+        return list(results), time.perf_counter() - start
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    config: BenchmarkConfig,
+    body: ChatRequest,
+    start: float,
+) -> RequestResult:
+    """Send one chat completion request and time it from `start`."""
+    payload = {"model": config.model, **body, "stream": config.stream}
+    if config.stream:
+        payload.setdefault("stream_options", {"include_usage": True})
+
+    try:
+        if config.stream:
+            result = await _send_streamed(client, payload, start)
+        else:
+            response = await client.post("/chat/completions", json=payload)
+            response.raise_for_status()
+            usage = response.json().get("usage") or {}
+            result = RequestResult(
+                ok=True,
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0),
+            )
+    except (httpx.HTTPError, ValueError) as e:
+        result = RequestResult(ok=False, error=_describe_error(e))
+
+    result.e2e_seconds = time.perf_counter() - start
+    return result
+
+
+async def _send_streamed(
+    client: httpx.AsyncClient, payload: dict[str, Any], start: float
+) -> RequestResult:
+    """Send a streamed request, timing every chunk that carries output."""
+    result = RequestResult(ok=True)
+    last_token_at = None
+
+    async with client.stream("POST", "/chat/completions", json=payload) as response:
+        if response.is_error:
+            await response.aread()
+        response.raise_for_status()
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line.removeprefix("data:").strip()
+            if data == "[DONE]":
+                break
+
+            chunk = json.loads(data)
+            if usage := chunk.get("usage"):
+                result.prompt_tokens = usage.get("prompt_tokens", 0)
+                result.completion_tokens = usage.get("completion_tokens", 0)
+            if not _has_output(chunk):
+                continue
+
+            now = time.perf_counter()
+            if last_token_at is None:
+                result.ttft_seconds = now - start
+            else:
+                result.inter_token_seconds.append(now - last_token_at)
+            last_token_at = now
+
+    if not result.completion_tokens and last_token_at is not None:
+        # No usage reported: count one token per output chunk.
+        result.completion_tokens = len(result.inter_token_seconds) + 1
+    return result
+
+
+def _has_output(chunk: dict[str, Any]) -> bool:
+    """Whether a chat completion chunk carries generated content or a tool call."""
+    for choice in chunk.get("choices") or []:
+        delta = choice.get("delta") or {}
+        if delta.get("content") or delta.get("tool_calls"):
+            return True
+    return False
+
+
+def _describe_error(error: Exception) -> str:
+    """Return a short, groupable description of a failed request."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"HTTP {error.response.status_code}"
+    return type(error).__name__
+
+
+# --------------------------------------------------------------------------------------
+# Reporting
+# --------------------------------------------------------------------------------------
+
+
+def summarize(
+    config: BenchmarkConfig, results: list[RequestResult], wall_seconds: float
+) -> dict[str, Any]:
+    """Aggregate request results into a JSON-serializable report."""
+    succeeded = [r for r in results if r.ok]
+    errors = Counter(r.error or "error" for r in results if not r.ok)
+
+    completion_tokens = sum(r.completion_tokens for r in succeeded)
+    return {
+        "config": asdict(config),
+        "requests": len(results),
+        "succeeded": len(succeeded),
+        "error_rate": (len(results) - len(succeeded)) / len(results)
+        if results
+        else 0.0,
+        "errors": dict(errors),
+        "wall_seconds": wall_seconds,
+        "throughput": {
+            "requests_per_second": len(succeeded) / wall_seconds
+            if wall_seconds
+            else 0.0,
+            "output_tokens_per_second": (
+                completion_tokens / wall_seconds if wall_seconds else 0.0
+            ),
+            "prompt_tokens": sum(r.prompt_tokens for r in succeeded),
+            "completion_tokens": completion_tokens,
+        },
+        "ttft_seconds": _distribution(
+            [r.ttft_seconds for r in succeeded if r.ttft_seconds is not None]
+        ),
+        "inter_token_seconds": _distribution(
+            [gap for r in succeeded for gap in r.inter_token_seconds]
+        ),
+        "e2e_seconds": _distribution([r.e2e_seconds for r in succeeded]),
+    }
+
+
+def _distribution(values: list[float]) -> dict[str, float | None]:
+    """Return the mean and p50/p95/p99 of `values` (nearest-rank percentiles)."""
+    if not values:
+        return {"mean": None, "p50": None, "p95": None, "p99": None}
+
+    ordered = sorted(values)
+
+    def percentile(p: float) -> float:
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        return ordered[rank - 1]
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+    }
@@ -0,0 +1,195 @@
+"""A stand-in OpenAI-compatible server for running benchmarks without a model.
+
+`StandInServer` answers `/v1/chat/completions` with synthetic output after a fixed
+time to first token, then streams tokens at a fixed rate. Requests that offer
+tools and end with a user message get a tool call, like an agent's first turn;
+all other requests get a text answer. It exercises the benchmark client, the
+network path, and the report without loading a model.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+_WORDS = "the quick brown fox jumps over the lazy dog while agents call tools".split()
+
+
+class StandInServer:
+    """Serve synthetic chat completions on a background thread.
+
+    Args:
+        host: Address to bind to.
+        port: Port to bind to; 0 picks a free port.
+        ttft_seconds: Delay before the first token.
+        tokens_per_second: Rate at which tokens are produced after the first.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ttft_seconds: float = 0.05,
+        tokens_per_second: float = 50.0,
+    ) -> None:
+        handler = type(
+            "StandInHandler",
+            (_StandInHandler,),
+            {"ttft_seconds": ttft_seconds, "token_seconds": 1 / tokens_per_second},
+        )
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """The server's OpenAI-compatible base URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# --------------------------------------------------------------------------------------
+# Request Handler
+# --------------------------------------------------------------------------------------
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Handle chat completion requests with synthetic output."""
+
+    protocol_version = "HTTP/1.1"
+    ttft_seconds: float
+    token_seconds: float
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        except (TypeError, ValueError):
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+
+        messages = body.get("messages") or []
+        wants_tool = (
+            bool(body.get("tools"))
+            and messages[-1:] != []
+            and (messages[-1].get("role") == "user")
+        )
+        num_tokens = min(body.get("max_tokens") or 64, 64)
+        tokens = [_WORDS[i % len(_WORDS)] for i in range(num_tokens)]
+        prompt_tokens = sum(len(str(m.get("content") or "").split()) for m in messages)
+
+        time.sleep(self.ttft_seconds)
+        if body.get("stream"):
+            self._stream(body, tokens, prompt_tokens, wants_tool)
+        else:
+            time.sleep(self.token_seconds * (len(tokens) - 1))
+            message: dict[str, Any] = {"role": "assistant", "content": None}
+            if wants_tool:
+                message["tool_calls"] = [_tool_call(body)]
+            else:
+                message["content"] = " ".join(tokens)
+            self._send_json(
+                200,
+                {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stand-in"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": message,
+                            "finish_reason": "tool_calls" if wants_tool else "stop",
+                        }
+                    ],
+                    "usage": _usage(prompt_tokens, len(tokens)),
+                },
+            )
+
+    def _stream(
+        self, body: dict, tokens: list[str], prompt_tokens: int, wants_tool: bool
+    ) -> None:
+        """Stream tokens as server-sent events."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def send_chunk(delta: dict, finish_reason: str | None = None, **extra) -> None:
+            chunk = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stand-in"),
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+                **extra,
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+
+        if wants_tool:
+            send_chunk({"role": "assistant", "tool_calls": [_tool_call(body, index=0)]})
+        else:
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(self.token_seconds)
+                send_chunk({"content": f" {token}" if i else token})
+        send_chunk(
+            {},
+            "tool_calls" if wants_tool else "stop",
+            usage=_usage(prompt_tokens, 1 if wants_tool else len(tokens)),
+        )
+        self._write_chunk("data: [DONE]\n\n")
+        self._write_chunk("")
+
+    def _write_chunk(self, data: str) -> None:
+        """Write one HTTP chunk (an empty string ends the response)."""
+        encoded = data.encode()
+        self.wfile.write(f"{len(encoded):x}\r\n".encode() + encoded + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Silence per-request logging."""
+
+
+def _tool_call(body: dict, index: int | None = None) -> dict:
+    """Return a call to the first tool offered in the request."""
+    tool = body["tools"][0]["function"]
+    call = {
+        "id": f"call_{uuid.uuid4().hex[:8]}",
+        "type": "function",
+        "function": {"name": tool["name"], "arguments": "{}"},
+    }
+    return call if index is None else {"index": index, **call}
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
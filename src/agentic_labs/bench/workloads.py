@@ -0,0 +1,296 @@
+"""Benchmark workloads: synthetic chat and agent tool-calling turns, or recordings.
+
+Synthetic workloads mirror the traffic of the labs:
+
+- `chat`: single-turn questions, like `labs/llm/chat.py`.
+- `weather`: turns of the weather agent (`labs/agent/weather.py`), with its system
+  prompt and tool definitions. Some turns ask the model to pick a tool, others
+  carry a tool result for the model to answer from.
+- `database`: the same for the database agent (`labs/agent/database.py`).
+- `mixed`: all of the above.
+
+Recorded workloads are JSONL files with one chat completion request body (at
+least `messages`) per line.
+"""
+
+import json
+import random
+from pathlib import Path
+from typing import Any
+
+WORKLOADS = ("chat", "weather", "database", "mixed")
+
+ChatRequest = dict[str, Any]
+
+
+# --------------------------------------------------------------------------------------
+# Loading
+# --------------------------------------------------------------------------------------
+
+
+def load_workload(
+    workload: str, num_requests: int, max_tokens: int, seed: int = 42
+) -> list[ChatRequest]:
+    """Build `num_requests` request bodies from a named workload or a JSONL file.
+
+    Recorded requests are cycled if the file has fewer than `num_requests` lines.
+    `max_tokens` is applied to requests that do not set it.
+
+    Raises:
+        ValueError: The workload is unknown or a recorded request is malformed.
+    """
+    rng = random.Random(seed)
+    if workload in WORKLOADS:
+        generators = (
+            [_chat_turn, _weather_turn, _database_turn]
+            if workload == "mixed"
+            else [_GENERATORS[workload]]
+        )
+        requests = [rng.choice(generators)(rng) for _ in range(num_requests)]
+    else:
+        recorded = _read_recording(Path(workload))
+        requests = [dict(recorded[i % len(recorded)]) for i in range(num_requests)]
+
+    for request in requests:
+        request.setdefault("max_tokens", max_tokens)
+    return requests
+
+
+def _read_recording(path: Path) -> list[ChatRequest]:
+    """Read request bodies from a JSONL recording."""
+    if not path.is_file():
+        raise ValueError(
+            f"Unknown workload '{path}'. Use one of {', '.join(WORKLOADS)} "
+            "or the path of a JSONL recording."
+        )
+
+    requests = []
+    for line_number, line in enumerate(path.read_text().splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}:{line_number}: invalid JSON ({e})") from e
+        if not isinstance(request, dict) or "messages" not in request:
+            raise ValueError(f"{path}:{line_number}: expected an object with messages")
+        requests.append(request)
+
+    if not requests:
+        raise ValueError(f"{path} contains no requests.")
+    return requests
+
+
+# --------------------------------------------------------------------------------------
+# Synthetic Chat
+# --------------------------------------------------------------------------------------
+
+CHAT_QUESTIONS = [
+    "Explain the difference between a process and a thread.",
+    "What is a large language model, in two sentences?",
+    "Write a haiku about debugging.",
+    "Summarize the benefits of unit testing.",
+    "How does a hash table handle collisions?",
+    "Give three tips for writing clear commit messages.",
+    "What does the temperature parameter do when sampling from an LLM?",
+    "Describe the CAP theorem briefly.",
+]
+
+
+def _chat_turn(rng: random.Random) -> ChatRequest:
+    return {
+        "messages": [
+            {"role": "system", "content": "You are a helpful assistant."},
+            {"role": "user", "content": rng.choice(CHAT_QUESTIONS)},
+        ]
+    }
+
+
+# --------------------------------------------------------------------------------------
+# Weather Agent
+# --------------------------------------------------------------------------------------
+
+WEATHER_SYSTEM_PROMPT = """
+You are a helpful assistant that provides weather forecasts based on user queries.
+
+- Use the provided tools to identify the specific location and date range for the user's
+  weather forecast request.
+- If the user does not specify a location, ask for clarification.
+- If the user does not specify a date range, provide the forecast for the current day.
+"""
+
+WEATHER_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_locations",
+            "description": "Search for locations by name and return their coordinates.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "description": "Location name."},
+                    "count": {"type": "integer", "default": 5},
+                },
+                "required": ["name"],
+            },
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_weather_forecast",
+            "description": "Get the weather forecast for the provided coordinates.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "latitude": {"type": "number"},
+                    "longitude": {"type": "number"},
+                    "timezone": {"type": "string", "default": "auto"},
+                    "start_date": {"type": "string", "format": "date"},
+                    "end_date": {"type": "string", "format": "date"},
+                },
+                "required": ["latitude", "longitude"],
+            },
+        },
+    },
+]
+
+CITIES = [
+    ("Denver", 39.74, -104.99),
+    ("Seattle", 47.61, -122.33),
+    ("Austin", 30.27, -97.74),
+    ("Boston", 42.36, -71.06),
+    ("Chicago", 41.88, -87.63),
+]
+
+
+def _weather_turn(rng: random.Random) -> ChatRequest:
+    city, latitude, longitude = rng.choice(CITIES)
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": WEATHER_SYSTEM_PROMPT},
+        {"role": "user", "content": f"What's the weather in {city} this weekend?"},
+    ]
+    if rng.random() < 0.5:
+        # Answer from a forecast the agent already fetched.
+        arguments = {"latitude": latitude, "longitude": longitude}
+        forecast = {
+            "daily": {
+                "time": ["2025-06-07", "2025-06-08"],
+                "temperature_2m_max": [rng.randint(60, 95) for _ in range(2)],
+                "temperature_2m_min": [rng.randint(40, 65) for _ in range(2)],
+                "precipitation_probability_max": [
+                    rng.randint(0, 100) for _ in range(2)
+                ],
+            }
+        }
+        messages += _tool_exchange("get_weather_forecast", arguments, forecast)
+    return {"messages": messages, "tools": WEATHER_TOOLS}
+
+
+# --------------------------------------------------------------------------------------
+# Database Agent
+# --------------------------------------------------------------------------------------
+
+DATABASE_SYSTEM_PROMPT = """
+You are a helpful assistant that answers questions about a SQLite database.
+
+- Use the `get_schema` tool first to understand the available tables and columns.
+- Use the `query_database` tool to run SELECT queries and retrieve data.
+- Only run read-only SELECT queries. Never modify the database.
+- Present results in a clear, concise, human-readable format.
+"""
+
+DATABASE_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "get_schema",
+            "description": "Return the DDL schema of all tables in the database.",
+            "parameters": {"type": "object", "properties": {}},
+        },
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "query_database",
+            "description": "Run a read-only SELECT query against the database and "
+            "return the results.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "sql": {"type": "string", "description": "A SQL SELECT query."}
+                },
+                "required": ["sql"],
+            },
+        },
+    },
+]
+
+DATABASE_SCHEMA = """-- customers
+CREATE TABLE customers (id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT NOT NULL,
+  last_name TEXT NOT NULL, birth_date TEXT NOT NULL, street_address TEXT NOT NULL,
+  city TEXT NOT NULL, state TEXT NOT NULL, zip_code TEXT NOT NULL,
+  email TEXT NOT NULL UNIQUE, phone_number TEXT NOT NULL)
+
+-- products
+CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, sku TEXT NOT NULL UNIQUE,
+  name TEXT NOT NULL, description TEXT NOT NULL, cost REAL NOT NULL,
+  in_stock_qty INTEGER NOT NULL)
+
+-- purchases
+CREATE TABLE purchases (id INTEGER PRIMARY KEY AUTOINCREMENT,
+  customer_id INTEGER NOT NULL REFERENCES customers(id),
+  product_id INTEGER NOT NULL REFERENCES products(id),
+  qty_purchased INTEGER NOT NULL, purchase_date TEXT NOT NULL)"""
+
+DATABASE_QUESTIONS = [
+    "Who are our top five customers by total spend?",
+    "Which product sold the most units last month?",
+    "How many customers live in Texas?",
+    "What is the average order value?",
+]
+
+
+def _database_turn(rng: random.Random) -> ChatRequest:
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": DATABASE_SYSTEM_PROMPT},
+        {"role": "user", "content": rng.choice(DATABASE_QUESTIONS)},
+    ]
+    if rng.random() < 0.5:
+        # The agent has read the schema and should now write a query.
+        messages += _tool_exchange("get_schema", {}, DATABASE_SCHEMA)
+    return {"messages": messages, "tools": DATABASE_TOOLS}
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+_GENERATORS = {
+    "chat": _chat_turn,
+    "weather": _weather_turn,
+    "database": _database_turn,
+}
+
+
+def _tool_exchange(name: str, arguments: dict, result: Any) -> list[dict[str, Any]]:
+    """Return an assistant tool call and its tool result message."""
+    call_id = f"call_{name}"
+    return [
+        {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": call_id,
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                }
+            ],
+        },
+        {
+            "role": "tool",
+            "tool_call_id": call_id,
+            "content": result if isinstance(result, str) else json.dumps(result),
+        },
+    ]
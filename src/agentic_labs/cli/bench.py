@@ -0,0 +1,270 @@
+"""Bench command — load-tests an OpenAI-compatible endpoint and reports its latency."""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Annotated, Any, Optional
+
+import click
+import typer
+from tabulate import tabulate
+
+from agentic_labs.bench.runner import BenchmarkConfig, run_benchmark, summarize
+from agentic_labs.bench.stand_in import StandInServer
+from agentic_labs.bench.workloads import WORKLOADS, load_workload
+
+DEFAULT_BASE_URL = "http://localhost:8080/v1"
+DEFAULT_API_KEY = "local"
+DEFAULT_MODEL = "local"
+DEFAULT_WORKLOAD = "mixed"
+DEFAULT_REQUESTS = 50
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_TOKENS = 128
+DEFAULT_TIMEOUT = 300.0
+DEFAULT_STAND_IN_TTFT = 0.05
+DEFAULT_STAND_IN_TOKENS_PER_SECOND = 50.0
+
+# --------------------------------------------------------------------------------------
+# CLI Command
+# --------------------------------------------------------------------------------------
+
+
+def bench(
+    base_url: Annotated[
+        str,
+        typer.Option(
+            "--base-url",
+            help="Base URL of the OpenAI-compatible API to benchmark.",
+        ),
+    ] = DEFAULT_BASE_URL,
+    api_key: Annotated[
+        str,
+        typer.Option(
+            "--api-key",
+            help="API key sent as a bearer token.",
+        ),
+    ] = DEFAULT_API_KEY,
+    model: Annotated[
+        str,
+        typer.Option(
+            "--model",
+            "-m",
+            help="Model name sent with each request.",
+        ),
+    ] = DEFAULT_MODEL,
+    workload: Annotated[
+        str,
+        typer.Option(
+            "--workload",
+            "-w",
+            help=f"Workload to send: one of {', '.join(WORKLOADS)}, or the path of a "
+            "JSONL file with one recorded request body per line.",
+        ),
+    ] = DEFAULT_WORKLOAD,
+    num_requests: Annotated[
+        int,
+        typer.Option(
+            "--requests",
+            "-n",
+            help="Number of requests to send.",
+        ),
+    ] = DEFAULT_REQUESTS,
+    concurrency: Annotated[
+        int,
+        typer.Option(
+            "--concurrency",
+            "-c",
+            help="Maximum number of requests in flight.",
+        ),
+    ] = DEFAULT_CONCURRENCY,
+    rate: Annotated[
+        Optional[float],
+        typer.Option(
+            "--rate",
+            "-r",
+            help="Open-loop arrival rate (requests/s, Poisson). Default: closed "
+            "loop, sending each client's next request when its last one finishes.",
+        ),
+    ] = None,
+    max_tokens: Annotated[
+        int,
+        typer.Option(
+            "--max-tokens",
+            help="max_tokens for requests that do not set it.",
+        ),
+    ] = DEFAULT_MAX_TOKENS,
+    stream: Annotated[
+        bool,
+        typer.Option(
+            "--stream/--no-stream",
+            help="Stream responses. Time to first token and inter-token latency "
+            "are only measured for streamed responses.",
+        ),
+    ] = True,
+    output: Annotated[
+        Optional[Path],
+        typer.Option(
+            "--output",
+            "-o",
+            help="Write the full report as JSON to this file.",
+        ),
+    ] = None,
+    seed: Annotated[
+        int,
+        typer.Option(
+            "--seed",
+            help="Seed for synthetic workloads and arrival times.",
+        ),
+    ] = 42,
+    timeout: Annotated[
+        float,
+        typer.Option(
+            "--timeout",
+            help="Per-request timeout in seconds.",
+        ),
+    ] = DEFAULT_TIMEOUT,
+    stand_in: Annotated[
+        bool,
+        typer.Option(
+            "--stand-in",
+            help="Benchmark a built-in stand-in server with synthetic latency "
+            "instead of --base-url (no model needed).",
+        ),
+    ] = False,
+    stand_in_ttft: Annotated[
+        float,
+        typer.Option(
+            "--stand-in-ttft",
+            help="Time to first token (seconds) of the stand-in server.",
+        ),
+    ] = DEFAULT_STAND_IN_TTFT,
+    stand_in_tokens_per_second: Annotated[
+        float,
+        typer.Option(
+            "--stand-in-tokens-per-second",
+            help="Decode speed of the stand-in server.",
+        ),
+    ] = DEFAULT_STAND_IN_TOKENS_PER_SECOND,
+) -> None:
+    """Load-test an OpenAI-compatible chat completions endpoint.
+
+    Sends chat and agent tool-calling requests (or a recorded workload) to the
+    endpoint and reports time to first token, inter-token latency, end-to-end
+    latency (mean, p50, p95, p99), throughput, and error rate.
+
+    By default requests are sent closed-loop by --concurrency clients. With
+    --rate, requests arrive open-loop at that average rate, and latencies include
+    time spent waiting for one of the --concurrency connections.
+
+    Run 'agentic-labs local-llm' first, or use --stand-in to try the benchmark
+    without a model.
+    """
+    if num_requests < 1 or concurrency < 1 or max_tokens < 1:
+        click.echo(
+            "❌ --requests, --concurrency, and --max-tokens must be at least 1.",
+            err=True,
+        )
+        raise typer.Exit(1)
+    if (rate is not None and rate <= 0) or timeout <= 0:
+        click.echo("❌ --rate and --timeout must be greater than zero.", err=True)
+        raise typer.Exit(1)
+    if stand_in and (stand_in_ttft < 0 or stand_in_tokens_per_second <= 0):
+        click.echo(
+            "❌ --stand-in-ttft cannot be negative and --stand-in-tokens-per-second "
+            "must be greater than zero.",
+            err=True,
+        )
+        raise typer.Exit(1)
+
+    try:
+        requests = load_workload(workload, num_requests, max_tokens, seed)
+    except ValueError as e:
+        click.echo(f"❌ {e}", err=True)
+        raise typer.Exit(1) from e
+
+    if stand_in:
+        server = StandInServer(
+            ttft_seconds=stand_in_ttft, tokens_per_second=stand_in_tokens_per_second
+        )
+        base_url = server.base_url
+    config = BenchmarkConfig(
+        base_url=base_url,
+        model=model,
+        workload=workload,
+        num_requests=num_requests,
+        concurrency=concurrency,
+        rate=rate,
+        stream=stream,
+    )
+
+    click.echo("⏱️  Running benchmark...")
+    click.echo(f"   Endpoint:    {base_url}" + (" (stand-in)" if stand_in else ""))
+    click.echo(f"   Workload:    {workload} ({num_requests} requests)")
+    click.echo(
+        "   Load:        "
+        + (
+            f"open loop, {rate:g} req/s, up to {concurrency} in flight"
+            if rate
+            else f"closed loop, {concurrency} concurrent"
+        )
+    )
+
+    benchmark = run_benchmark(config, requests, api_key, timeout, seed)
+    if stand_in:
+        with server:
+            results, wall_seconds = asyncio.run(benchmark)
+    else:
+        results, wall_seconds = asyncio.run(benchmark)
+    report = summarize(config, results, wall_seconds)
+
+    click.echo()
+    _print_report(report)
+
+    if output is not None:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
+        click.echo(f"\n💾 Report written to {output}")
+
+    if report["succeeded"] == 0:
+        click.echo("\n❌ All requests failed.", err=True)
+        raise typer.Exit(1)
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    """Print a benchmark report as a latency table and a throughput summary."""
+    rows = []
+    for label, key in [
+        ("Time to first token", "ttft_seconds"),
+        ("Inter-token latency", "inter_token_seconds"),
+        ("End-to-end latency", "e2e_seconds"),
+    ]:
+        distribution = report[key]
+        rows.append([label, *(_ms(distribution[stat]) for stat in distribution)])
+    click.echo(
+        tabulate(
+            rows,
+            headers=["Latency (ms)", "Mean", "p50", "p95", "p99"],
+            tablefmt="pretty",
+            colalign=("left", "right", "right", "right", "right"),
+        )
+    )
+
+    throughput = report["throughput"]
+    click.echo(
+        f"\n📊 {report['succeeded']}/{report['requests']} requests succeeded in "
+        f"{report['wall_seconds']:.1f}s"
+    )
+    click.echo(f"   Requests/s:      {throughput['requests_per_second']:.2f}")
+    click.echo(f"   Output tokens/s: {throughput['output_tokens_per_second']:.1f}")
+    click.echo(f"   Error rate:      {report['error_rate']:.1%}")
+    for error, count in report["errors"].items():
+        click.echo(f"   ⚠️  {error}: {count}")
+
+
+def _ms(seconds: float | None) -> str:
+    return "—" if seconds is None else f"{seconds * 1000:.1f}"
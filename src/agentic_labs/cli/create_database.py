@@ -1,14 +1,56 @@
 """Create database command — generates a sample SQLite database with fake data for the database agent lab."""
 
+import datetime
 import logging
-import random
+import os
 import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Optional
 
 import click
 import typer
-from faker import Faker
+from tabulate import tabulate
+
+from agentic_labs.sample_db import generate
+from agentic_labs.sample_db.append import (
+    AppendError,
+    last_purchase_date,
+    next_ids,
+    plan_append,
+    update_stock,
+)
+from agentic_labs.sample_db.export import (
+    EXPORT_FORMATS,
+    MissingDependencyError,
+    export_table,
+)
+from agentic_labs.sample_db.load import (
+    BULK_LOAD_CACHE_KIB,
+    DEFAULT_BATCH_SIZE,
+    SCHEMA,
+    bulk_load_pragmas,
+    insert_rows,
+)
+from agentic_labs.sample_db.optimize import (
+    analyze,
+    create_indexes,
+    create_rollups,
+    refresh_rollups,
+)
+from agentic_labs.sample_db.search import (
+    create_search_indexes,
+    refresh_search_indexes,
+)
+from agentic_labs.sample_db.shards import (
+    Shard,
+    merge_shard,
+    plan_shards,
+    write_shard,
+)
+from agentic_labs.sample_db.timing import AGENT_QUERIES, time_queries
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +58,7 @@ DEFAULT_DB_PATH = Path("labs/pydantic-ai/database.db")
 NUM_CUSTOMERS = 50
 NUM_PRODUCTS = 20
 NUM_PURCHASES = 200
+PURCHASE_HISTORY_DAYS = 730
 
 
 def create_database(
@@ -24,9 +67,115 @@ def create_database(
         typer.Option(
             "--path",
             "-p",
-            help="Path where the SQLite database file will be created.",
+            help="Path where the SQLite database file will be created. With "
+            "--format, files are written to this path without its extension.",
         ),
     ] = DEFAULT_DB_PATH,
+    num_customers: Annotated[
+        int,
+        typer.Option(
+            "--customers",
+            help="Number of customers to generate.",
+        ),
+    ] = NUM_CUSTOMERS,
+    num_products: Annotated[
+        int,
+        typer.Option(
+            "--products",
+            help="Number of products to generate.",
+        ),
+    ] = NUM_PRODUCTS,
+    num_purchases: Annotated[
+        int,
+        typer.Option(
+            "--purchases",
+            help="Number of purchases to generate.",
+        ),
+    ] = NUM_PURCHASES,
+    batch_size: Annotated[
+        int,
+        typer.Option(
+            "--batch-size",
+            help="Rows inserted per transaction.",
+        ),
+    ] = DEFAULT_BATCH_SIZE,
+    workers: Annotated[
+        int,
+        typer.Option(
+            "--workers",
+            "-w",
+            help="Worker processes generating shards of the database in parallel.",
+        ),
+    ] = 1,
+    indexes: Annotated[
+        bool,
+        typer.Option(
+            "--indexes/--no-indexes",
+            help="Index purchases by customer, product, and date, and run ANALYZE.",
+        ),
+    ] = True,
+    rollups: Annotated[
+        bool,
+        typer.Option(
+            "--rollups",
+            help="Also build rollup tables: daily sales per product "
+            "(daily_product_sales) and lifetime value per customer "
+            "(customer_lifetime_value).",
+        ),
+    ] = False,
+    search: Annotated[
+        bool,
+        typer.Option(
+            "--search",
+            help="Also build FTS5 full-text search tables over product names and "
+            "descriptions (products_search) and customer names and cities "
+            "(customers_search).",
+        ),
+    ] = False,
+    timing_report: Annotated[
+        bool,
+        typer.Option(
+            "--timing-report",
+            help="Time representative agent queries before and after building "
+            "indexes and rollups, and print a comparison.",
+        ),
+    ] = False,
+    append: Annotated[
+        bool,
+        typer.Option(
+            "--append",
+            help="Add --customers new customers and --purchases new purchases "
+            "(dated --since to --until) to an existing database instead of "
+            "replacing it.",
+        ),
+    ] = False,
+    since: Annotated[
+        Optional[datetime.datetime],
+        typer.Option(
+            "--since",
+            formats=["%Y-%m-%d"],
+            help="First purchase date. Default: two years before --until, or with "
+            "--append, the day after the latest purchase.",
+        ),
+    ] = None,
+    until: Annotated[
+        Optional[datetime.datetime],
+        typer.Option(
+            "--until",
+            formats=["%Y-%m-%d"],
+            help="Last purchase date, and the date customer ages are computed at. "
+            "Default: today.",
+        ),
+    ] = None,
+    output_format: Annotated[
+        str,
+        typer.Option(
+            "--format",
+            "-f",
+            help="Output format: sqlite, or parquet, arrow, or csv to write one file "
+            "per table to the directory named by --path without its extension.",
+        ),
+    ] = "sqlite",
 ) -> None:
     """Create a sample SQLite database with fake customers, products, and purchases data.
 
@@ -35,116 +184,372 @@ def create_database(
     - products: product catalog with SKUs, descriptions, and pricing.
     - purchases: purchase history linking customers to products.
 
+    Rows are generated as a stream and inserted in batches, so databases with
+    tens of millions of purchases can be built in constant memory. With --workers
+    N, N processes each write a shard of the database (a disjoint range of ids)
+    to a temporary file, and the shards are merged into the output file.
+
+    Purchases are indexed by customer, product, and date, and planner statistics
+    are gathered with ANALYZE. With --rollups, summary tables of daily sales per
+    product and lifetime value per customer are added for the agent to query.
+    With --search, FTS5 tables index product and customer text for ranked
+    full-text search.
+
+    With --append, new customers and a window of purchases are added to an
+    existing database, continuing its ids. Units sold are taken out of product
+    stock, rollup tables are updated with the new purchases, and search tables
+    with the new customers. The append is a single transaction.
+
+    With --format parquet, arrow, or csv, the tables are written straight from
+    the generator to customers, products, and purchases files instead of a
+    database, one Parquet row group or Arrow record batch per --batch-size rows.
+    For a given --until date, the files are byte-for-byte reproducible. Parquet
+    and Arrow need the export extra (uv sync --extra export).
+
     Args:
         path: Filesystem path for the output SQLite database file. Parent directories
             are created automatically if they do not already exist. Any existing file
-            at the given path is removed before the new database is written.
+            at the given path is removed before the new database is written. For file
+            exports, the path without its extension is the output directory.
+        num_customers: Number of customer rows.
+        num_products: Number of product rows.
+        num_purchases: Number of purchase rows.
+        batch_size: Number of rows inserted per transaction.
+        workers: Number of worker processes. The generated data depends on the
+            number of workers as well as the seed.
+        indexes: Whether to create secondary indexes and run ANALYZE.
+        rollups: Whether to create the rollup tables.
+        search: Whether to create the full-text search tables.
+        timing_report: Whether to time agent queries without and with the indexes
+            and rollups.
+        append: Whether to add rows to the existing database at `path`.
+        since: First purchase date.
+        until: Last purchase date.
+        output_format: "sqlite" or one of the file export formats.
     """
+    if num_customers < 1 or num_products < 1 or num_purchases < 0:
+        click.echo(
+            "Error: --customers and --products must be at least 1, and --purchases "
+            "cannot be negative.",
+            err=True,
+        )
+        raise typer.Exit(1)
+    if batch_size < 1 or workers < 1:
+        click.echo("Error: --batch-size and --workers must be at least 1.", err=True)
+        raise typer.Exit(1)
+
+    until_date = until.date() if until else datetime.date.today()
+    since_date = since.date() if since else None
+    if since_date and since_date > until_date:
+        click.echo("Error: --since must not be after --until.", err=True)
+        raise typer.Exit(1)
+    if output_format != "sqlite":
+        if output_format not in EXPORT_FORMATS:
+            click.echo(
+                f"Error: Unknown --format '{output_format}'. Use sqlite, "
+                f"{', '.join(EXPORT_FORMATS)}.",
+                err=True,
+            )
+            raise typer.Exit(1)
+        if append or workers != 1 or rollups or search or timing_report:
+            click.echo(
+                "Error: --append, --workers, --rollups, --search, and "
+                "--timing-report only apply to --format sqlite.",
+                err=True,
+            )
+            raise typer.Exit(1)
+
+    if append:
+        if workers != 1 or timing_report:
+            click.echo(
+                "Error: --workers and --timing-report cannot be used with --append.",
+                err=True,
+            )
+            raise typer.Exit(1)
+        _append_to_database(
+            path, num_customers, num_purchases, since_date, until_date, batch_size
+        )
+        return
+
+    start = time.perf_counter()
+    seed = generate.DEFAULT_SEED
+    today = until_date
+    vocab = generate.Vocabulary.build(seed)
+    shards = plan_shards(
+        num_customers,
+        num_products,
+        num_purchases,
+        workers,
+        seed=seed,
+        today=today,
+        purchases_from=since_date
+        or today - datetime.timedelta(days=PURCHASE_HISTORY_DAYS),
+    )
+
+    if output_format != "sqlite":
+        _export_files(path.with_suffix(""), output_format, shards[0], vocab, batch_size)
+        return
+
     path.parent.mkdir(parents=True, exist_ok=True)
 
     if path.exists():
         path.unlink()
         click.echo(f"Removed existing database at {path}")
 
-    fake = Faker()
-    Faker.seed(42)
-    random.seed(42)
-
     conn = sqlite3.connect(path)
+    failed = False
     try:
-        conn.executescript("""
-            CREATE TABLE customers (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                first_name      TEXT NOT NULL,
-                last_name       TEXT NOT NULL,
-                birth_date      TEXT NOT NULL,
-                street_address  TEXT NOT NULL,
-                city            TEXT NOT NULL,
-                state           TEXT NOT NULL,
-                zip_code        TEXT NOT NULL,
-                email           TEXT NOT NULL UNIQUE,
-                phone_number    TEXT NOT NULL
-            );
-
-            CREATE TABLE products (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                sku             TEXT NOT NULL UNIQUE,
-                name            TEXT NOT NULL,
-                description     TEXT NOT NULL,
-                cost            REAL NOT NULL,
-                in_stock_qty    INTEGER NOT NULL
-            );
-
-            CREATE TABLE purchases (
-                id              INTEGER PRIMARY KEY AUTOINCREMENT,
-                customer_id     INTEGER NOT NULL REFERENCES customers(id),
-                product_id      INTEGER NOT NULL REFERENCES products(id),
-                qty_purchased   INTEGER NOT NULL,
-                purchase_date   TEXT NOT NULL
-            );
-        """)
-
-        customers = [
-            (
-                fake.first_name(),
-                fake.last_name(),
-                fake.date_of_birth(minimum_age=18, maximum_age=85).isoformat(),
-                fake.street_address(),
-                fake.city(),
-                fake.state_abbr(),
-                fake.zipcode(),
-                fake.unique.email(),
-                fake.phone_number(),
-            )
-            for _ in range(NUM_CUSTOMERS)
-        ]
-        conn.executemany(
-            """INSERT INTO customers
-               (first_name, last_name, birth_date, street_address, city, state, zip_code, email, phone_number)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            customers,
-        )
+        bulk_load_pragmas(conn)
+        conn.executescript(SCHEMA)
 
-        products = [
-            (
-                fake.bothify(text="SKU-####-???").upper(),
-                fake.catch_phrase(),
-                fake.sentence(nb_words=12),
-                round(random.uniform(4.99, 299.99), 2),
-                random.randint(0, 500),
-            )
-            for _ in range(NUM_PRODUCTS)
-        ]
-        conn.executemany(
-            "INSERT INTO products (sku, name, description, cost, in_stock_qty) VALUES (?, ?, ?, ?, ?)",
-            products,
-        )
+        if workers == 1:
+            _write_tables(conn, shards[0], vocab, batch_size)
+        else:
+            _write_sharded(conn, path, shards, vocab, batch_size)
 
-        purchases = [
-            (
-                random.randint(1, NUM_CUSTOMERS),
-                random.randint(1, NUM_PRODUCTS),
-                random.randint(1, 5),
-                fake.date_between(start_date="-2y", end_date="today").isoformat(),
+        if timing_report:
+            click.echo("Timing agent queries on the unindexed database...")
+            baseline = time_queries(conn, today)
+        if indexes:
+            click.echo("Creating indexes...")
+            create_indexes(conn)
+        if rollups:
+            click.echo("Building rollup tables...")
+            create_rollups(conn)
+        if search:
+            click.echo("Building search tables...")
+            create_search_indexes(conn)
+        if indexes or rollups:
+            analyze(conn)
+        if timing_report:
+            _print_timing_report(
+                baseline,
+                time_queries(conn, today) if indexes else None,
+                time_queries(conn, today, rollups=True) if rollups else None,
             )
-            for _ in range(NUM_PURCHASES)
-        ]
-        conn.executemany(
-            "INSERT INTO purchases (customer_id, product_id, qty_purchased, purchase_date) VALUES (?, ?, ?, ?)",
-            purchases,
-        )
 
-        conn.commit()
         logger.info("Created database at %s", path)
 
     except Exception as e:
         logger.error("Failed to create database: %s", e)
         click.echo(f"Error: Failed to create database: {e}", err=True)
+        failed = True
         raise typer.Exit(1) from e
     finally:
         conn.close()
+        # The database is written without a journal, so a partial file is unusable.
+        if failed:
+            path.unlink(missing_ok=True)
+
+    click.echo(f"Created database at {path} in {time.perf_counter() - start:.1f}s")
+    click.echo(f"  {num_customers} customers")
+    click.echo(f"  {num_products} products")
+    click.echo(f"  {num_purchases} purchases")
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _append_to_database(
+    path: Path,
+    num_customers: int,
+    num_purchases: int,
+    since: datetime.date | None,
+    until: datetime.date,
+    batch_size: int,
+) -> None:
+    """Add customers and a window of purchases to an existing database."""
+    if not path.is_file():
+        click.echo(f"Error: No database to append to at {path}", err=True)
+        raise typer.Exit(1)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute(f"PRAGMA cache_size = -{BULK_LOAD_CACHE_KIB}")
+        next_id = next_ids(conn)
+        if since is None:
+            last = last_purchase_date(conn)
+            if last and last >= until:
+                raise AppendError(
+                    f"The database already has purchases through {last}; "
+                    "pass a later --until or an explicit --since."
+                )
+            since = last + datetime.timedelta(days=1) if last else until
+
+        seed = generate.DEFAULT_SEED
+        shard = plan_append(next_id, num_customers, num_purchases, seed, since, until)
+        vocab = generate.Vocabulary.build(seed)
+
+        # One transaction: the existing database is left untouched if anything fails.
+        with conn:
+            for table, ids, rows in shard.tables(vocab):
+                with click.progressbar(
+                    length=ids.count, label=f"{table:<10}", show_pos=True
+                ) as progress:
+                    insert_rows(
+                        conn,
+                        table,
+                        rows,
+                        batch_size,
+                        on_batch=progress.update,
+                        start_id=ids.start,
+                        commit=False,
+                    )
+            update_stock(conn, next_id["purchases"])
+            refreshed = refresh_rollups(conn, next_id["purchases"])
+            refreshed += refresh_search_indexes(conn, next_id)
+        conn.execute("PRAGMA optimize")
+
+    except AppendError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
+    except Exception as e:
+        logger.error("Failed to append to database: %s", e)
+        click.echo(f"Error: Failed to append to database: {e}", err=True)
+        raise typer.Exit(1) from e
+    finally:
+        conn.close()
+
+    logger.info("Appended to database at %s", path)
+    click.echo(f"Appended to database at {path} in {time.perf_counter() - start:.1f}s")
+    click.echo(f"  {num_customers} customers (from id {next_id['customers']})")
+    click.echo(f"  {num_purchases} purchases ({since} to {until})")
+    if refreshed:
+        click.echo(f"  Refreshed {', '.join(refreshed)}")
+
+
+def _export_files(
+    directory: Path,
+    output_format: str,
+    shard: Shard,
+    vocab: generate.Vocabulary,
+    batch_size: int,
+) -> None:
+    """Write every table to a file in `directory`, showing progress per table."""
+    start = time.perf_counter()
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    try:
+        for table, ids, rows in shard.tables(vocab):
+            with click.progressbar(
+                length=ids.count, label=f"{table:<10}", show_pos=True, show_eta=True
+            ) as progress:
+                paths.append(
+                    export_table(
+                        directory,
+                        table,
+                        rows,
+                        ids.start,
+                        output_format,
+                        batch_size,
+                        on_batch=progress.update,
+                    )
+                )
+    except MissingDependencyError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise typer.Exit(1) from e
+    except Exception as e:
+        logger.error("Failed to export tables: %s", e)
+        click.echo(f"Error: Failed to export tables: {e}", err=True)
+        raise typer.Exit(1) from e
+
+    logger.info("Exported tables to %s", directory)
+    click.echo(f"Exported tables to {directory} in {time.perf_counter() - start:.1f}s")
+    for path in paths:
+        click.echo(f"  {path.name} ({path.stat().st_size / 1e6:.1f} MB)")
 
-    click.echo(f"Created database at {path}")
-    click.echo(f"  {NUM_CUSTOMERS} customers")
-    click.echo(f"  {NUM_PRODUCTS} products")
-    click.echo(f"  {NUM_PURCHASES} purchases")
+
+def _write_tables(
+    conn: sqlite3.Connection,
+    shard: Shard,
+    vocab: generate.Vocabulary,
+    batch_size: int,
+) -> None:
+    """Generate every table into the database, showing progress per table."""
+    for table, ids, rows in shard.tables(vocab):
+        with click.progressbar(
+            length=ids.count, label=f"{table:<10}", show_pos=True, show_eta=True
+        ) as progress:
+            insert_rows(
+                conn,
+                table,
+                rows,
+                batch_size,
+                on_batch=progress.update,
+                start_id=ids.start,
+            )
+
+
+def _write_sharded(
+    conn: sqlite3.Connection,
+    path: Path,
+    shards: list[Shard],
+    vocab: generate.Vocabulary,
+    batch_size: int,
+) -> None:
+    """Generate shards in worker processes and merge them into the database."""
+    with tempfile.TemporaryDirectory(
+        prefix=f".{path.name}-shards-", dir=path.parent
+    ) as shard_dir:
+        shard_paths = [Path(shard_dir) / f"shard-{s.index}.db" for s in shards]
+
+        max_workers = min(len(shards), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(write_shard, shard_path, shard, vocab, batch_size)
+                for shard_path, shard in zip(shard_paths, shards, strict=True)
+            ]
+            with click.progressbar(
+                as_completed(futures), length=len(futures), label="generating"
+            ) as completed:
+                for future in completed:
+                    future.result()
+
+        # Merge in shard order so that ids are appended in ascending order.
+        with click.progressbar(shard_paths, label="merging   ") as progress:
+            for shard_path in progress:
+                merge_shard(conn, shard_path)
+                shard_path.unlink()
+
+
+def _print_timing_report(
+    baseline: list[float | None],
+    indexed: list[float | None] | None,
+    rollup: list[float | None] | None,
+) -> None:
+    """Print agent query times without and with indexes and rollups."""
+
+    def ms(seconds: float | None) -> str:
+        return "—" if seconds is None else f"{seconds * 1000:.2f}"
+
+    def speedup(before: float | None, *after: float | None) -> str:
+        times = [t for t in after if t is not None]
+        return f"{before / min(times):.0f}x" if before and times else "—"
+
+    columns = [("No indexes (ms)", baseline)]
+    if indexed is not None:
+        columns.append(("Indexed (ms)", indexed))
+    if rollup is not None:
+        columns.append(("Rollup (ms)", rollup))
+
+    rows = [
+        [
+            query.name,
+            *(ms(times[i]) for _, times in columns),
+            speedup(*(times[i] for _, times in columns)),
+        ]
+        for i, query in enumerate(AGENT_QUERIES)
+    ]
+    click.echo()
+    click.echo(
+        tabulate(
+            rows,
+            headers=["Agent query", *(name for name, _ in columns), "Speedup"],
+            tablefmt="pretty",
+            colalign=("left", *("right" for _ in columns), "right"),
+        )
+    )
+    click.echo()
@@ -1,20 +1,42 @@
 """Local LLM command — starts an OpenAI-compatible server backed by llama-cpp-python."""
 
-from typing import Annotated
+import os
+from functools import partial
+from pathlib import Path
+from typing import Annotated, Optional
 
 import click
 import typer
 import uvicorn
 from huggingface_hub import hf_hub_download
-from llama_cpp.server.app import create_app
 from llama_cpp.server.settings import ModelSettings, ServerSettings
 
 from agentic_labs import LAB_MODELS
+from agentic_labs.server.app import create_app
+from agentic_labs.server.autotune import (
+    DEFAULT_PROFILE_PATH,
+    RuntimeProfile,
+    autotune,
+    load_profile,
+    save_profile,
+)
+from agentic_labs.server.completion_cache import (
+    DEFAULT_CACHE_DIR as DEFAULT_COMPLETION_CACHE_DIR,
+)
+from agentic_labs.server.completion_cache import CompletionCache
+from agentic_labs.server.prefix_cache import DEFAULT_CACHE_DIR, TieredPrefixCache
 
 DEFAULT_MODEL = "bartowski/Llama-3.2-3B-Instruct-GGUF"
 DEFAULT_HOST = "127.0.0.1"
 DEFAULT_PORT = 8080
 DEFAULT_CONTEXT_WINDOW = 8192
+DEFAULT_PREFIX_CACHE_RAM = 2.0
+DEFAULT_PREFIX_CACHE_DISK = 8.0
+DEFAULT_SLOTS = 1
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_MAX_QUEUE_WAIT = 30.0
+DEFAULT_DRAFT_TOKENS = 4
+DEFAULT_COMPLETION_CACHE_SIZE = 1.0
 
 
 # --------------------------------------------------------------------------------------
@@ -24,13 +46,14 @@ DEFAULT_CONTEXT_WINDOW = 8192
 
 def local_llm_cmd(
     model: Annotated[
-        str,
+        Optional[list[str]],
         typer.Option(
             "--model",
             "-m",
-            help="GGUF model to serve. Must be a key in LAB_MODELS with a .gguf allow_pattern.",
+            help="GGUF model to serve. Must be a key in LAB_MODELS with a .gguf "
+            "allow_pattern. Repeat to serve several models; the first is the default.",
         ),
-    ] = DEFAULT_MODEL,
+    ] = None,
     host: Annotated[
         str,
         typer.Option(
@@ -54,6 +77,124 @@ def local_llm_cmd(
             help="Context window size (number of tokens).",
         ),
     ] = DEFAULT_CONTEXT_WINDOW,
+    memory_budget: Annotated[
+        Optional[float],
+        typer.Option(
+            "--memory-budget",
+            help="RAM/VRAM budget (GiB) for resident models. Least-recently-used "
+            "models are unloaded to stay within it. Default: no limit.",
+        ),
+    ] = None,
+    prefix_cache: Annotated[
+        bool,
+        typer.Option(
+            "--prefix-cache/--no-prefix-cache",
+            help="Reuse the KV state of previously seen prompt prefixes "
+            "(for example, agent system prompts).",
+        ),
+    ] = True,
+    prefix_cache_dir: Annotated[
+        Path,
+        typer.Option(
+            "--prefix-cache-dir",
+            help="Directory for the persistent (on-disk) prefix cache tier.",
+        ),
+    ] = DEFAULT_CACHE_DIR,
+    prefix_cache_ram: Annotated[
+        float,
+        typer.Option(
+            "--prefix-cache-ram",
+            help="Size cap (GiB) of the in-memory prefix cache tier, per model.",
+        ),
+    ] = DEFAULT_PREFIX_CACHE_RAM,
+    prefix_cache_disk: Annotated[
+        float,
+        typer.Option(
+            "--prefix-cache-disk",
+            help="Size cap (GiB) of the on-disk prefix cache tier, per model. "
+            "Set to 0 to keep the cache in memory only.",
+        ),
+    ] = DEFAULT_PREFIX_CACHE_DISK,
+    slots: Annotated[
+        int,
+        typer.Option(
+            "--slots",
+            "-s",
+            help="Number of requests that decode in parallel. Each slot holds its "
+            "own KV cache; model weights are shared.",
+        ),
+    ] = DEFAULT_SLOTS,
+    max_queue: Annotated[
+        int,
+        typer.Option(
+            "--max-queue",
+            help="Maximum number of requests waiting for a free slot.",
+        ),
+    ] = DEFAULT_MAX_QUEUE,
+    max_queue_wait: Annotated[
+        float,
+        typer.Option(
+            "--max-queue-wait",
+            help="Seconds a request may wait for a slot before the server "
+            "answers 429 Too Many Requests.",
+        ),
+    ] = DEFAULT_MAX_QUEUE_WAIT,
+    draft_model: Annotated[
+        Optional[str],
+        typer.Option(
+            "--draft-model",
+            help="Smaller GGUF model (a key in LAB_MODELS) that drafts tokens for "
+            "speculative decoding. Must share the served models' vocabulary. "
+            "Verifying drafts keeps the logits of every position (context x "
+            "vocabulary x 4 bytes, about 4 GiB at 8k context and a 128k "
+            "vocabulary) per slot replica, and prefix-cache states save a copy.",
+        ),
+    ] = None,
+    draft_tokens: Annotated[
+        int,
+        typer.Option(
+            "--draft-tokens",
+            help="Number of tokens the draft model proposes per decode step.",
+        ),
+    ] = DEFAULT_DRAFT_TOKENS,
+    autotune_profile: Annotated[
+        bool,
+        typer.Option(
+            "--autotune",
+            help="Benchmark thread counts, batch sizes, mmap/mlock, and flash "
+            "attention for each model on this machine and save the fastest profile "
+            "before starting. Saved profiles are used automatically on later runs.",
+        ),
+    ] = False,
+    profile_file: Annotated[
+        Path,
+        typer.Option(
+            "--profile-file",
+            help="File that stores the tuned runtime profiles.",
+        ),
+    ] = DEFAULT_PROFILE_PATH,
+    completion_cache: Annotated[
+        bool,
+        typer.Option(
+            "--completion-cache/--no-completion-cache",
+            help="Replay stored responses to repeated deterministic requests "
+            "(temperature 0 or a fixed seed) instead of generating them again.",
+        ),
+    ] = False,
+    completion_cache_dir: Annotated[
+        Path,
+        typer.Option(
+            "--completion-cache-dir",
+            help="Directory for the completion cache.",
+        ),
+    ] = DEFAULT_COMPLETION_CACHE_DIR,
+    completion_cache_size: Annotated[
+        float,
+        typer.Option(
+            "--completion-cache-size",
+            help="Size cap (GiB) of the completion cache.",
+        ),
+    ] = DEFAULT_COMPLETION_CACHE_SIZE,
 ) -> None:
     """Start a local OpenAI-compatible LLM server.
 
@@ -61,25 +202,178 @@ def local_llm_cmd(
     API. The model must already be downloaded — run 'agentic-labs download-models'
     first.
 
+    Several models can be served from one process. Each model loads on its first
+    request and stays resident until the memory budget forces the
+    least-recently-used model out. Per-model load times and hit/miss counts are
+    available at /extras/models/stats.
+
+    Prompt prefixes that are reused (such as agent system prompts) are cached in
+    memory and on disk, so a restarted server can skip their prefill. Hit rates and
+    prefill tokens saved are available at /extras/prefix-cache/stats.
+
+    With --slots N, up to N requests decode at once. Waiting requests are served
+    round-robin across clients (identified by the OpenAI `user` field, an
+    X-Client-Id header, or their address). Requests sent with
+    "X-Priority: interactive" (the default) are admitted before those sent with
+    "X-Priority: batch". Requests whose client disconnects are dropped from the
+    queue or stopped mid-generation. Slot usage and queue depth are available at
+    /extras/scheduler/stats.
+
+    With --draft-model, a smaller model drafts tokens that the served model
+    verifies in one batch (speculative decoding). Output is unchanged; accepted
+    drafts save decode steps. Acceptance rates are logged per request and
+    available at /extras/speculative/stats. Verification needs the logits of every
+    position, which costs context x vocabulary x 4 bytes per slot replica (about
+    4 GiB at 8k context and a 128k vocabulary) and is copied into every saved
+    prefix-cache state; size --memory-budget and --prefix-cache-ram accordingly.
+
+    With --autotune, runtime settings are benchmarked for each model and context
+    window first (this takes a few minutes per model). Each profile is warmed up,
+    then timed over three runs and ranked by the median. The fastest profile is saved
+    per host, model, and context window, and later runs load it automatically.
+
+    With --completion-cache, responses to deterministic requests (temperature 0 or
+    a fixed seed) are stored on disk and replayed when the same model receives the
+    same request again. Responses carry an X-Completion-Cache: hit/miss header;
+    statistics are available at /extras/completion-cache/stats.
+
+    Prometheus metrics (time to first token, inter-token latency, token counts,
+    queue depth, KV cache occupancy, and model load times) are served at /metrics.
+
     The server runs in the foreground and can be stopped with Ctrl+C.
     """
-    model_path = _resolve_model_path(model)
+    models = model or [DEFAULT_MODEL]
+    if memory_budget is not None and memory_budget <= 0:
+        click.echo("❌ --memory-budget must be greater than zero.", err=True)
+        raise typer.Exit(1)
+    if prefix_cache_ram < 0 or prefix_cache_disk < 0:
+        click.echo("❌ Prefix cache sizes cannot be negative.", err=True)
+        raise typer.Exit(1)
+    if slots < 1 or max_queue < 0 or max_queue_wait <= 0:
+        click.echo(
+            "❌ --slots must be at least 1, --max-queue cannot be negative, and "
+            "--max-queue-wait must be greater than zero.",
+            err=True,
+        )
+        raise typer.Exit(1)
+    if completion_cache_size <= 0:
+        click.echo("❌ --completion-cache-size must be greater than zero.", err=True)
+        raise typer.Exit(1)
+    if draft_tokens < 1:
+        click.echo("❌ --draft-tokens must be at least 1.", err=True)
+        raise typer.Exit(1)
+
+    model_settings = [
+        ModelSettings(
+            model=str(_resolve_model_path(name)),
+            model_alias=name,
+            n_gpu_layers=-1,
+            n_ctx=context_window,
+            chat_format="llama-3",
+        )
+        for name in dict.fromkeys(models)
+    ]
+
+    draft_settings = None
+    if draft_model is not None:
+        draft_settings = ModelSettings(
+            model=str(_resolve_model_path(draft_model)),
+            model_alias=draft_model,
+            n_gpu_layers=-1,
+            n_ctx=context_window,
+        )
+
+    profiles = {}
+    for settings in (*model_settings, draft_settings):
+        if settings is None:
+            continue
+        if autotune_profile:
+            profiles[settings.model_alias] = _autotune_model(settings, profile_file)
+        else:
+            profiles[settings.model_alias] = load_profile(
+                settings.model, context_window, profile_file
+            )
+
+    model_settings = [
+        _apply_profile(s, profiles[s.model_alias], slots) for s in model_settings
+    ]
+    if draft_settings is not None:
+        draft_settings = _apply_profile(
+            draft_settings, profiles[draft_settings.model_alias], slots
+        )
+    n_threads = model_settings[0].n_threads
 
     click.echo("🚀 Starting local LLM server...")
-    click.echo(f"   Model:          {model}")
+    click.echo(f"   Models:         {', '.join(s.model_alias for s in model_settings)}")
+    click.echo(f"   Default model:  {model_settings[0].model_alias}")
     click.echo(f"   Context window: {context_window}")
+    click.echo(
+        "   Memory budget:  "
+        + (f"{memory_budget:g} GiB" if memory_budget is not None else "unlimited")
+    )
+    click.echo(
+        "   Prefix cache:   "
+        + (
+            f"{prefix_cache_ram:g} GiB RAM, {prefix_cache_disk:g} GiB disk"
+            f" ({prefix_cache_dir})"
+            if prefix_cache
+            else "disabled"
+        )
+    )
+    click.echo(
+        f"   Decode slots:   {slots} ({n_threads} thread(s) each, "
+        f"queue {max_queue}, wait {max_queue_wait:g}s)"
+    )
+    click.echo(
+        "   Draft model:    "
+        + (f"{draft_model} ({draft_tokens} tokens)" if draft_model else "disabled")
+    )
+    click.echo(
+        "   Response cache: "
+        + (
+            f"{completion_cache_size:g} GiB ({completion_cache_dir})"
+            if completion_cache
+            else "disabled"
+        )
+    )
+    tuned = [alias for alias, profile in profiles.items() if profile is not None]
+    click.echo(
+        "   Runtime:        "
+        + (f"tuned profile for {', '.join(tuned)}" if tuned else "default settings")
+        + f" ({profile_file})"
+    )
     click.echo(f"   Endpoint:       http://{host}:{port}/v1")
     click.echo("   API key:        local")
     click.echo()
 
-    model_settings = ModelSettings(
-        model=str(model_path),
-        n_gpu_layers=-1,
-        n_ctx=context_window,
-        chat_format="llama-3",
-    )
+    cache_factory = None
+    if prefix_cache:
+        cache_factory = partial(
+            _create_prefix_cache,
+            cache_dir=prefix_cache_dir,
+            ram_capacity_bytes=int(prefix_cache_ram * 2**30),
+            disk_capacity_bytes=int(prefix_cache_disk * 2**30),
+        )
+
     server_settings = ServerSettings(host=host, port=port, api_key="local")
-    app = create_app(server_settings=server_settings, model_settings=[model_settings])
+    app = create_app(
+        server_settings=server_settings,
+        model_settings=model_settings,
+        memory_budget_bytes=(
+            int(memory_budget * 2**30) if memory_budget is not None else None
+        ),
+        cache_factory=cache_factory,
+        slots=slots,
+        max_queue=max_queue,
+        max_queue_wait_seconds=max_queue_wait,
+        draft_settings=draft_settings,
+        num_draft_tokens=draft_tokens,
+        completion_cache=(
+            CompletionCache(completion_cache_dir, int(completion_cache_size * 2**30))
+            if completion_cache
+            else None
+        ),
+    )
 
     config = uvicorn.Config(app, host=host, port=port, log_level="info")
     uvicorn.Server(config).run()
@@ -90,6 +384,80 @@ def local_llm_cmd(
 # --------------------------------------------------------------------------------------
 
 
+def _autotune_model(settings: ModelSettings, profile_file: Path) -> RuntimeProfile:
+    """Benchmark runtime settings for a model, save the best, and report progress."""
+    click.echo(
+        f"🔧 Autotuning {settings.model_alias} (context window {settings.n_ctx})..."
+    )
+
+    def report(profile: RuntimeProfile) -> None:
+        click.echo(
+            f"   threads {profile.n_threads}/{profile.n_threads_batch}, "
+            f"batch {profile.n_batch}/{profile.n_ubatch}, "
+            f"mmap {'on' if profile.use_mmap else 'off'}, "
+            f"mlock {'on' if profile.use_mlock else 'off'}, "
+            f"flash-attn {'on' if profile.flash_attn else 'off'}: "
+            f"prefill {profile.prefill_tokens_per_second:.1f} tok/s, "
+            f"decode {profile.decode_tokens_per_second:.1f} tok/s"
+        )
+
+    best = autotune(settings, on_trial=report)
+    if not best.decode_tokens_per_second:
+        click.echo(
+            f"❌ Could not run {settings.model_alias} with any profile.", err=True
+        )
+        raise typer.Exit(1)
+
+    save_profile(best, settings.model, settings.n_ctx, profile_file)
+    click.echo(
+        f"✅ Best profile: prefill {best.prefill_tokens_per_second:.1f} tok/s, "
+        f"decode {best.decode_tokens_per_second:.1f} tok/s (saved to {profile_file})"
+    )
+    click.echo()
+    return best
+
+
+def _apply_profile(
+    settings: ModelSettings, profile: RuntimeProfile | None, slots: int
+) -> ModelSettings:
+    """Apply a tuned profile, or share the CPU between slots by default."""
+    if profile is not None:
+        return profile.apply(settings, slots)
+
+    # Share the CPU between slots instead of oversubscribing it.
+    cpu_count = os.cpu_count() or 1
+    return settings.model_copy(
+        update={
+            "n_threads": max(1, cpu_count // 2 // slots),
+            "n_threads_batch": max(1, cpu_count // slots),
+        }
+    )
+
+
+def _create_prefix_cache(
+    settings: ModelSettings,
+    cache_dir: Path,
+    ram_capacity_bytes: int,
+    disk_capacity_bytes: int,
+) -> TieredPrefixCache:
+    """Create the prompt-prefix cache for a model.
+
+    Saved states only fit a model loaded with the same context, batch, logits,
+    and attention settings, so these are part of the key along with the GGUF file
+    name.
+    """
+    model_key = (
+        f"{Path(settings.model).name}-ctx{settings.n_ctx}-batch{settings.n_batch}"
+        f"-logits{int(settings.logits_all)}-fa{int(settings.flash_attn)}"
+    )
+    return TieredPrefixCache(
+        model_key=model_key,
+        ram_capacity_bytes=ram_capacity_bytes,
+        cache_dir=cache_dir if disk_capacity_bytes > 0 else None,
+        disk_capacity_bytes=disk_capacity_bytes,
+    )
+
+
 def _resolve_model_path(model: str) -> str:
     """Resolve a model key to a local file path using the HuggingFace cache.
 
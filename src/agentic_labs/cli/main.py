@@ -1,22 +1,116 @@
-"""Main CLI application for Agentic Labs."""
+"""Main CLI application for Agentic Labs.
 
+Commands are registered lazily: a command's module (and its heavy dependencies,
+such as `llama_cpp`, `uvicorn`, or `faker`) is only imported when that command is
+run or its own help is shown. `agentic-labs --help` lists commands from the
+registry below without importing any of them.
+"""
+
+import importlib
+from dataclasses import dataclass
+
+import click
 import typer
+from typer.core import TyperGroup
+from typer.main import get_command_from_info
+from typer.models import CommandInfo
+
+# --------------------------------------------------------------------------------------
+# Command Registry
+# --------------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    """A command that is imported on first use.
+
+    Attributes:
+        import_path: Location of the command function, as "module:function".
+        help: Short help shown in the command list of `agentic-labs --help`. It
+            repeats the first paragraph of the command function's docstring, so
+            that listing commands imports nothing; a test keeps the two in sync.
+    """
+
+    import_path: str
+    help: str
+
+
+COMMANDS: dict[str, LazyCommand] = {
+    "bench": LazyCommand(
+        "agentic_labs.cli.bench:bench",
+        "Load-test an OpenAI-compatible chat completions endpoint.",
+    ),
+    "check-setup": LazyCommand(
+        "agentic_labs.cli.check_setup:check_setup",
+        "Check that the environment is properly set up for the labs.",
+    ),
+    "create-database": LazyCommand(
+        "agentic_labs.cli.create_database:create_database",
+        "Create a sample SQLite database with fake customers, products, and "
+        "purchases data.",
+    ),
+    "download-models": LazyCommand(
+        "agentic_labs.cli.download_models:download_models",
+        "Download models from HuggingFace Hub for use in the labs.",
+    ),
+    "local-llm": LazyCommand(
+        "agentic_labs.cli.local_llm:local_llm_cmd",
+        "Start a local OpenAI-compatible LLM server.",
+    ),
+}
+
 
-from .check_setup import check_setup
-from .create_database import create_database
-from .download_models import download_models
-from .local_llm import local_llm_cmd
+class LazyCommandGroup(TyperGroup):
+    """A Typer group that imports registered commands only when they are used."""
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._describe_only = False
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return [*super().list_commands(ctx), *COMMANDS]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name in self.commands or cmd_name not in COMMANDS:
+            return super().get_command(ctx, cmd_name)
+
+        lazy = COMMANDS[cmd_name]
+        if self._describe_only:
+            return click.Command(cmd_name, help=lazy.help)
+
+        module_name, function_name = lazy.import_path.split(":")
+        callback = getattr(importlib.import_module(module_name), function_name)
+        command = get_command_from_info(
+            CommandInfo(name=cmd_name, callback=callback),
+            pretty_exceptions_short=True,
+            rich_markup_mode=self.rich_markup_mode,
+        )
+        self.add_command(command, cmd_name)
+        return command
+
+    def format_help(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        # Describe commands from the registry instead of importing them.
+        self._describe_only = True
+        try:
+            super().format_help(ctx, formatter)
+        finally:
+            self._describe_only = False
+
+
+# --------------------------------------------------------------------------------------
+# CLI Application
+# --------------------------------------------------------------------------------------
 
 cli = typer.Typer(
     name="agentic-labs",
     help="CLI tools for Agentic Labs",
+    cls=LazyCommandGroup,
 )
 
-# Register commands
-cli.command(name="check-setup")(check_setup)
-cli.command(name="create-database")(create_database)
-cli.command(name="download-models")(download_models)
-cli.command(name="local-llm")(local_llm_cmd)
+
+@cli.callback()
+def main() -> None:
+    """CLI tools for Agentic Labs"""
 
 
 if __name__ == "__main__":
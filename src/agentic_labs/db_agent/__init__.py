@@ -0,0 +1 @@
+"""SQLite tooling behind the database agent lab (`labs/agent/database.py`)."""
@@ -0,0 +1,228 @@
+"""Approximate COUNT, SUM and AVG over large tables by sampling rowid ranges.
+
+An exact aggregate over a hundred-million-row table reads every row, which
+takes seconds. For an exploratory question, an estimate with a known error is
+answer enough. `estimate_aggregate` splits the table's rowid span into blocks of
+`BLOCK_ROWS` consecutive rowids and reads a uniform random sample of them. Each
+sampled block is a rowid range seek, so the cost grows with the sample rather
+than the table.
+
+The last block of the span is usually partial, so it is always read and added
+as is; only the full blocks before it are sampled. Totals (COUNT, SUM) are
+estimated by scaling the mean sampled block total up to all full blocks. AVG is
+estimated as the ratio of the SUM and COUNT estimates. Both come with a
+normal-approximation confidence interval over the sampled blocks, including the
+finite population correction. Gaps in the rowids (deleted rows) only make some
+blocks smaller, so the estimates stay unbiased.
+
+When every sampled block agrees, the sample shows no variance, and the normal
+interval would have zero width even though unsampled blocks (a run of deleted
+rows, say) may differ. A COUNT interval is then widened by the rule of three:
+at the given confidence, at most `1 - (1 - confidence) ** (1 / n)` of the blocks
+differ, and a block holds between 0 and `BLOCK_ROWS` rows. SUM and AVG have no
+such bound, so their result carries a warning instead.
+"""
+
+import math
+import random
+import sqlite3
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any, Literal
+
+Aggregate = Literal["count", "sum", "avg"]
+
+BLOCK_ROWS = 1_000
+DEFAULT_SAMPLE_FRACTION = 0.01
+DEFAULT_CONFIDENCE = 0.95
+
+# Fewer blocks than this make the normal approximation unreliable.
+MIN_BLOCKS = 30
+
+
+class ApproximationError(ValueError):
+    """The aggregate cannot be estimated by sampling this table."""
+
+
+def estimate_aggregate(
+    conn: sqlite3.Connection,
+    table: str,
+    aggregate: Aggregate,
+    expression: str = "*",
+    where: str | None = None,
+    sample_fraction: float = DEFAULT_SAMPLE_FRACTION,
+    confidence: float = DEFAULT_CONFIDENCE,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """Estimate COUNT, SUM or AVG of an expression over a sample of a table.
+
+    Args:
+        conn: Connection to the database.
+        table: A rowid table to aggregate.
+        aggregate: "count", "sum" or "avg".
+        expression: SQL expression over the table's columns. COUNT counts rows
+            where it is not NULL ("*" counts every row).
+        where: SQL condition over the table's columns that rows must match.
+        sample_fraction: Fraction of the table's rowid blocks to read. The
+            table is read in full when this covers every block.
+        confidence: Confidence level of the interval.
+        seed: Seed for choosing blocks, so repeated calls agree.
+
+    Returns:
+        A dict with the `estimate`, the confidence interval (`ci_low`, `ci_high`,
+        `confidence`), the `sample_fraction` actually read, the number of rows
+        that matched in the sample, and `exact` if the whole table was read.
+        `warnings` lists reasons not to trust the interval, if any.
+
+    Raises:
+        ApproximationError: The table does not exist, has no rowid, or the
+            arguments are invalid.
+    """
+    if aggregate not in ("count", "sum", "avg"):
+        raise ApproximationError(f"Unknown aggregate {aggregate!r}.")
+    if expression.strip() == "*" and aggregate != "count":
+        raise ApproximationError(f"{aggregate.upper()} needs a column expression.")
+    if not 0 < sample_fraction <= 1:
+        raise ApproximationError("sample_fraction must be in (0, 1].")
+    if not _is_table(conn, table):
+        raise ApproximationError(f"No such table: {table}.")
+
+    start = time.perf_counter()
+    try:
+        # Separate queries: SQLite answers a lone MIN or MAX from the b-tree edge,
+        # but scans the table for both at once.
+        (low,) = conn.execute(f'SELECT MIN(rowid) FROM "{table}"').fetchone()
+        (high,) = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()
+    except sqlite3.OperationalError as e:
+        raise ApproximationError(
+            f"{table} has no rowid and cannot be sampled; query it exactly."
+        ) from e
+    if low is None:
+        return _result(0.0, 0.0, 0.0, confidence, 1.0, 0, True, start)
+
+    # Full blocks precede the last block, which ends at the highest rowid.
+    num_full = (high - low) // BLOCK_ROWS
+    num_sampled = max(MIN_BLOCKS, math.ceil(sample_fraction * num_full))
+    exact = num_sampled >= num_full
+    blocks = (
+        range(num_full)
+        if exact
+        else sorted(random.Random(seed).sample(range(num_full), num_sampled))
+    )
+
+    value = "1" if expression.strip() == "*" else f"({expression})"
+    condition = f"AND ({where})" if where else ""
+    sql = (
+        f"SELECT COUNT({value}), TOTAL({value}) "
+        f'FROM "{table}" WHERE rowid BETWEEN ? AND ? {condition}'
+    )
+    counts, sums = [], []
+    for block in blocks:
+        first = low + block * BLOCK_ROWS
+        count, total = conn.execute(sql, (first, first + BLOCK_ROWS - 1)).fetchone()
+        counts.append(count)
+        sums.append(total)
+    last_count, last_sum = conn.execute(
+        sql, (low + num_full * BLOCK_ROWS, high)
+    ).fetchone()
+
+    matched = sum(counts) + last_count
+    if exact:
+        if aggregate == "count":
+            estimate = float(matched)
+        elif aggregate == "sum":
+            estimate = float(sum(sums) + last_sum)
+        else:
+            estimate = (sum(sums) + last_sum) / matched if matched else 0.0
+        return _result(
+            estimate, estimate, estimate, confidence, 1.0, matched, True, start
+        )
+
+    n = len(blocks)
+    fpc = 1 - n / num_full
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    count_estimate = last_count + num_full * statistics.fmean(counts)
+    sum_estimate = last_sum + num_full * statistics.fmean(sums)
+    if aggregate == "avg":
+        if not matched:
+            raise ApproximationError(
+                "No sampled rows matched; raise sample_fraction or query exactly."
+            )
+        estimate = sum_estimate / count_estimate
+        residuals = [s - estimate * c for s, c in zip(sums, counts, strict=True)]
+        variance = statistics.variance(residuals)
+        error = z * num_full * math.sqrt(fpc / n * variance) / count_estimate
+        ci_low, ci_high = estimate - error, estimate + error
+    else:
+        totals = counts if aggregate == "count" else sums
+        estimate = count_estimate if aggregate == "count" else sum_estimate
+        variance = statistics.variance(totals)
+        error = z * num_full * math.sqrt(fpc / n * variance)
+        ci_low, ci_high = estimate - error, estimate + error
+        if variance == 0 and aggregate == "count":
+            # Rule of three: bound the number of unsampled blocks that may differ.
+            differing = (1 - (1 - confidence) ** (1 / n)) * (num_full - n)
+            ci_low = estimate - differing * counts[0]
+            ci_high = estimate + differing * (BLOCK_ROWS - counts[0])
+
+    result = _result(
+        estimate,
+        ci_low,
+        ci_high,
+        confidence,
+        (n + 1) / (num_full + 1),
+        matched,
+        False,
+        start,
+    )
+    if variance == 0 and aggregate != "count":
+        result["warnings"] = [
+            f"All {n} sampled blocks agreed, so the interval does not reflect "
+            "rows outside the sample; raise sample_fraction or query exactly."
+        ]
+    return result
+
+
+def _result(
+    estimate: float,
+    ci_low: float,
+    ci_high: float,
+    confidence: float,
+    sample_fraction: float,
+    rows_matched: int,
+    exact: bool,
+    start: float,
+) -> dict[str, Any]:
+    if not exact:
+        estimate = _round(estimate)
+        ci_low, ci_high = _round(ci_low, math.floor), _round(ci_high, math.ceil)
+    return {
+        "estimate": estimate,
+        "ci_low": ci_low,
+        "ci_high": ci_high,
+        "confidence": confidence,
+        "sample_fraction": round(sample_fraction, 6),
+        "rows_matched_in_sample": rows_matched,
+        "exact": exact,
+        "elapsed_s": round(time.perf_counter() - start, 3),
+    }
+
+
+def _round(value: float, to_int: Callable[[float], int] = round) -> float:
+    """Round to 4 significant digits; more would overstate the precision.
+
+    `to_int` picks the direction: `math.floor` and `math.ceil` round an interval's
+    ends outward, so rounding never narrows it.
+    """
+    if not value:
+        return 0.0
+    quantum = 10.0 ** (math.floor(math.log10(abs(value))) - 3)
+    return float(f"{to_int(value / quantum) * quantum:.4g}")
+
+
+def _is_table(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
@@ -0,0 +1,103 @@
+"""Run blocking database tool calls concurrently from async code.
+
+When the model asks for several tool calls in one step, pydantic-ai runs async
+tools concurrently. `ToolExecutor` lets async tools hand their blocking SQLite
+work to a bounded pool of worker threads. SQLite releases the GIL while it
+executes a statement, so independent queries on separate pooled connections
+run in parallel on separate cores. The worker count defaults to the connection
+pool's size, so a worker never waits for a connection.
+
+Each call's time waiting for a worker and time running is recorded.
+"""
+
+import asyncio
+import functools
+import logging
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import ParamSpec, TypeVar
+
+logger = logging.getLogger(__name__)
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+# Most recent call timings kept for `stats`.
+MAX_TIMINGS = 1_000
+
+
+@dataclass(frozen=True)
+class CallTiming:
+    """How long one tool call took."""
+
+    name: str
+    queued_s: float
+    run_s: float
+    ok: bool
+
+
+class ToolExecutor:
+    """A bounded pool of worker threads for blocking tool calls.
+
+    Args:
+        workers: Maximum number of calls running at once.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.timings: deque[CallTiming] = deque(maxlen=MAX_TIMINGS)
+        self._threads = ThreadPoolExecutor(workers, thread_name_prefix="db-tool")
+        self._lock = threading.Lock()
+
+    async def run(self, fn: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run `fn` on a worker thread and wait for its result."""
+        submitted = time.perf_counter()
+        timed = functools.partial(self._timed, fn, submitted, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._threads, timed)
+
+    def stats(self) -> str:
+        """Summarize recent call timings in one line."""
+        with self._lock:
+            timings = list(self.timings)
+        if not timings:
+            return "Tool calls: none"
+        run = sorted(timing.run_s for timing in timings)
+        queued = max(timing.queued_s for timing in timings)
+        return (
+            f"Tool calls: {len(timings)}, run time median "
+            f"{run[len(run) // 2] * 1000:.1f} ms, max {run[-1] * 1000:.1f} ms, "
+            f"max wait for a worker {queued * 1000:.1f} ms"
+        )
+
+    def shutdown(self) -> None:
+        """Wait for running calls to finish and stop the worker threads."""
+        self._threads.shutdown()
+
+    def _timed(
+        self, fn: Callable[..., T], submitted: float, *args: object, **kwargs: object
+    ) -> T:
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            timing = CallTiming(
+                name=getattr(fn, "__name__", repr(fn)),
+                queued_s=started - submitted,
+                run_s=time.perf_counter() - started,
+                ok=ok,
+            )
+            with self._lock:
+                self.timings.append(timing)
+            logger.info(
+                "%s: waited %.1f ms, ran %.1f ms",
+                timing.name,
+                timing.queued_s * 1000,
+                timing.run_s * 1000,
+            )
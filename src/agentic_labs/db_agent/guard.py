@@ -0,0 +1,230 @@
+"""Cost checks and time limits for agent-written SQL.
+
+A single bad query, such as a join without a join condition over `purchases`,
+can run for minutes and stall the agent session that issued it. `QueryGuard`
+prevents this in two ways:
+
+1. Before running a query, it reads the plan from `EXPLAIN QUERY PLAN` and
+   finds full table scans that use no index over tables larger than
+   `max_scan_rows`. It either warns about them or rejects the query.
+2. While the query runs, a progress handler interrupts it once it exceeds
+   `time_budget` seconds.
+
+Both failures raise a `QueryGuardError`. Its `to_dict` gives the model the
+reason and what to change, so the model can retry instead of giving up.
+"""
+
+import re
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Literal
+
+from agentic_labs.db_agent.schema import estimate_row_count
+
+DEFAULT_MAX_SCAN_ROWS = 100_000
+DEFAULT_TIME_BUDGET = 10.0
+
+FullScanAction = Literal["warn", "reject"]
+
+# SQLite virtual machine instructions between checks of the clock.
+PROGRESS_INTERVAL = 10_000
+
+# SQLite 3.36+ plans read "SCAN p"; older ones "SCAN TABLE purchases AS p".
+_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(.*)$")
+_ALIAS = re.compile(r'\b(?=(\w+)"?\s+(?:AS\s+)?"?(\w+))', re.IGNORECASE)
+
+# Words that may follow a table name without being its alias.
+_NOT_ALIASES = {
+    "AND",
+    "AS",
+    "ASC",
+    "BY",
+    "CROSS",
+    "DESC",
+    "EXCEPT",
+    "FROM",
+    "FULL",
+    "GROUP",
+    "HAVING",
+    "INDEXED",
+    "INNER",
+    "INTERSECT",
+    "JOIN",
+    "LEFT",
+    "LIMIT",
+    "NATURAL",
+    "NOT",
+    "ON",
+    "OR",
+    "ORDER",
+    "OUTER",
+    "RIGHT",
+    "SELECT",
+    "UNION",
+    "USING",
+    "WHERE",
+    "WINDOW",
+}
+
+
+class QueryGuardError(Exception):
+    """A query was rejected or stopped before it finished.
+
+    Args:
+        message: What happened and what to change, addressed to the model.
+        details: Extra fields for the structured error.
+    """
+
+    code = "query_error"
+
+    def __init__(self, message: str, **details: Any) -> None:
+        super().__init__(message)
+        self.details = details
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the error as a tool result the model can act on."""
+        return {"error": self.code, "message": str(self), **self.details}
+
+
+class QueryRejectedError(QueryGuardError):
+    """The query plan scans a large table without an index."""
+
+    code = "query_rejected"
+
+
+class QueryTimeoutError(QueryGuardError):
+    """The query ran longer than its time budget."""
+
+    code = "query_timeout"
+
+
+class QueryGuard:
+    """Checks query plans and limits the run time of queries.
+
+    Args:
+        max_scan_rows: Tables with more rows than this must not be fully scanned
+            without an index.
+        time_budget: Seconds a query may run before it is interrupted, or None
+            for no limit.
+        on_full_scan: Whether a plan that scans a large table without an index
+            is run with a warning or rejected.
+    """
+
+    def __init__(
+        self,
+        max_scan_rows: int = DEFAULT_MAX_SCAN_ROWS,
+        time_budget: float | None = DEFAULT_TIME_BUDGET,
+        on_full_scan: FullScanAction = "warn",
+    ) -> None:
+        self.max_scan_rows = max_scan_rows
+        self.time_budget = time_budget
+        self.on_full_scan = on_full_scan
+
+    def check(self, conn: sqlite3.Connection, sql: str) -> list[str]:
+        """Check the plan of a query before it runs.
+
+        Returns:
+            Warnings about full scans of large tables, for the model.
+
+        Raises:
+            QueryRejectedError: The plan fully scans a large table without an
+                index and `on_full_scan` is "reject".
+        """
+        scans = [
+            (table, rows)
+            for table, rows in full_scans(conn, sql)
+            if rows > self.max_scan_rows
+        ]
+        if not scans:
+            return []
+
+        tables = ", ".join(f"{table} (~{rows} rows)" for table, rows in scans)
+        if self.on_full_scan == "reject":
+            raise QueryRejectedError(
+                f"The query would read every row of {tables} without using an "
+                "index. Filter or join on indexed columns (see get_schema), or "
+                "query a smaller summary table.",
+                tables=[table for table, _ in scans],
+            )
+        return [
+            f"This query reads every row of {tables} without using an index and may "
+            "be slow. Prefer filtering or joining on indexed columns."
+        ]
+
+    @contextmanager
+    def deadline(self, conn: sqlite3.Connection) -> Iterator[None]:
+        """Interrupt queries on `conn` that run past the time budget.
+
+        Covers everything in the `with` block, including fetching rows.
+
+        Raises:
+            QueryTimeoutError: A query was interrupted.
+        """
+        if self.time_budget is None:
+            yield
+            return
+
+        start = time.monotonic()
+        deadline = start + self.time_budget
+
+        def expired() -> bool:
+            return time.monotonic() > deadline
+
+        conn.set_progress_handler(expired, PROGRESS_INTERVAL)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if not expired():
+                raise
+            raise QueryTimeoutError(
+                f"The query was stopped after {self.time_budget:g}s. Make it "
+                "cheaper: filter on indexed columns, avoid joins without a join "
+                "condition, or aggregate a smaller date range.",
+                time_budget_s=self.time_budget,
+                elapsed_s=round(time.monotonic() - start, 3),
+            ) from e
+        finally:
+            conn.set_progress_handler(None, 0)
+
+
+# --------------------------------------------------------------------------------------
+# Query Plans
+# --------------------------------------------------------------------------------------
+
+
+def full_scans(conn: sqlite3.Connection, sql: str) -> list[tuple[str, int]]:
+    """Return the tables a query reads in full without an index, with row counts.
+
+    Scans of views, CTEs and subqueries are skipped; the plan lists the scans
+    of their underlying tables separately.
+    """
+    tables = {
+        name.lower(): name
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )
+    }
+    aliases = _aliases(sql, tables)
+
+    scans = []
+    for *_, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        match = _SCAN.match(detail)
+        if match is None or "INDEX" in match.group(2):
+            continue
+        name = match.group(1).lower()
+        table = aliases.get(name) or tables.get(name)
+        if table is not None:
+            scans.append((table, estimate_row_count(conn, table)))
+    return scans
+
+
+def _aliases(sql: str, tables: dict[str, str]) -> dict[str, str]:
+    """Map the aliases a query gives tables (`purchases p`) to table names."""
+    aliases = {}
+    for match in _ALIAS.finditer(sql):
+        table, alias = match.group(1).lower(), match.group(2)
+        if table in tables and alias.upper() not in _NOT_ALIASES:
+            aliases[alias.lower()] = tables[table]
+    return aliases
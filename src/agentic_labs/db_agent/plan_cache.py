@@ -0,0 +1,142 @@
+"""A persistent cache of the SQL that answered questions to the database agent.
+
+Answering a question takes several LLM round trips: reading the schema, writing
+a query, and often fixing it. Users ask many of the same questions again.
+`PlanCache` remembers the queries each answer was based on, keyed by the
+question with case, punctuation and spacing normalized. On a repeat, the agent
+can run those queries up front instead of rediscovering them.
+
+Each entry records the fingerprint of the schema its queries were written
+against (see `schema_fingerprint`). An entry whose fingerprint no longer
+matches is deleted when it is looked up, since its SQL may no longer be valid.
+
+Entries live in a SQLite database, so they survive across sessions.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "agentic-labs" / "plan-cache"
+DEFAULT_MAX_ENTRIES = 10_000
+
+# Queries kept per question; a question rarely needs more.
+MAX_QUERIES = 5
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase a question and reduce punctuation and spacing to single spaces."""
+    return _NON_WORD.sub(" ", question.lower()).strip()
+
+
+class PlanCache:
+    """An on-disk map from questions to the queries that answered them.
+
+    Args:
+        cache_dir: Directory holding the cache database.
+        max_entries: Number of questions to keep; least recently used go first.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            cache_dir / "plans.sqlite3",
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS plans (
+                question TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                queries TEXT NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS plans_last_used ON plans (last_used);
+            """
+        )
+
+    def get(self, question: str, fingerprint: str) -> list[str] | None:
+        """Return the queries that answered a question against this schema."""
+        key = normalize_question(question)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, queries FROM plans WHERE question = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] != fingerprint:
+                self._conn.execute("DELETE FROM plans WHERE question = ?", (key,))
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE plans SET last_used = ? WHERE question = ?",
+                (time.time(), key),
+            )
+        return json.loads(row[1])
+
+    def put(self, question: str, fingerprint: str, queries: list[str]) -> None:
+        """Record the queries that answered a question, replacing earlier ones."""
+        key = normalize_question(question)
+        if not key or not queries:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?)",
+                    (key, fingerprint, json.dumps(queries[:MAX_QUERIES]), time.time()),
+                )
+                self._evict()
+            except sqlite3.Error as e:
+                logger.warning("Failed to store query plan: %s", e)
+
+    def stats(self) -> dict[str, Any]:
+        """Return hit/miss counts and occupancy."""
+        with self._lock:
+            (entries,) = self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+            }
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries beyond `max_entries`."""
+        self._conn.execute(
+            "DELETE FROM plans WHERE question IN ("
+            "SELECT question FROM plans ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
@@ -0,0 +1,137 @@
+"""A pool of read-only, memory-mapped SQLite connections.
+
+Agent tools run a few small queries per step. Opening a connection for each one
+means re-reading the schema and starting with a cold page cache every time,
+which costs more than the queries themselves. `ConnectionPool` keeps connections
+open across tool calls and hands them out one caller at a time.
+
+Connections open the database with a `mode=ro` URI and `PRAGMA query_only`, so
+agent-written SQL cannot modify it, and map the file into memory so reads are
+served from the OS page cache without copying.
+"""
+
+import queue
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+DEFAULT_POOL_SIZE = 4
+DEFAULT_MMAP_BYTES = 256 << 20
+DEFAULT_CACHE_KIB = 16 << 10
+
+
+class PoolTimeoutError(Exception):
+    """No connection became available in time."""
+
+
+class ConnectionPool:
+    """A thread-safe pool of read-only connections to one SQLite database.
+
+    Connections are opened on demand, up to `size`, and reused most-recently-used
+    first so that callers get the connection with the warmest cache.
+
+    Args:
+        path: Path of the database file.
+        size: Maximum number of open connections.
+        mmap_bytes: Bytes of the file each connection memory-maps.
+        cache_kib: Page cache size of each connection, in KiB.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        size: int = DEFAULT_POOL_SIZE,
+        mmap_bytes: int = DEFAULT_MMAP_BYTES,
+        cache_kib: int = DEFAULT_CACHE_KIB,
+    ) -> None:
+        self.path = Path(path)
+        self.size = size
+        self.mmap_bytes = mmap_bytes
+        self.cache_kib = cache_kib
+
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._opened = 0
+        self._closed = False
+
+    @contextmanager
+    def connection(self, timeout: float | None = None) -> Iterator[sqlite3.Connection]:
+        """Check out a connection for the duration of a `with` block.
+
+        Raises:
+            PoolTimeoutError: All connections stayed busy for `timeout` seconds.
+        """
+        conn = self._acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    def close(self) -> None:
+        """Close idle connections; checked-out ones close when returned."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def _acquire(self, timeout: float | None) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed.")
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+        if can_open:
+            try:
+                return self._open()
+            except BaseException:
+                with self._lock:
+                    self._opened -= 1
+                raise
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(
+                f"No database connection became available in {timeout}s."
+            ) from None
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.row_factory = None
+        with self._lock:
+            closed = self._closed
+            if closed:
+                self._opened -= 1
+        if closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a read-only connection tuned for repeated reads."""
+        conn = sqlite3.connect(
+            f"{self.path.resolve().as_uri()}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+        )
+        conn.executescript(
+            f"""
+            PRAGMA query_only = ON;
+            PRAGMA mmap_size = {self.mmap_bytes};
+            PRAGMA cache_size = -{self.cache_kib};
+            PRAGMA temp_store = MEMORY;
+            """
+        )
+        return conn
@@ -0,0 +1,102 @@
+"""An LRU cache of `query_database` results.
+
+Agents run the same aggregate queries (top customers, sales by month) several
+times in one conversation. `ResultCache` keeps the most recently used results,
+keyed by the normalized SQL and the page cursor, so a repeat costs a dictionary
+lookup instead of a query.
+
+Every lookup first reads the database version through `ChangeTracker`. When the
+version has changed since the entries were stored, the cache drops every entry,
+so a result is never served after the database changes.
+"""
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from agentic_labs.db_agent.results import normalize_sql
+from agentic_labs.db_agent.versioning import ChangeTracker, DatabaseVersion
+
+DEFAULT_MAX_ENTRIES = 256
+
+CacheKey = tuple[str, str | None]
+
+
+class ResultCache:
+    """Query results of one database, cleared whenever the database changes.
+
+    Args:
+        path: Path of the database file.
+        max_entries: Number of results to keep; least recently used go first.
+    """
+
+    def __init__(self, path: Path, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._tracker = ChangeTracker(path)
+        self._lock = threading.Lock()
+        self._version: DatabaseVersion | None = None
+        self._entries: OrderedDict[CacheKey, dict[str, Any]] = OrderedDict()
+
+    def get_or_run(
+        self,
+        conn: sqlite3.Connection,
+        sql: str,
+        cursor: str | None,
+        run: Callable[[], dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Return the cached result of a query page, or run it and cache it.
+
+        Results are only cached when `run` returns; exceptions propagate.
+
+        Args:
+            conn: Connection the query runs on, used to read the database version.
+            sql: The query.
+            cursor: The page cursor, or None for the first page.
+            run: Runs the query and returns its result.
+        """
+        key = (normalize_sql(sql), cursor)
+        version = self._tracker.version(conn)
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self._version = version
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        result = run()
+
+        with self._lock:
+            # The version read before the query, so a change made while it ran
+            # invalidates this entry on the next lookup.
+            if version == self._version:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> str:
+        """Summarize cache use in one line, for sizing the cache."""
+        return (
+            f"Result cache: {self.hits} hits, {self.misses} misses "
+            f"({self.hit_rate:.0%} hit rate), {len(self._entries)}/"
+            f"{self.max_entries} entries, {self.invalidations} invalidations"
+        )
@@ -0,0 +1,152 @@
+"""Paginated, columnar query results for the database agent's `query_database` tool.
+
+A broad SELECT can return millions of rows. Fetching them all loads them into
+memory, and returning them as one dict per row floods the model's context with
+repeated column names. `fetch_page` returns at most `max_rows` rows, with the
+column names listed once and each row as a list of values. When there are more
+rows, it also returns the total row count and an opaque cursor that fetches the
+next page of the same query.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import sqlite3
+from itertools import islice
+from typing import Any
+
+DEFAULT_MAX_ROWS = 100
+
+# Rows counted past the current page before the total is reported as a lower bound.
+COUNT_LIMIT = 100_000
+
+MAX_CELL_CHARS = 500
+
+_LITERAL_OR_SPACE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+
+
+class InvalidCursorError(ValueError):
+    """A cursor is malformed or was issued for a different query."""
+
+    code = "invalid_cursor"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the error as a tool result the model can act on."""
+        return {"error": self.code, "message": str(self)}
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    sql: str,
+    cursor: str | None = None,
+    max_rows: int = DEFAULT_MAX_ROWS,
+) -> dict[str, Any]:
+    """Run a query and return one page of its results.
+
+    Rows are streamed from SQLite, so memory use is bounded by `max_rows` no
+    matter how many rows the query produces. Long text values are truncated.
+
+    Args:
+        conn: Connection to run the query on.
+        sql: The query.
+        cursor: Cursor returned with a previous page of the same query.
+        max_rows: Maximum number of rows to return.
+
+    Returns:
+        A dict with `columns`, `rows` (lists of values in column order),
+        `total_rows` (None if more than `COUNT_LIMIT` rows follow the page), a
+        `next_cursor` (None on the last page), and a one-line `summary`.
+
+    Raises:
+        InvalidCursorError: `cursor` does not belong to `sql`.
+    """
+    offset = _decode_cursor(cursor, sql) if cursor else 0
+
+    results = conn.execute(sql)
+    columns = [description[0] for description in results.description or []]
+    skipped = sum(1 for _ in islice(results, offset))
+    rows = [[_cell(value) for value in row] for row in results.fetchmany(max_rows)]
+
+    counted = sum(1 for _ in islice(results, COUNT_LIMIT + 1))
+    remaining = min(counted, COUNT_LIMIT)
+    total_rows = skipped + len(rows) + remaining if counted <= COUNT_LIMIT else None
+
+    next_cursor = None
+    if remaining:
+        next_cursor = _encode_cursor(sql, offset + len(rows))
+
+    return {
+        "columns": columns,
+        "rows": rows,
+        "total_rows": total_rows,
+        "next_cursor": next_cursor,
+        "summary": _summary(offset, len(rows), total_rows, next_cursor),
+    }
+
+
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace outside string literals and drop trailing semicolons.
+
+    Queries that differ only in layout normalize to the same text, so they share
+    cursors and cache entries.
+    """
+    sql = _LITERAL_OR_SPACE.sub(lambda m: m.group(1) or " ", sql)
+    return sql.strip().rstrip(";").rstrip()
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _summary(
+    offset: int, num_rows: int, total_rows: int | None, next_cursor: str | None
+) -> str:
+    if not num_rows:
+        return "No rows." if not offset else f"No rows after row {offset}."
+    shown = f"Rows {offset + 1}-{offset + num_rows}"
+    total = f"{total_rows}" if total_rows is not None else f"more than {COUNT_LIMIT}"
+    if next_cursor is None:
+        return f"{shown} of {total} (all rows)."
+    return (
+        f"{shown} of {total}. Aggregate or filter in SQL to narrow the results, or "
+        "pass next_cursor to get the next page."
+    )
+
+
+def _cell(value: Any) -> Any:
+    """Make a value JSON-friendly and bounded in size."""
+    if isinstance(value, str) and len(value) > MAX_CELL_CHARS:
+        return value[: MAX_CELL_CHARS - 1] + "…"
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return value
+
+
+def _query_id(sql: str) -> str:
+    return hashlib.sha256(normalize_sql(sql).encode()).hexdigest()[:16]
+
+
+def _encode_cursor(sql: str, offset: int) -> str:
+    data = json.dumps({"q": _query_id(sql), "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sql: str) -> int:
+    """Return the row offset of a cursor issued for `sql`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        query_id, offset = data["q"], int(data["o"])
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(
+            "Invalid cursor. Pass the next_cursor of the previous result unchanged, "
+            "or omit cursor to get the first page."
+        ) from e
+    if query_id != _query_id(sql) or offset < 0:
+        raise InvalidCursorError(
+            "This cursor belongs to a different query. Pass the cursor together "
+            "with the exact SQL it was returned for."
+        )
+    return offset
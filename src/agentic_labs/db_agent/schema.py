@@ -0,0 +1,214 @@
+"""Cached schema descriptions for the database agent's `get_schema` tool.
+
+The agent reads the schema at the start of nearly every question, and the
+schema text becomes part of every later prompt in the run. `SchemaCache` builds
+it once per database version instead of on every call. Besides the raw DDL, it
+offers a compact form with one line per column, the table's row count,
+indexes, and a couple of sample values per text column, which tells the model
+how values are formatted (dates, codes, abbreviations) in fewer tokens than the
+DDL.
+"""
+
+import hashlib
+import re
+import sqlite3
+import threading
+
+from agentic_labs.db_agent.pool import ConnectionPool
+from agentic_labs.db_agent.versioning import ChangeTracker, DatabaseVersion
+
+# Sample values are shown for text columns only; numbers and keys say little.
+SAMPLE_VALUES = 2
+SAMPLE_SCAN_ROWS = 1_000
+MAX_SAMPLE_CHARS = 24
+
+_COMMENT = re.compile(r"--\s*(.*)$", re.MULTILINE)
+_VIRTUAL_TABLE = re.compile(r"CREATE VIRTUAL TABLE \S+ USING (\w+)", re.IGNORECASE)
+
+# Tables in which FTS5 stores a full-text index; they mean nothing to the model.
+_FTS5_SHADOW_SUFFIXES = ("_data", "_idx", "_content", "_docsize", "_config")
+
+
+class SchemaCache:
+    """Schema descriptions of a database, rebuilt only when the database changes.
+
+    Args:
+        pool: Pool of connections to the database.
+    """
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        self.pool = pool
+        self.hits = 0
+        self.misses = 0
+        self._tracker = ChangeTracker(pool.path)
+        self._lock = threading.Lock()
+        self._entries: dict[bool, tuple[DatabaseVersion, str]] = {}
+
+    def get(self, compact: bool = False) -> str:
+        """Return the DDL of every table, or the compact description."""
+        with self.pool.connection() as conn:
+            version = self._tracker.version(conn)
+            with self._lock:
+                entry = self._entries.get(compact)
+                if entry is not None and entry[0] == version:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            text = compact_schema(conn) if compact else ddl_schema(conn)
+
+        with self._lock:
+            self._entries[compact] = (version, text)
+        return text
+
+
+# --------------------------------------------------------------------------------------
+# Schema Descriptions
+# --------------------------------------------------------------------------------------
+
+
+def ddl_schema(conn: sqlite3.Connection) -> str:
+    """Return the DDL of every table."""
+    rows = _tables(conn)
+    return "\n\n".join(f"-- {name}\n{sql}" for name, sql in rows)
+
+
+def schema_fingerprint(conn: sqlite3.Connection) -> str:
+    """Hash the definitions of every table, index and view.
+
+    SQL written against one schema stays valid while the fingerprint does.
+    """
+    rows = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+    ).fetchall()
+    return hashlib.sha256(repr(rows).encode()).hexdigest()[:16]
+
+
+def compact_schema(conn: sqlite3.Connection) -> str:
+    """Describe every table in a few tokens per column.
+
+    For example:
+
+        purchases (~2000000 rows)
+          id INTEGER PK
+          customer_id INTEGER -> customers.id
+          purchase_date TEXT e.g. '2024-10-01', '2024-10-02'
+          ...
+          indexes: (customer_id); (product_id, purchase_date)
+    """
+    sections = []
+    for table, sql in _tables(conn):
+        if table.startswith("sqlite_"):
+            continue
+        virtual = _VIRTUAL_TABLE.match(sql or "")
+        if virtual:
+            columns = ", ".join(
+                column
+                for _, column, *_ in conn.execute(f'PRAGMA table_info("{table}")')
+            )
+            sections.append(
+                f"{table} ({virtual.group(1)} virtual table over {columns})"
+            )
+            continue
+
+        lines = [f"{table} (~{estimate_row_count(conn, table)} rows)"]
+        lines += [f"  -- {comment}" for comment in _COMMENT.findall(sql or "")]
+
+        references = {
+            column: f"{ref_table}.{ref_column or 'id'}"
+            for _, _, ref_table, column, ref_column, *_ in conn.execute(
+                f'PRAGMA foreign_key_list("{table}")'
+            )
+        }
+        for _, column, column_type, _, _, pk in conn.execute(
+            f'PRAGMA table_info("{table}")'
+        ):
+            line = f"  {column} {column_type or 'ANY'}"
+            if pk:
+                line += " PK"
+            if column in references:
+                line += f" -> {references[column]}"
+            elif not pk and _is_text(column_type):
+                samples = _sample_values(conn, table, column)
+                if samples:
+                    line += f" e.g. {samples}"
+            lines.append(line)
+
+        indexes = [
+            f"({', '.join(_index_columns(conn, name))})"
+            for _, name, *_ in conn.execute(f'PRAGMA index_list("{table}")')
+            if not name.startswith("sqlite_autoindex")
+        ]
+        if indexes:
+            lines.append(f"  indexes: {'; '.join(indexes)}")
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def _tables(conn: sqlite3.Connection) -> list[tuple[str, str]]:
+    """Return the name and DDL of every table, without FTS5 shadow tables."""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='table' ORDER BY name"
+    ).fetchall()
+    shadow = {
+        f"{name}{suffix}"
+        for name, sql in rows
+        if (match := _VIRTUAL_TABLE.match(sql or ""))
+        and match.group(1).lower() == "fts5"
+        for suffix in _FTS5_SHADOW_SUFFIXES
+    }
+    return [(name, sql) for name, sql in rows if name not in shadow]
+
+
+def estimate_row_count(conn: sqlite3.Connection, table: str) -> int:
+    """Estimate a table's row count without scanning it.
+
+    Uses ANALYZE statistics when available, else the largest rowid.
+    """
+    try:
+        row = conn.execute(
+            "SELECT stat FROM sqlite_stat1 WHERE tbl = ? ORDER BY idx IS NULL",
+            (table,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    if row:
+        return int(row[0].split()[0])
+
+    try:
+        (count,) = conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()
+    except sqlite3.OperationalError:
+        # WITHOUT ROWID tables; these are small rollups.
+        (count,) = conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()
+    return count or 0
+
+
+def _sample_values(conn: sqlite3.Connection, table: str, column: str) -> str:
+    """Return a few distinct values from the first rows of a column."""
+    values = conn.execute(
+        f'SELECT DISTINCT "{column}" FROM '
+        f'(SELECT "{column}" FROM "{table}" LIMIT {SAMPLE_SCAN_ROWS}) '
+        f'WHERE "{column}" IS NOT NULL LIMIT {SAMPLE_VALUES}'
+    ).fetchall()
+    return ", ".join(_format_value(value) for (value,) in values)
+
+
+def _format_value(value: object) -> str:
+    if isinstance(value, str):
+        if len(value) > MAX_SAMPLE_CHARS:
+            value = value[: MAX_SAMPLE_CHARS - 1] + "…"
+        return repr(value)
+    if isinstance(value, bytes):
+        return f"<{len(value)} bytes>"
+    return str(value)
+
+
+def _is_text(column_type: str) -> bool:
+    """Whether a declared column type has TEXT affinity."""
+    column_type = column_type.upper()
+    return any(word in column_type for word in ("CHAR", "CLOB", "TEXT"))
+
+
+def _index_columns(conn: sqlite3.Connection, index: str) -> list[str]:
+    return [name for _, _, name in conn.execute(f'PRAGMA index_info("{index}")')]
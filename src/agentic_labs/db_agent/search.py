@@ -0,0 +1,117 @@
+"""Ranked full-text search for the database agent's `search` tool.
+
+Without a full-text index, the agent finds "products about X" with
+`LIKE '%x%'`, which scans the whole table and returns matches in no particular
+order. `search_text` queries the database's FTS5 tables instead (`create-database
+--search` builds them) and returns the ids of the best BM25 matches in each
+source table, with a snippet showing where the terms matched.
+
+The search tables are discovered from the schema: every FTS5 table with an
+external content table is searched.
+"""
+
+import re
+import sqlite3
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_LIMIT = 10
+SNIPPET_TOKENS = 12
+
+_FTS5_TABLE = re.compile(r"CREATE VIRTUAL TABLE \S+ USING fts5\s*\(", re.IGNORECASE)
+_CONTENT_TABLE = re.compile(r"content\s*=\s*'?\"?(\w+)", re.IGNORECASE)
+_TERM = re.compile(r"\w+")
+
+
+class NoSearchIndexError(Exception):
+    """The database has no full-text search tables."""
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    """An FTS5 table and the table whose text it indexes."""
+
+    name: str
+    table: str
+
+
+def search_indexes(conn: sqlite3.Connection) -> list[SearchIndex]:
+    """Return the FTS5 tables of a database that index another table."""
+    indexes = []
+    for name, sql in conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' ORDER BY name"
+    ):
+        if not _FTS5_TABLE.match(sql or ""):
+            continue
+        content = _CONTENT_TABLE.search(sql)
+        if content:
+            indexes.append(SearchIndex(name, content.group(1)))
+    return indexes
+
+
+def search_text(
+    conn: sqlite3.Connection,
+    query: str,
+    table: str | None = None,
+    limit: int = DEFAULT_LIMIT,
+) -> dict[str, Any]:
+    """Find the rows whose text best matches a query.
+
+    The query is plain text. Each word matches as a prefix ("wire" matches
+    "wireless"), and rows matching more of the words rank higher.
+
+    Args:
+        conn: Connection to the database.
+        query: Words to search for.
+        table: Search only this source table, e.g. "products".
+        limit: Maximum number of matches per table.
+
+    Returns:
+        For each searched table, a list of matches in rank order, each with the
+        row's `id`, its BM25 `score` (higher is better), and a `snippet` with the
+        matched terms in [brackets].
+
+    Raises:
+        NoSearchIndexError: No search table covers `table`, or the database has
+            none at all.
+    """
+    indexes = [
+        index for index in search_indexes(conn) if table is None or index.table == table
+    ]
+    if not indexes:
+        raise NoSearchIndexError(
+            f"There is no full-text search index over {table}."
+            if table
+            else "This database has no full-text search indexes."
+        )
+
+    match = _match_expression(query)
+    if match is None:
+        return {index.table: [] for index in indexes}
+
+    results = {}
+    for index in indexes:
+        rows = conn.execute(
+            f"SELECT rowid, -bm25({index.name}), "
+            f"snippet({index.name}, -1, '[', ']', '…', {SNIPPET_TOKENS}) "
+            f"FROM {index.name} WHERE {index.name} MATCH ? "
+            "ORDER BY rank LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        results[index.table] = [
+            {"id": rowid, "score": round(score, 3), "snippet": snippet}
+            for rowid, score, snippet in rows
+        ]
+    return results
+
+
+def _match_expression(query: str) -> str | None:
+    """Turn plain text into an FTS5 query: any of its words, each as a prefix.
+
+    Quoting every word keeps FTS5 operators and punctuation in the text from
+    being parsed as query syntax.
+    """
+    terms = _TERM.findall(query)
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"*' for term in terms)
@@ -0,0 +1,307 @@
+"""The database work behind the database agent's tools.
+
+`DatabaseTools` bundles everything the agent's tools share: a pool of read-only
+connections, worker threads that run blocking SQLite work off the event loop,
+the query guard, and the schema, result, and plan caches. The lab defines the
+agent and thin tool wrappers; each wrapper awaits one method here.
+
+The plan cache is looked up once at the start of a run and recorded once the
+run has an answer, by run id. A run that fails before it answers never records
+its plan; only the most recent `MAX_OPEN_RUNS` such lookups are kept.
+"""
+
+import json
+import sqlite3
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    ToolCallPart,
+    ToolReturnPart,
+)
+
+from agentic_labs.db_agent.approximate import (
+    Aggregate,
+    ApproximationError,
+    estimate_aggregate,
+)
+from agentic_labs.db_agent.executor import ToolExecutor
+from agentic_labs.db_agent.guard import QueryGuard, QueryGuardError
+from agentic_labs.db_agent.plan_cache import PlanCache
+from agentic_labs.db_agent.pool import ConnectionPool
+from agentic_labs.db_agent.result_cache import ResultCache
+from agentic_labs.db_agent.results import InvalidCursorError, fetch_page
+from agentic_labs.db_agent.schema import SchemaCache, schema_fingerprint
+from agentic_labs.db_agent.search import NoSearchIndexError, search_text
+
+PlanCacheMode = Literal["run", "hint"]
+
+# Plan lookups kept for runs that have not answered yet.
+MAX_OPEN_RUNS = 64
+
+
+# --------------------------------------------------------------------------------------
+# Database Tools
+# --------------------------------------------------------------------------------------
+
+
+class DatabaseTools:
+    """Schema, query, estimate, search, and plan-cache work for one database.
+
+    Every method that touches the database is async and runs its blocking work
+    on a worker thread, so tool calls the model makes in the same step run in
+    parallel.
+
+    Args:
+        db_path: Path of the SQLite database.
+        compact_schema: Describe tables in one line per column (with row counts,
+            indexes, and sample values) instead of raw DDL.
+        max_rows: Rows returned per `query` page.
+        guard: Time budget and full-scan policy for queries.
+        result_cache_entries: Number of query results to keep.
+        plan_cache_mode: "run" runs a repeated question's cached queries and
+            gives the model their results; "hint" gives only the SQL; `None`
+            turns the plan cache off.
+        plan_cache: Where plans are kept; defaults to the user's cache directory.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        compact_schema: bool = True,
+        max_rows: int = 100,
+        guard: QueryGuard | None = None,
+        result_cache_entries: int = 256,
+        plan_cache_mode: PlanCacheMode | None = "run",
+        plan_cache: PlanCache | None = None,
+    ) -> None:
+        self.compact_schema = compact_schema
+        self.max_rows = max_rows
+        self.plan_cache_mode = plan_cache_mode
+
+        self.pool = ConnectionPool(db_path)
+        # One worker per pooled connection, so a worker never waits for one.
+        self.executor = ToolExecutor(workers=self.pool.size)
+        self.guard = guard or QueryGuard()
+        self.schema_cache = SchemaCache(self.pool)
+        self.result_cache = ResultCache(db_path, max_entries=result_cache_entries)
+        self.plan_cache = plan_cache
+        if self.plan_cache is None and plan_cache_mode is not None:
+            self.plan_cache = PlanCache()
+
+        self._run_plans: OrderedDict[str | None, str | None] = OrderedDict()
+
+    # ----------------------------------------------------------------------------------
+    # Tools
+    # ----------------------------------------------------------------------------------
+
+    async def schema(self) -> str:
+        """Return the schema of all tables."""
+        return await self.executor.run(self.schema_cache.get, self.compact_schema)
+
+    async def query(self, sql: str, cursor: str | None = None) -> dict[str, Any]:
+        """Run a read-only SELECT query and return one page of its results.
+
+        Raises:
+            ValueError: `sql` is not a SELECT query.
+        """
+        if not sql.strip().upper().startswith("SELECT"):
+            raise ValueError("Only SELECT queries are allowed.")
+        return await self.executor.run(self._query, sql, cursor)
+
+    async def estimate(
+        self,
+        table: str,
+        aggregate: Aggregate,
+        expression: str = "*",
+        where: str | None = None,
+        sample_fraction: float = 0.01,
+    ) -> dict[str, Any]:
+        """Estimate an aggregate from a random sample of a table's rows."""
+        return await self.executor.run(
+            self._estimate, table, aggregate, expression, where, sample_fraction
+        )
+
+    async def search(
+        self, query: str, table: str | None = None, limit: int = 10
+    ) -> dict[str, Any]:
+        """Rank products or customers by how well their text matches `query`."""
+        return await self.executor.run(self._search, query, table, limit)
+
+    # ----------------------------------------------------------------------------------
+    # Plan Cache
+    # ----------------------------------------------------------------------------------
+
+    async def plan_instructions(self, run_id: str | None, question: str) -> str | None:
+        """Return instructions offering the queries that answered `question` before.
+
+        Looked up (and in "run" mode, run) once per run; later calls with the same
+        run id return the same instructions.
+        """
+        if self.plan_cache_mode is None:
+            return None
+        if run_id not in self._run_plans:
+            self._run_plans[run_id] = await self.executor.run(
+                self._plan_instructions, question
+            )
+            while len(self._run_plans) > MAX_OPEN_RUNS:
+                self._run_plans.popitem(last=False)
+        return self._run_plans[run_id]
+
+    async def record_plan(
+        self, run_id: str | None, question: str, messages: list[ModelMessage]
+    ) -> None:
+        """Cache the queries a finished run's answer was based on."""
+        self._run_plans.pop(run_id, None)
+        if self.plan_cache_mode is None:
+            return
+        queries = answer_queries(messages, run_id)
+        if queries:
+            await self.executor.run(self._record_plan, question, queries)
+
+    # ----------------------------------------------------------------------------------
+    # Statistics & Cleanup
+    # ----------------------------------------------------------------------------------
+
+    def stats(self) -> str:
+        """Summarize tool call timings and cache use, one line each."""
+        lines = [self.executor.stats(), self.result_cache.stats()]
+        if self.plan_cache is not None:
+            lines.append(f"Plan cache: {self.plan_cache.stats()}")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Stop the worker threads and close the caches and connections."""
+        self.executor.shutdown()
+        if self.plan_cache is not None:
+            self.plan_cache.close()
+        self.pool.close()
+
+    # ----------------------------------------------------------------------------------
+    # Database Work (worker threads)
+    # ----------------------------------------------------------------------------------
+
+    def _query(self, sql: str, cursor: str | None) -> dict[str, Any]:
+        with self.pool.connection() as conn:
+            try:
+                return self.result_cache.get_or_run(
+                    conn, sql, cursor, lambda: self._execute(conn, sql, cursor)
+                )
+            except (QueryGuardError, InvalidCursorError) as e:
+                return e.to_dict()
+
+    def _execute(
+        self, conn: sqlite3.Connection, sql: str, cursor: str | None
+    ) -> dict[str, Any]:
+        warnings = self.guard.check(conn, sql)
+        with self.guard.deadline(conn):
+            result = fetch_page(conn, sql, cursor=cursor, max_rows=self.max_rows)
+        if warnings:
+            result["warnings"] = warnings
+        return result
+
+    def _estimate(
+        self,
+        table: str,
+        aggregate: Aggregate,
+        expression: str,
+        where: str | None,
+        sample_fraction: float,
+    ) -> dict[str, Any]:
+        with self.pool.connection() as conn:
+            try:
+                with self.guard.deadline(conn):
+                    return estimate_aggregate(
+                        conn, table, aggregate, expression, where, sample_fraction
+                    )
+            except QueryGuardError as e:
+                return e.to_dict()
+            except ApproximationError as e:
+                return {"error": "approximation_error", "message": str(e)}
+
+    def _search(self, query: str, table: str | None, limit: int) -> dict[str, Any]:
+        with self.pool.connection() as conn:
+            try:
+                return search_text(conn, query, table=table, limit=limit)
+            except NoSearchIndexError as e:
+                return {
+                    "error": "no_search_index",
+                    "message": f"{e} Use query_database with LIKE instead.",
+                }
+
+    def _plan_instructions(self, question: str) -> str | None:
+        assert self.plan_cache is not None
+        with self.pool.connection() as conn:
+            fingerprint = schema_fingerprint(conn)
+        queries = self.plan_cache.get(question, fingerprint)
+        if not queries:
+            return None
+
+        if self.plan_cache_mode == "hint":
+            listing = "\n\n".join(f"```sql\n{sql}\n```" for sql in queries)
+            return (
+                "This question was answered before with the queries below, written "
+                "against the current schema. Run them with `query_database` instead "
+                "of reading the schema and writing new SQL.\n\n" + listing
+            )
+
+        listing = "\n\n".join(
+            f"```sql\n{sql}\n```\n"
+            f"Result: {json.dumps(self._query(sql, None), default=str)}"
+            for sql in queries
+        )
+        return (
+            "This question was answered before with the queries below. They have "
+            "already been run against the current database, and their results "
+            "follow. Answer from these results; use the tools only if they are not "
+            "enough.\n\n" + listing
+        )
+
+    def _record_plan(self, question: str, queries: list[str]) -> None:
+        assert self.plan_cache is not None
+        with self.pool.connection() as conn:
+            fingerprint = schema_fingerprint(conn)
+        self.plan_cache.put(question, fingerprint, queries)
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def answer_queries(messages: list[ModelMessage], run_id: str | None) -> list[str]:
+    """Return the SQL of the `query_database` results an answer was based on.
+
+    These are the queries that succeeded in the run's last round of tool calls.
+    Queries from earlier rounds are usually exploration, or attempts the model
+    went on to fix, so they are left out.
+    """
+    run_messages = [message for message in messages if message.run_id == run_id]
+    calls = {
+        part.tool_call_id: part.args_as_dict()
+        for message in run_messages
+        if isinstance(message, ModelResponse)
+        for part in message.parts
+        if isinstance(part, ToolCallPart)
+    }
+    last_round = next(
+        (
+            [part for part in message.parts if isinstance(part, ToolReturnPart)]
+            for message in reversed(run_messages)
+            if isinstance(message, ModelRequest)
+            and any(isinstance(part, ToolReturnPart) for part in message.parts)
+        ),
+        [],
+    )
+    queries = [
+        calls[part.tool_call_id]["sql"]
+        for part in last_round
+        if part.tool_name == "query_database"
+        and isinstance(part.content, dict)
+        and "error" not in part.content
+    ]
+    return list(dict.fromkeys(queries))
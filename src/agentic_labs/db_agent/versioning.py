@@ -0,0 +1,51 @@
+"""Detection of changes to a SQLite database, for invalidating caches.
+
+`PRAGMA data_version` changes when another connection commits to the database,
+but its value is only meaningful to the connection that reads it, and the tools
+use a pool of connections. `ChangeTracker` remembers the last value seen by each
+connection and bumps a shared generation number whenever any of them changes.
+The version it reports combines that generation with the size and modification
+time of the database file and its write-ahead log. A change that any of these
+signals catches produces a new version.
+"""
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+DatabaseVersion = tuple[int, ...]
+
+
+class ChangeTracker:
+    """Track the version of one database across pooled connections.
+
+    Args:
+        path: Path of the database file.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._data_versions: dict[int, int] = {}
+
+    def version(self, conn: sqlite3.Connection) -> DatabaseVersion:
+        """Return the current version of the database, as seen through `conn`."""
+        (data_version,) = conn.execute("PRAGMA data_version").fetchone()
+        with self._lock:
+            last = self._data_versions.get(id(conn))
+            if last is not None and last != data_version:
+                self._generation += 1
+            self._data_versions[id(conn)] = data_version
+            generation = self._generation
+        return (generation, *_stat(self.path), *_stat(Path(f"{self.path}-wal")))
+
+
+def _stat(path: Path) -> tuple[int, int]:
+    """Return the modification time (ns) and size of a file, or zeros if missing."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
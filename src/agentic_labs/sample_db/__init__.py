@@ -0,0 +1 @@
+"""Sample database generation used by the `agentic-labs create-database` command."""
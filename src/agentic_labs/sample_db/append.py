@@ -0,0 +1,103 @@
+"""Incremental growth of an existing sample database.
+
+An append adds customers and a window of purchases to a database built by
+`create-database`. New rows continue the existing id sequences, and new
+purchases reference both existing and new customers and existing products, so
+referential integrity holds. Units sold are taken out of product stock. Rollup
+tables, if present, are refreshed from the new purchases only, and search tables
+index the new rows.
+
+The rows of an append are generated like a shard of the database (see
+`agentic_labs.sample_db.shards`) whose random streams are selected by the first
+day of the window, so appending the same window twice is not a repeat.
+"""
+
+import datetime
+import sqlite3
+
+from agentic_labs.sample_db.load import TABLES
+from agentic_labs.sample_db.shards import IdRange, Shard
+
+
+class AppendError(Exception):
+    """The database cannot be appended to."""
+
+
+def next_ids(conn: sqlite3.Connection) -> dict[str, int]:
+    """Return the next free id of each table.
+
+    Raises:
+        AppendError: The database does not have the sample database's tables.
+    """
+    existing = {
+        name
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+    missing = set(TABLES) - existing
+    if missing:
+        raise AppendError(
+            f"Not a sample database: missing table(s) {', '.join(sorted(missing))}."
+        )
+    return {
+        table: conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[
+            0
+        ]
+        for table in TABLES
+    }
+
+
+def last_purchase_date(conn: sqlite3.Connection) -> datetime.date | None:
+    """Return the date of the latest purchase, or None if there are no purchases."""
+    (last,) = conn.execute("SELECT MAX(purchase_date) FROM purchases").fetchone()
+    return datetime.date.fromisoformat(last) if last else None
+
+
+def plan_append(
+    next_id: dict[str, int],
+    num_customers: int,
+    num_purchases: int,
+    seed: int,
+    since: datetime.date,
+    until: datetime.date,
+) -> Shard:
+    """Plan the rows of an append as a shard of the database.
+
+    Raises:
+        AppendError: The database has no products for purchases to reference.
+    """
+    num_products = next_id["products"] - 1
+    if num_purchases and not num_products:
+        raise AppendError("The database has no products to purchase.")
+
+    return Shard(
+        index=since.toordinal(),
+        customers=IdRange(next_id["customers"], num_customers),
+        products=IdRange(next_id["products"], 0),
+        purchases=IdRange(next_id["purchases"], num_purchases),
+        num_customers=next_id["customers"] - 1 + num_customers,
+        num_products=num_products,
+        seed=seed,
+        today=until,
+        purchases_from=since,
+    )
+
+
+def update_stock(conn: sqlite3.Connection, first_purchase_id: int) -> None:
+    """Take units of purchases from `first_purchase_id` onward out of stock.
+
+    Stock does not go below zero. Runs in the caller's transaction.
+    """
+    conn.execute(
+        """
+        UPDATE products
+        SET in_stock_qty = MAX(in_stock_qty - sold.units, 0)
+        FROM (
+            SELECT product_id, SUM(qty_purchased) AS units
+            FROM purchases
+            WHERE id >= ?
+            GROUP BY product_id
+        ) AS sold
+        WHERE products.id = sold.product_id
+        """,
+        (first_purchase_id,),
+    )
@@ -0,0 +1,130 @@
+"""Export of generated tables to Parquet, Arrow IPC, or CSV files.
+
+Rows go straight from the generators to the files in batches: each batch becomes
+one Parquet row group or Arrow record batch, so memory use does not depend on
+table size. Files contain no timestamps or other run-dependent metadata, so a
+given seed and as-of date always produce the same bytes.
+
+Parquet and Arrow need `pyarrow` (the `export` extra), which is imported only when
+one of them is written. CSV uses the standard library.
+"""
+
+import csv
+from collections.abc import Callable, Iterable
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from agentic_labs.sample_db.load import DEFAULT_BATCH_SIZE, TABLES
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+# Arrow types of the columns that are not strings.
+_COLUMN_TYPES = {
+    "id": "int64",
+    "birth_date": "date32",
+    "cost": "float64",
+    "in_stock_qty": "int64",
+    "customer_id": "int64",
+    "product_id": "int64",
+    "qty_purchased": "int64",
+    "purchase_date": "date32",
+}
+
+
+class MissingDependencyError(Exception):
+    """An optional dependency needed for an export format is not installed."""
+
+
+def export_table(
+    directory: Path,
+    table: str,
+    rows: Iterable[tuple],
+    start_id: int,
+    fmt: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Callable[[int], None] | None = None,
+) -> Path:
+    """Write a table's rows to `<directory>/<table><extension>`.
+
+    Args:
+        directory: Output directory.
+        table: Table name; a key of `TABLES`.
+        rows: Row tuples in the column order of `TABLES[table]`. Consumed lazily.
+        start_id: Id of the first row; ids are written as the first column.
+        fmt: One of `EXPORT_FORMATS`.
+        batch_size: Rows per Parquet row group, Arrow record batch, or CSV write.
+        on_batch: Called with the number of rows in each written batch.
+
+    Returns:
+        The path of the written file.
+
+    Raises:
+        MissingDependencyError: `pyarrow` is needed for `fmt` but not installed.
+    """
+    path = directory / f"{table}{EXPORT_FORMATS[fmt]}"
+    columns = ("id", *TABLES[table])
+    rows = ((row_id, *row) for row_id, row in enumerate(rows, start_id))
+    batches = iter(lambda: list(islice(rows, batch_size)), [])
+
+    if fmt == "csv":
+        with path.open("w", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(columns)
+            for batch in batches:
+                writer.writerows(batch)
+                if on_batch is not None:
+                    on_batch(len(batch))
+        return path
+
+    pa = _import_pyarrow(fmt)
+    schema = pa.schema(
+        [
+            (column, getattr(pa, _COLUMN_TYPES.get(column, "string"))())
+            for column in columns
+        ]
+    )
+    with _open_writer(pa, fmt, path, schema) as writer:
+        for batch in batches:
+            writer.write_batch(_record_batch(pa, schema, batch))
+            if on_batch is not None:
+                on_batch(len(batch))
+    return path
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _import_pyarrow(fmt: str) -> Any:
+    """Import pyarrow, which only the Parquet and Arrow formats need."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise MissingDependencyError(
+            f"Writing {fmt} files requires pyarrow. Install it with "
+            "'uv sync --extra export', or use --format csv."
+        ) from e
+    return pyarrow
+
+
+def _record_batch(pa: Any, schema: Any, rows: list[tuple]) -> Any:
+    """Convert row tuples to a record batch with the given schema."""
+    arrays = []
+    for field, values in zip(schema, zip(*rows, strict=True), strict=True):
+        if pa.types.is_date32(field.type):
+            # ISO date strings; parsed by a cast rather than per value in Python.
+            arrays.append(pa.array(values, pa.string()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _open_writer(pa: Any, fmt: str, path: Path, schema: Any) -> Any:
+    """Open a Parquet or Arrow IPC file writer; each batch written is a row group."""
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.ParquetWriter(path, schema, compression="zstd")
+    return pa.ipc.new_file(path, schema)
@@ -0,0 +1,199 @@
+"""Vectorized generators of fake customers, products, and purchases rows.
+
+Calling Faker for every field of every row makes generation, not SQLite, the
+bottleneck of large databases. Instead, `Vocabulary.build` calls Faker a fixed
+number of times to sample pools of names, cities, addresses, and phrases, and
+the generators assemble rows a chunk at a time with NumPy: pool entries are
+picked by random index, dates are day offsets from a start date, and prices and
+quantities come straight from the array RNG. Emails and SKUs embed the row id,
+so they are unique by construction.
+
+Each generator yields one row tuple at a time, in the column order of its table in
+`agentic_labs.sample_db.load.TABLES`, so tables of any size can be written without
+holding them in memory. Row ids are implicit: rows are numbered from `start_id`,
+which is what purchases reference. Output depends only on the seed.
+"""
+
+import datetime
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+from faker import Faker
+
+DEFAULT_SEED = 42
+
+# Rows generated per vectorized chunk.
+CHUNK_ROWS = 65_536
+
+# Number of distinct values sampled from Faker for each vocabulary pool.
+POOL_SIZE = 2_000
+
+# Stream ids that give each table an independent random sequence for a seed.
+_TABLE_STREAMS = {"customers": 0, "products": 1, "purchases": 2}
+
+_LETTERS = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+
+
+def table_rng(seed: int, table: str, shard: int = 0) -> np.random.Generator:
+    """Return the random generator for one table (and shard) of a database."""
+    return np.random.default_rng([seed, _TABLE_STREAMS[table], shard])
+
+
+# --------------------------------------------------------------------------------------
+# Vocabulary
+# --------------------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class Vocabulary:
+    """Pools of Faker values that rows are assembled from."""
+
+    first_names: npt.NDArray[np.str_]
+    last_names: npt.NDArray[np.str_]
+    street_addresses: npt.NDArray[np.str_]
+    cities: npt.NDArray[np.str_]
+    states: npt.NDArray[np.str_]
+    email_domains: npt.NDArray[np.str_]
+    catch_phrases: npt.NDArray[np.str_]
+    sentences: npt.NDArray[np.str_]
+
+    @classmethod
+    def build(cls, seed: int = DEFAULT_SEED, size: int = POOL_SIZE) -> "Vocabulary":
+        """Sample every pool from a Faker instance seeded with `seed`."""
+        fake = Faker()
+        fake.seed_instance(seed)
+
+        def pool(sample, count: int = size) -> npt.NDArray[np.str_]:
+            return np.array([sample() for _ in range(count)])
+
+        return cls(
+            first_names=pool(fake.first_name),
+            last_names=pool(fake.last_name),
+            street_addresses=pool(fake.street_address),
+            cities=pool(fake.city),
+            states=np.array(sorted({fake.state_abbr() for _ in range(size)})),
+            email_domains=pool(fake.free_email_domain, 20),
+            catch_phrases=pool(fake.catch_phrase),
+            sentences=pool(lambda: fake.sentence(nb_words=12)),
+        )
+
+
+# --------------------------------------------------------------------------------------
+# Row Generators
+# --------------------------------------------------------------------------------------
+
+
+def customers(
+    vocab: Vocabulary,
+    rng: np.random.Generator,
+    count: int,
+    start_id: int = 1,
+    today: datetime.date | None = None,
+) -> Iterator[tuple]:
+    """Yield `count` customer rows, numbered from `start_id`."""
+    today = today or datetime.date.today()
+    for ids in _chunks(start_id, count):
+        n = len(ids)
+        first_names = _pick(rng, vocab.first_names, n)
+        last_names = _pick(rng, vocab.last_names, n)
+        # Ages 18 to 85, as day offsets back from today.
+        birth_dates = _dates(
+            today - datetime.timedelta(days=round(85 * 365.25)),
+            rng.integers(0, round(67 * 365.25), n),
+        )
+        domains = _pick(rng, vocab.email_domains, n)
+        emails = [
+            f"{first.lower()}.{last.lower().replace(' ', '')}{i}@{domain}"
+            for first, last, i, domain in zip(
+                first_names, last_names, ids.tolist(), domains, strict=True
+            )
+        ]
+        phone_numbers = [
+            f"{a}-{b}-{c:04d}"
+            for a, b, c in zip(
+                rng.integers(201, 990, n).tolist(),
+                rng.integers(200, 1000, n).tolist(),
+                rng.integers(0, 10_000, n).tolist(),
+                strict=True,
+            )
+        ]
+        yield from zip(
+            first_names,
+            last_names,
+            birth_dates,
+            _pick(rng, vocab.street_addresses, n),
+            _pick(rng, vocab.cities, n),
+            _pick(rng, vocab.states, n),
+            np.char.zfill(rng.integers(501, 100_000, n).astype(str), 5).tolist(),
+            emails,
+            phone_numbers,
+            strict=True,
+        )
+
+
+def products(
+    vocab: Vocabulary, rng: np.random.Generator, count: int, start_id: int = 1
+) -> Iterator[tuple]:
+    """Yield `count` product rows with unique SKUs, numbered from `start_id`."""
+    for ids in _chunks(start_id, count):
+        n = len(ids)
+        suffixes = [
+            "".join(letters) for letters in _LETTERS[rng.integers(0, 26, (n, 3))]
+        ]
+        yield from zip(
+            [f"SKU-{i:06d}-{s}" for i, s in zip(ids.tolist(), suffixes, strict=True)],
+            _pick(rng, vocab.catch_phrases, n),
+            _pick(rng, vocab.sentences, n),
+            np.round(rng.uniform(4.99, 299.99, n), 2).tolist(),
+            rng.integers(0, 501, n).tolist(),
+            strict=True,
+        )
+
+
+def purchases(
+    rng: np.random.Generator,
+    count: int,
+    num_customers: int,
+    num_products: int,
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> Iterator[tuple]:
+    """Yield `count` purchase rows dated from `start_date` to `end_date` inclusive.
+
+    Purchases reference customer ids 1 to `num_customers` and product ids 1 to
+    `num_products`.
+    """
+    days = (end_date - start_date).days + 1
+    for ids in _chunks(1, count):
+        n = len(ids)
+        yield from zip(
+            rng.integers(1, num_customers + 1, n).tolist(),
+            rng.integers(1, num_products + 1, n).tolist(),
+            rng.integers(1, 6, n).tolist(),
+            _dates(start_date, rng.integers(0, days, n)),
+            strict=True,
+        )
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _chunks(start_id: int, count: int) -> Iterator[npt.NDArray[np.int64]]:
+    """Yield consecutive arrays of row ids, at most `CHUNK_ROWS` long."""
+    end_id = start_id + count
+    for chunk_start in range(start_id, end_id, CHUNK_ROWS):
+        yield np.arange(chunk_start, min(chunk_start + CHUNK_ROWS, end_id))
+
+
+def _pick(rng: np.random.Generator, pool: npt.NDArray[np.str_], n: int) -> list[str]:
+    """Pick `n` values from a pool, uniformly with replacement."""
+    return pool[rng.integers(0, len(pool), n)].tolist()
+
+
+def _dates(start: datetime.date, offsets: npt.NDArray[np.int64]) -> list[str]:
+    """Return ISO dates `offsets` days after `start`."""
+    return (np.datetime64(start, "D") + offsets).astype(str).tolist()
@@ -0,0 +1,124 @@
+"""Bulk loading of generated rows into a SQLite database.
+
+Rows are inserted in bounded batches, one transaction per batch, so memory use
+does not depend on table size. `bulk_load_pragmas` trades durability for speed
+while the database is being built: the file is written from scratch, so a crash
+only means building it again.
+"""
+
+import sqlite3
+from collections.abc import Callable, Iterable
+from itertools import islice
+
+DEFAULT_BATCH_SIZE = 50_000
+
+# Page cache used while loading, in KiB (negative values of cache_size are KiB).
+BULK_LOAD_CACHE_KIB = 256 * 1024
+
+SCHEMA = """
+    CREATE TABLE customers (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        first_name      TEXT NOT NULL,
+        last_name       TEXT NOT NULL,
+        birth_date      TEXT NOT NULL,
+        street_address  TEXT NOT NULL,
+        city            TEXT NOT NULL,
+        state           TEXT NOT NULL,
+        zip_code        TEXT NOT NULL,
+        email           TEXT NOT NULL UNIQUE,
+        phone_number    TEXT NOT NULL
+    );
+
+    CREATE TABLE products (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        sku             TEXT NOT NULL UNIQUE,
+        name            TEXT NOT NULL,
+        description     TEXT NOT NULL,
+        cost            REAL NOT NULL,
+        in_stock_qty    INTEGER NOT NULL
+    );
+
+    CREATE TABLE purchases (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        customer_id     INTEGER NOT NULL REFERENCES customers(id),
+        product_id      INTEGER NOT NULL REFERENCES products(id),
+        qty_purchased   INTEGER NOT NULL,
+        purchase_date   TEXT NOT NULL
+    );
+"""
+
+# Columns supplied by the row generators, per table (ids are assigned by SQLite).
+TABLES: dict[str, tuple[str, ...]] = {
+    "customers": (
+        "first_name",
+        "last_name",
+        "birth_date",
+        "street_address",
+        "city",
+        "state",
+        "zip_code",
+        "email",
+        "phone_number",
+    ),
+    "products": ("sku", "name", "description", "cost", "in_stock_qty"),
+    "purchases": ("customer_id", "product_id", "qty_purchased", "purchase_date"),
+}
+
+
+def bulk_load_pragmas(conn: sqlite3.Connection) -> None:
+    """Configure a connection for fast, non-durable bulk loading."""
+    conn.executescript(
+        f"""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        PRAGMA locking_mode = EXCLUSIVE;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -{BULK_LOAD_CACHE_KIB};
+        """
+    )
+
+
+def insert_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    rows: Iterable[tuple],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    on_batch: Callable[[int], None] | None = None,
+    start_id: int | None = None,
+    commit: bool = True,
+) -> int:
+    """Insert rows into a table in batches, committing after each batch.
+
+    Args:
+        conn: Connection to the database.
+        table: Table name; a key of `TABLES`.
+        rows: Row tuples in the column order of `TABLES[table]`. Consumed lazily.
+        batch_size: Rows per transaction.
+        on_batch: Called with the number of rows in each committed batch.
+        start_id: If set, rows get explicit ids counting up from `start_id` instead
+            of ids assigned by SQLite.
+        commit: Whether to commit each batch. If False, rows are inserted in the
+            caller's transaction.
+
+    Returns:
+        The number of rows inserted.
+    """
+    columns = TABLES[table]
+    if start_id is not None:
+        columns = ("id", *columns)
+        rows = ((row_id, *row) for row_id, row in enumerate(rows, start_id))
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' * len(columns))})"
+    )
+
+    rows = iter(rows)
+    total = 0
+    while batch := list(islice(rows, batch_size)):
+        conn.executemany(sql, batch)
+        if commit:
+            conn.commit()
+        total += len(batch)
+        if on_batch is not None:
+            on_batch(len(batch))
+    return total
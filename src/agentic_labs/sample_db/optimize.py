@@ -0,0 +1,123 @@
+"""Secondary indexes, planner statistics, and rollup tables for the sample database.
+
+The database agent joins `purchases` to `customers` and `products` and filters
+purchases by date. Without indexes each of those queries scans the whole
+purchases table. `create_indexes` indexes the foreign keys and purchase dates,
+and `analyze` gathers the statistics SQLite's query planner uses to pick them.
+
+`create_rollups` materializes two summary tables the agent can query instead of
+aggregating purchases: daily sales per product and lifetime value per customer.
+Their definitions carry SQL comments, which the agent sees in the schema. Each
+rollup is filled by an upsert that aggregates purchases from a given id onward,
+so `refresh_rollups` can fold in appended purchases without a rebuild.
+"""
+
+import sqlite3
+
+# Product lookups carry the date so that "product X in period Y" is one range, and
+# the date index covers per-product sales so date-bounded aggregates skip the table.
+INDEXES = {
+    "purchases_customer_id": "purchases (customer_id)",
+    "purchases_product_id": "purchases (product_id, purchase_date)",
+    "purchases_purchase_date": "purchases (purchase_date, product_id, qty_purchased)",
+}
+
+ROLLUPS = {
+    "daily_product_sales": (
+        """
+        CREATE TABLE daily_product_sales (
+            -- Pre-aggregated purchases: one row per product per day with sales.
+            -- Revenue is quantity times the product's current cost.
+            purchase_date   TEXT NOT NULL,
+            product_id      INTEGER NOT NULL REFERENCES products(id),
+            num_purchases   INTEGER NOT NULL,
+            units_sold      INTEGER NOT NULL,
+            revenue         REAL NOT NULL,
+            PRIMARY KEY (purchase_date, product_id)
+        ) WITHOUT ROWID
+        """,
+        """
+        INSERT INTO daily_product_sales
+        SELECT p.purchase_date, p.product_id, COUNT(*), SUM(p.qty_purchased),
+               ROUND(SUM(p.qty_purchased * pr.cost), 2)
+        FROM purchases p JOIN products pr ON pr.id = p.product_id
+        WHERE p.id >= :first_purchase_id
+        GROUP BY p.purchase_date, p.product_id
+        ON CONFLICT (purchase_date, product_id) DO UPDATE SET
+            num_purchases = num_purchases + excluded.num_purchases,
+            units_sold = units_sold + excluded.units_sold,
+            revenue = ROUND(revenue + excluded.revenue, 2)
+        """,
+    ),
+    "customer_lifetime_value": (
+        """
+        CREATE TABLE customer_lifetime_value (
+            -- Pre-aggregated purchases: one row per customer with purchases.
+            -- Total spent is quantity times each product's current cost.
+            customer_id          INTEGER PRIMARY KEY REFERENCES customers(id),
+            num_purchases        INTEGER NOT NULL,
+            units_purchased      INTEGER NOT NULL,
+            total_spent          REAL NOT NULL,
+            first_purchase_date  TEXT NOT NULL,
+            last_purchase_date   TEXT NOT NULL
+        )
+        """,
+        """
+        INSERT INTO customer_lifetime_value
+        SELECT p.customer_id, COUNT(*), SUM(p.qty_purchased),
+               ROUND(SUM(p.qty_purchased * pr.cost), 2),
+               MIN(p.purchase_date), MAX(p.purchase_date)
+        FROM purchases p JOIN products pr ON pr.id = p.product_id
+        WHERE p.id >= :first_purchase_id
+        GROUP BY p.customer_id
+        ON CONFLICT (customer_id) DO UPDATE SET
+            num_purchases = num_purchases + excluded.num_purchases,
+            units_purchased = units_purchased + excluded.units_purchased,
+            total_spent = ROUND(total_spent + excluded.total_spent, 2),
+            first_purchase_date = MIN(first_purchase_date, excluded.first_purchase_date),
+            last_purchase_date = MAX(last_purchase_date, excluded.last_purchase_date)
+        """,
+    ),
+}
+
+
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """Create the secondary indexes of the purchases table."""
+    with conn:
+        for name, columns in INDEXES.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+
+def create_rollups(conn: sqlite3.Connection) -> None:
+    """Create and populate the rollup tables from the purchases table."""
+    with conn:
+        for name, (ddl, aggregate) in ROLLUPS.items():
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(ddl)
+            conn.execute(aggregate, {"first_purchase_id": 1})
+
+
+def refresh_rollups(conn: sqlite3.Connection, first_purchase_id: int) -> list[str]:
+    """Add purchases from `first_purchase_id` onward to the existing rollup tables.
+
+    Runs in the caller's transaction.
+
+    Returns:
+        The names of the rollup tables that were refreshed.
+    """
+    existing = {
+        name
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+    refreshed = []
+    for name, (_, aggregate) in ROLLUPS.items():
+        if name in existing:
+            conn.execute(aggregate, {"first_purchase_id": first_purchase_id})
+            refreshed.append(name)
+    return refreshed
+
+
+def analyze(conn: sqlite3.Connection) -> None:
+    """Gather query planner statistics for every table and index."""
+    conn.execute("ANALYZE")
+    conn.commit()
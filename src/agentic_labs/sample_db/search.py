@@ -0,0 +1,67 @@
+"""Full-text search indexes over the sample database's text columns.
+
+Finding "products about X" with `LIKE '%x%'` scans every row of the table, and
+cannot rank the rows it finds. `create_search_indexes` builds an FTS5 table over
+product names and descriptions and one over customer names and cities, which
+answer such lookups from an inverted index and rank matches by BM25.
+
+The FTS5 tables are external-content tables: they index the text but read it
+back from the source tables, so the text is not stored twice. Such tables are
+not updated automatically, so `refresh_search_indexes` indexes rows appended to
+the source tables.
+"""
+
+import sqlite3
+
+# FTS5 table name: (source table, indexed columns).
+SEARCH_INDEXES = {
+    "products_search": ("products", ("name", "description")),
+    "customers_search": ("customers", ("first_name", "last_name", "city")),
+}
+
+# Porter stemming lets "running" match "run"; unicode61 folds case and accents.
+TOKENIZER = "porter unicode61"
+
+
+def create_search_indexes(conn: sqlite3.Connection) -> None:
+    """Create and populate the full-text search tables."""
+    with conn:
+        for name, (table, columns) in SEARCH_INDEXES.items():
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
+            conn.execute(
+                f"CREATE VIRTUAL TABLE {name} USING fts5("
+                f"{', '.join(columns)}, content='{table}', content_rowid='id', "
+                f"tokenize='{TOKENIZER}')"
+            )
+            conn.execute(f"INSERT INTO {name}({name}) VALUES ('rebuild')")
+
+
+def refresh_search_indexes(
+    conn: sqlite3.Connection, first_ids: dict[str, int]
+) -> list[str]:
+    """Index rows of the source tables from the given ids onward.
+
+    Runs in the caller's transaction.
+
+    Args:
+        conn: Connection to the database.
+        first_ids: First new id of each source table.
+
+    Returns:
+        The names of the search tables that were refreshed.
+    """
+    existing = {
+        name
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")
+    }
+    refreshed = []
+    for name, (table, columns) in SEARCH_INDEXES.items():
+        if name in existing:
+            column_list = ", ".join(columns)
+            conn.execute(
+                f"INSERT INTO {name}(rowid, {column_list}) "
+                f"SELECT id, {column_list} FROM {table} WHERE id >= ?",
+                (first_ids[table],),
+            )
+            refreshed.append(name)
+    return refreshed
@@ -0,0 +1,181 @@
+"""Parallel database generation in shards merged with ATTACH.
+
+A database is split into shards, each covering a disjoint range of customer,
+product, and purchase ids and drawing from its own random streams. Worker
+processes write the shards to separate SQLite files. `merge_shard` then copies
+them into the target database with `ATTACH` and `INSERT … SELECT`. Purchases in
+every shard reference the full customer and product id ranges, and rows keep
+their ids when merged, so references stay consistent across shards.
+
+A single shard covering every id is how the database is built without workers.
+"""
+
+import datetime
+import sqlite3
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from agentic_labs.sample_db import generate
+from agentic_labs.sample_db.load import (
+    DEFAULT_BATCH_SIZE,
+    SCHEMA,
+    TABLES,
+    bulk_load_pragmas,
+    insert_rows,
+)
+
+
+@dataclass(frozen=True)
+class IdRange:
+    """Ids `start` to `start + count - 1` of one table."""
+
+    start: int
+    count: int
+
+
+@dataclass(frozen=True)
+class Shard:
+    """The part of a database generated by one worker.
+
+    Attributes:
+        index: Shard number; selects the shard's random streams.
+        customers: Customer ids generated by this shard.
+        products: Product ids generated by this shard.
+        purchases: Purchase ids generated by this shard.
+        num_customers: Customers in the whole database (referenced by purchases).
+        num_products: Products in the whole database (referenced by purchases).
+        seed: Seed of the whole database.
+        today: Date the database is generated as of.
+        purchases_from: First date of the purchase history.
+    """
+
+    index: int
+    customers: IdRange
+    products: IdRange
+    purchases: IdRange
+    num_customers: int
+    num_products: int
+    seed: int
+    today: datetime.date
+    purchases_from: datetime.date
+
+    def tables(
+        self, vocab: generate.Vocabulary
+    ) -> list[tuple[str, IdRange, Iterator[tuple]]]:
+        """Return each table's id range and row generator for this shard."""
+
+        def rng(table: str):
+            return generate.table_rng(self.seed, table, self.index)
+
+        return [
+            (
+                "customers",
+                self.customers,
+                generate.customers(
+                    vocab,
+                    rng("customers"),
+                    self.customers.count,
+                    self.customers.start,
+                    today=self.today,
+                ),
+            ),
+            (
+                "products",
+                self.products,
+                generate.products(
+                    vocab, rng("products"), self.products.count, self.products.start
+                ),
+            ),
+            (
+                "purchases",
+                self.purchases,
+                generate.purchases(
+                    rng("purchases"),
+                    self.purchases.count,
+                    self.num_customers,
+                    self.num_products,
+                    start_date=self.purchases_from,
+                    end_date=self.today,
+                ),
+            ),
+        ]
+
+
+def plan_shards(
+    num_customers: int,
+    num_products: int,
+    num_purchases: int,
+    num_shards: int,
+    seed: int,
+    today: datetime.date,
+    purchases_from: datetime.date,
+) -> list[Shard]:
+    """Split a database into `num_shards` shards of near-equal size."""
+    customers = _split(num_customers, num_shards)
+    products = _split(num_products, num_shards)
+    purchases = _split(num_purchases, num_shards)
+    return [
+        Shard(
+            index=i,
+            customers=customers[i],
+            products=products[i],
+            purchases=purchases[i],
+            num_customers=num_customers,
+            num_products=num_products,
+            seed=seed,
+            today=today,
+            purchases_from=purchases_from,
+        )
+        for i in range(num_shards)
+    ]
+
+
+# --------------------------------------------------------------------------------------
+# Writing and Merging
+# --------------------------------------------------------------------------------------
+
+
+def write_shard(
+    path: Path,
+    shard: Shard,
+    vocab: generate.Vocabulary,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Path:
+    """Write a shard to its own database file; run in a worker process."""
+    conn = sqlite3.connect(path)
+    try:
+        bulk_load_pragmas(conn)
+        conn.executescript(SCHEMA)
+        for table, ids, rows in shard.tables(vocab):
+            insert_rows(conn, table, rows, batch_size, start_id=ids.start)
+    finally:
+        conn.close()
+    return path
+
+
+def merge_shard(conn: sqlite3.Connection, shard_path: Path) -> None:
+    """Copy every table of a shard database into the database of `conn`."""
+    conn.execute("ATTACH DATABASE ? AS shard", (str(shard_path),))
+    try:
+        with conn:
+            for table, columns in TABLES.items():
+                column_list = ", ".join(("id", *columns))
+                conn.execute(
+                    f"INSERT INTO main.{table} ({column_list}) "
+                    f"SELECT {column_list} FROM shard.{table} ORDER BY id"
+                )
+    finally:
+        conn.execute("DETACH DATABASE shard")
+
+
+def _split(count: int, parts: int) -> list[IdRange]:
+    """Split ids 1 to `count` into `parts` consecutive ranges."""
+    size, remainder = divmod(count, parts)
+    ranges = []
+    start = 1
+    for i in range(parts):
+        part = size + (i < remainder)
+        ranges.append(IdRange(start, part))
+        start += part
+    return ranges
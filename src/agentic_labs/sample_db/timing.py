@@ -0,0 +1,122 @@
+"""Timing of representative database agent queries.
+
+`AGENT_QUERIES` are the kinds of questions the database agent lab asks: a
+customer's history, a product's buyers, recent sales, and top customers. Each
+query has a form that reads the base tables and, where a rollup table answers
+the same question, a form that reads the rollup. `time_queries` runs them so
+that the sample database can be compared with and without its indexes and
+rollups.
+"""
+
+import datetime
+import sqlite3
+import time
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AgentQuery:
+    """A representative agent query.
+
+    Attributes:
+        name: Short description shown in the timing report.
+        sql: Query against the base tables. May use the :as_of parameter.
+        rollup_sql: Equivalent query against the rollup tables, if any.
+    """
+
+    name: str
+    sql: str
+    rollup_sql: str | None = None
+
+
+AGENT_QUERIES = [
+    AgentQuery(
+        "Purchase history of one customer",
+        """
+        SELECT p.purchase_date, pr.name, p.qty_purchased
+        FROM purchases p JOIN products pr ON pr.id = p.product_id
+        WHERE p.customer_id = 1
+        ORDER BY p.purchase_date DESC
+        """,
+    ),
+    AgentQuery(
+        "Customers who bought one product",
+        """
+        SELECT DISTINCT c.first_name, c.last_name, c.email
+        FROM purchases p JOIN customers c ON c.id = p.customer_id
+        WHERE p.product_id = 1
+        """,
+    ),
+    AgentQuery(
+        "Units sold per product, last 30 days",
+        """
+        SELECT product_id, SUM(qty_purchased) AS units
+        FROM purchases
+        WHERE purchase_date > date(:as_of, '-30 days')
+        GROUP BY product_id ORDER BY units DESC LIMIT 10
+        """,
+        """
+        SELECT product_id, SUM(units_sold) AS units
+        FROM daily_product_sales
+        WHERE purchase_date > date(:as_of, '-30 days')
+        GROUP BY product_id ORDER BY units DESC LIMIT 10
+        """,
+    ),
+    AgentQuery(
+        "Daily revenue, last 7 days",
+        """
+        SELECT p.purchase_date, ROUND(SUM(p.qty_purchased * pr.cost), 2)
+        FROM purchases p JOIN products pr ON pr.id = p.product_id
+        WHERE p.purchase_date > date(:as_of, '-7 days')
+        GROUP BY p.purchase_date
+        """,
+        """
+        SELECT purchase_date, ROUND(SUM(revenue), 2)
+        FROM daily_product_sales
+        WHERE purchase_date > date(:as_of, '-7 days')
+        GROUP BY purchase_date
+        """,
+    ),
+    AgentQuery(
+        "Top 5 customers by total spend",
+        """
+        SELECT c.first_name, c.last_name, SUM(p.qty_purchased * pr.cost) AS spent
+        FROM purchases p
+        JOIN customers c ON c.id = p.customer_id
+        JOIN products pr ON pr.id = p.product_id
+        GROUP BY p.customer_id ORDER BY spent DESC LIMIT 5
+        """,
+        """
+        SELECT c.first_name, c.last_name, v.total_spent AS spent
+        FROM customer_lifetime_value v JOIN customers c ON c.id = v.customer_id
+        ORDER BY spent DESC LIMIT 5
+        """,
+    ),
+]
+
+
+def time_queries(
+    conn: sqlite3.Connection,
+    as_of: datetime.date,
+    rollups: bool = False,
+    repeat: int = 3,
+) -> list[float | None]:
+    """Return the best of `repeat` run times (seconds) of each agent query.
+
+    With `rollups`, queries are run in their rollup form; queries without one
+    get None.
+    """
+    timings = []
+    for query in AGENT_QUERIES:
+        sql = query.rollup_sql if rollups else query.sql
+        if sql is None:
+            timings.append(None)
+            continue
+
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, {"as_of": as_of.isoformat()}).fetchall()
+            best = min(best, time.perf_counter() - start)
+        timings.append(best)
+    return timings
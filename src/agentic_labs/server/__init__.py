@@ -0,0 +1 @@
+"""Local LLM server components used by the `agentic-labs local-llm` command."""
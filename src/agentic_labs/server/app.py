@@ -0,0 +1,223 @@
+"""FastAPI application for the local LLM server.
+
+Builds on llama-cpp-python's OpenAI-compatible router, but replaces its
+single-model `LlamaProxy` with a `ResidentModelPool` so one server process can
+keep several models loaded at once, and replaces its completion routes with
+slot-scheduled routes so several requests can decode in parallel.
+"""
+
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.middleware import Middleware
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from llama_cpp.llama_cache import BaseLlamaCache
+from llama_cpp.server import app as llama_app
+from llama_cpp.server.errors import RouteErrorHandler
+from llama_cpp.server.settings import ModelSettings, ServerSettings
+from starlette_context.middleware import RawContextMiddleware
+from starlette_context.plugins import RequestIdPlugin
+
+from agentic_labs.server import routes
+from agentic_labs.server.completion_cache import CompletionCache
+from agentic_labs.server.metrics import CONTENT_TYPE, ServerMetrics
+from agentic_labs.server.residency import ResidentModelPool
+from agentic_labs.server.scheduler import SlotScheduler
+
+router = APIRouter(route_class=RouteErrorHandler)
+
+
+# --------------------------------------------------------------------------------------
+# Application Factory
+# --------------------------------------------------------------------------------------
+
+
+def create_app(
+    server_settings: ServerSettings,
+    model_settings: list[ModelSettings],
+    memory_budget_bytes: int | None = None,
+    cache_factory: Callable[[ModelSettings], BaseLlamaCache] | None = None,
+    slots: int = 1,
+    max_queue: int = 32,
+    max_queue_wait_seconds: float = 30.0,
+    draft_settings: ModelSettings | None = None,
+    num_draft_tokens: int = 4,
+    completion_cache: CompletionCache | None = None,
+) -> FastAPI:
+    """Create the local LLM server application.
+
+    Args:
+        server_settings: Host, port, and API key settings for the server.
+        model_settings: Settings for every servable model; the first is the default.
+        memory_budget_bytes: Maximum estimated memory for resident models, or `None`
+            to keep every requested model loaded.
+        cache_factory: Optional callable that builds a prompt-prefix cache from a
+            model's settings.
+        slots: Number of requests that may decode in parallel. Each slot gets its
+            own replica of a model when it first serves that model.
+        max_queue: Maximum number of requests waiting for a slot.
+        max_queue_wait_seconds: Maximum time a request waits for a slot before the
+            server answers 429 Too Many Requests.
+        draft_settings: Optional settings of a small model that drafts tokens for
+            speculative decoding of the other served models.
+        num_draft_tokens: Number of tokens drafted per decode step.
+        completion_cache: Optional cache that replays responses to repeated
+            deterministic requests.
+
+    Returns:
+        A FastAPI application serving the OpenAI-compatible API.
+    """
+    llama_app.set_server_settings(server_settings)
+
+    pool = ResidentModelPool(
+        model_settings,
+        memory_budget_bytes=memory_budget_bytes,
+        cache_factory=cache_factory,
+        draft_settings=draft_settings,
+        num_draft_tokens=num_draft_tokens,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        yield
+        pool.free()
+        if completion_cache is not None:
+            completion_cache.close()
+
+    app = FastAPI(
+        lifespan=lifespan,
+        middleware=[Middleware(RawContextMiddleware, plugins=(RequestIdPlugin(),))],
+        title="Agentic Labs Local LLM Server",
+        root_path=server_settings.root_path,
+    )
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # llama-cpp-python's remaining routes (such as /v1/models) get the pool.
+    app.dependency_overrides[llama_app.get_llama_proxy] = lambda: pool
+    app.state.model_pool = pool
+    app.state.scheduler = SlotScheduler(
+        slots=slots,
+        max_queue=max_queue,
+        max_wait_seconds=max_queue_wait_seconds,
+    )
+    app.state.metrics = ServerMetrics()
+    app.state.completion_cache = completion_cache
+    # Keep-alive pings for streamed responses; `None` uses the default comment.
+    app.state.ping_message_factory = (
+        (lambda: b"") if server_settings.disable_ping_events else None
+    )
+
+    # Registered first, so these routes take precedence over llama-cpp-python's.
+    app.include_router(routes.router)
+    app.include_router(router)
+    app.include_router(llama_app.router)
+
+    return app
+
+
+# --------------------------------------------------------------------------------------
+# Extra Routes
+# --------------------------------------------------------------------------------------
+
+
+@router.get(
+    "/metrics",
+    summary="Prometheus Metrics",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=["Extras"],
+)
+async def metrics(request: Request) -> Response:
+    """Return latency, token, queue, KV cache, and model load metrics.
+
+    Uses the Prometheus text exposition format. Scrape it with the server's API key
+    as a bearer token.
+    """
+    server_metrics: ServerMetrics = request.app.state.metrics
+    return Response(
+        content=server_metrics.render(
+            request.app.state.model_pool,
+            request.app.state.scheduler,
+            request.app.state.completion_cache,
+        ),
+        media_type=CONTENT_TYPE,
+    )
+
+
+@router.get(
+    "/extras/models/stats",
+    summary="Model Residency Stats",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=["Extras"],
+)
+async def model_stats(request: Request) -> dict:
+    """Return per-model load times, cache hits/misses, and evictions."""
+    pool: ResidentModelPool = request.app.state.model_pool
+    return {
+        "memory_budget_bytes": pool.memory_budget_bytes,
+        "resident_bytes": pool.resident_bytes(),
+        "models": pool.stats(),
+    }
+
+
+@router.get(
+    "/extras/prefix-cache/stats",
+    summary="Prefix Cache Stats",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=["Extras"],
+)
+async def prefix_cache_stats(request: Request) -> dict:
+    """Return per-model prompt-prefix cache hit rates and matched prefix tokens.
+
+    `prefix_tokens_matched` counts the prompt tokens covered by the cached states
+    returned. It is an upper bound on the prefill tokens saved: a replica that has
+    already evaluated part of the prompt only skips the tokens beyond that part.
+    """
+    pool: ResidentModelPool = request.app.state.model_pool
+    return {
+        alias: cache.stats() if hasattr(cache, "stats") else {}
+        for alias, cache in pool.caches().items()
+    }
+
+
+@router.get(
+    "/extras/scheduler/stats",
+    summary="Scheduler Stats",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=["Extras"],
+)
+async def scheduler_stats(request: Request) -> dict:
+    """Return decode-slot usage, queue depth, and admission counters."""
+    scheduler: SlotScheduler = request.app.state.scheduler
+    return scheduler.stats()
+
+
+@router.get(
+    "/extras/speculative/stats",
+    summary="Speculative Decoding Stats",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=["Extras"],
+)
+async def speculative_stats(request: Request) -> dict:
+    """Return drafted and accepted token totals per served model."""
+    pool: ResidentModelPool = request.app.state.model_pool
+    return pool.draft_stats()
+
+
+@router.get(
+    "/extras/completion-cache/stats",
+    summary="Completion Cache Stats",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=["Extras"],
+)
+async def completion_cache_stats(request: Request) -> dict:
+    """Return completion cache hits, misses, and occupancy."""
+    completion_cache: CompletionCache | None = request.app.state.completion_cache
+    return completion_cache.stats() if completion_cache is not None else {}
@@ -0,0 +1,299 @@
+"""Hardware autotuning of llama.cpp runtime settings for the local LLM server.
+
+The best thread counts, batch sizes, memory mapping, and attention kernel depend on
+the host's cores, caches, and memory bandwidth, so llama-cpp-python's defaults
+often leave throughput unused. `autotune` benchmarks candidate settings for one
+model and context window, measuring prefill and decode tokens/s, and returns the
+fastest `RuntimeProfile`. Profiles are saved per host, model, and context window,
+so later runs on the same machine pick them up without re-tuning.
+
+A full grid over every setting would need hundreds of model loads. Instead each
+setting is swept in turn while the others stay at their best value so far
+(coordinate descent), which needs only a few dozen loads.
+
+The first generation after a load pays for page faults on the weights, kernel
+setup, and cold caches, so each profile is warmed up with one unmeasured
+generation and then timed over several runs, keeping the median.
+"""
+
+import json
+import logging
+import os
+import socket
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Any
+
+from llama_cpp.server.model import LlamaProxy
+from llama_cpp.server.settings import ModelSettings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_PATH = (
+    Path.home() / ".config" / "agentic-labs" / "runtime-profiles.json"
+)
+
+# A typical agent turn: a long prompt (system prompt, tools, history) and a short
+# answer. Profiles are ranked by their estimated latency for this request.
+REFERENCE_PROMPT_TOKENS = 512
+REFERENCE_DECODE_TOKENS = 64
+
+# Timed runs per profile, after one warm-up run; the median of each speed is kept.
+BENCHMARK_RUNS = 3
+
+_BENCHMARK_TEXT = (
+    "An agent reads the tool descriptions, plans the next step, calls a tool, "
+    "inspects the result, and decides whether the task is complete. "
+)
+
+
+# --------------------------------------------------------------------------------------
+# Runtime Profile
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class RuntimeProfile:
+    """llama.cpp runtime settings and the throughput they achieved.
+
+    Thread counts are for a single decode slot using the whole machine.
+    """
+
+    n_threads: int
+    n_threads_batch: int
+    n_batch: int = 512
+    n_ubatch: int = 512
+    use_mmap: bool = True
+    use_mlock: bool = False
+    flash_attn: bool = False
+    prefill_tokens_per_second: float = 0.0
+    decode_tokens_per_second: float = 0.0
+
+    @property
+    def reference_seconds(self) -> float:
+        """Estimated latency of the reference request with this profile."""
+        if not self.prefill_tokens_per_second or not self.decode_tokens_per_second:
+            return float("inf")
+        return (
+            REFERENCE_PROMPT_TOKENS / self.prefill_tokens_per_second
+            + REFERENCE_DECODE_TOKENS / self.decode_tokens_per_second
+        )
+
+    def settings(self) -> dict[str, Any]:
+        """Return the `ModelSettings` fields of this profile."""
+        return {
+            "n_threads": self.n_threads,
+            "n_threads_batch": self.n_threads_batch,
+            "n_batch": self.n_batch,
+            "n_ubatch": self.n_ubatch,
+            "use_mmap": self.use_mmap,
+            "use_mlock": self.use_mlock,
+            "flash_attn": self.flash_attn,
+        }
+
+    def apply(self, settings: ModelSettings, slots: int = 1) -> ModelSettings:
+        """Return a copy of `settings` using this profile, sharing threads by slot."""
+        update = self.settings()
+        update["n_threads"] = max(1, self.n_threads // slots)
+        update["n_threads_batch"] = max(1, self.n_threads_batch // slots)
+        return settings.model_copy(update=update)
+
+
+# --------------------------------------------------------------------------------------
+# Profile Storage
+# --------------------------------------------------------------------------------------
+
+
+def profile_key(model_path: str, context_window: int) -> str:
+    """Key a profile by host, GGUF file name, and context window."""
+    return f"{socket.gethostname()}:{Path(model_path).name}:{context_window}"
+
+
+def load_profile(
+    model_path: str, context_window: int, path: Path = DEFAULT_PROFILE_PATH
+) -> RuntimeProfile | None:
+    """Return the saved profile for this host, model, and context window, if any."""
+    entry = _read_profiles(path).get(profile_key(model_path, context_window))
+    if entry is None:
+        return None
+
+    known = {f.name for f in fields(RuntimeProfile)}
+    try:
+        return RuntimeProfile(**{k: v for k, v in entry.items() if k in known})
+    except TypeError:
+        logger.warning("Ignoring malformed runtime profile in %s", path)
+        return None
+
+
+def save_profile(
+    profile: RuntimeProfile,
+    model_path: str,
+    context_window: int,
+    path: Path = DEFAULT_PROFILE_PATH,
+) -> None:
+    """Save a profile, replacing any previous one for the same key."""
+    profiles = _read_profiles(path)
+    profiles[profile_key(model_path, context_window)] = asdict(profile) | {
+        "tuned_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(profiles, indent=2, sort_keys=True) + "\n")
+    os.replace(tmp_path, path)
+
+
+def _read_profiles(path: Path) -> dict[str, dict[str, Any]]:
+    """Read all saved profiles, treating a missing or corrupt file as empty."""
+    try:
+        profiles = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable runtime profiles %s: %s", path, e)
+        return {}
+    return profiles if isinstance(profiles, dict) else {}
+
+
+# --------------------------------------------------------------------------------------
+# Autotuning
+# --------------------------------------------------------------------------------------
+
+
+def candidate_values(cpu_count: int, context_window: int) -> dict[str, list[Any]]:
+    """Return the values tried for each setting on this machine."""
+    threads = sorted(
+        {max(1, cpu_count * n // 4) for n in (1, 2, 3, 4)},
+    )
+    batches = [b for b in (256, 512, 1024, 2048) if b <= context_window] or [
+        context_window
+    ]
+    return {
+        "n_threads": threads,
+        "n_threads_batch": threads,
+        "n_batch": batches,
+        "n_ubatch": [u for u in (128, 256, 512) if u <= max(batches)],
+        "memory": [(True, False), (False, False), (True, True)],
+        "flash_attn": [False, True],
+    }
+
+
+def autotune(
+    settings: ModelSettings,
+    on_trial: Callable[[RuntimeProfile], None] | None = None,
+) -> RuntimeProfile:
+    """Find the fastest runtime profile for a model on this machine.
+
+    Args:
+        settings: Settings of the model to tune, including its context window.
+        on_trial: Called with each benchmarked profile, for progress reporting.
+
+    Returns:
+        The profile with the lowest estimated latency for the reference request.
+    """
+    cpu_count = os.cpu_count() or 1
+    candidates = candidate_values(cpu_count, settings.n_ctx)
+    best = RuntimeProfile(
+        n_threads=max(1, cpu_count // 2),
+        n_threads_batch=cpu_count,
+        n_batch=min(512, max(candidates["n_batch"])),
+        n_ubatch=min(512, max(candidates["n_ubatch"])),
+    )
+    tried: dict[tuple, RuntimeProfile] = {}
+
+    def trial(profile: RuntimeProfile) -> RuntimeProfile:
+        key = tuple(profile.settings().values())
+        if key not in tried:
+            tried[key] = benchmark(settings, profile)
+            if on_trial is not None:
+                on_trial(tried[key])
+        return tried[key]
+
+    best = trial(best)
+    for name, values in candidates.items():
+        for value in values:
+            if name == "memory":
+                update = {"use_mmap": value[0], "use_mlock": value[1]}
+            else:
+                update = {name: value}
+            profile = RuntimeProfile(**(best.settings() | update))
+            if profile.n_ubatch > profile.n_batch:
+                continue
+
+            result = trial(profile)
+            if result.reference_seconds < best.reference_seconds:
+                best = result
+
+    return best
+
+
+def benchmark(
+    settings: ModelSettings,
+    profile: RuntimeProfile,
+    prompt_tokens: int = REFERENCE_PROMPT_TOKENS,
+    decode_tokens: int = REFERENCE_DECODE_TOKENS,
+    runs: int = BENCHMARK_RUNS,
+) -> RuntimeProfile:
+    """Load the model with a profile and measure its prefill and decode speed.
+
+    One warm-up generation is run first and not measured. Each speed is the median
+    over `runs` timed generations.
+
+    Returns:
+        A copy of `profile` with measured throughput. A profile the model fails to
+        load or run with (for example, mlock beyond the memory limit) gets zero
+        throughput.
+    """
+    settings = profile.apply(settings).model_copy(
+        update={"logits_all": False, "verbose": False}
+    )
+    prompt_tokens = min(prompt_tokens, settings.n_ctx // 2)
+    decode_tokens = min(decode_tokens, settings.n_ctx - prompt_tokens)
+
+    try:
+        llama = LlamaProxy.load_llama_from_model_settings(settings)
+    except Exception as e:
+        logger.info("Skipping profile %s: %s", profile.settings(), e)
+        return RuntimeProfile(**profile.settings())
+
+    try:
+        text = _BENCHMARK_TEXT * (prompt_tokens // 16 + 1)
+        tokens = llama.tokenize(text.encode())[:prompt_tokens]
+
+        _generate(llama, tokens, decode_tokens)
+        timings = [_generate(llama, tokens, decode_tokens) for _ in range(runs)]
+    except Exception as e:
+        logger.info("Skipping profile %s: %s", profile.settings(), e)
+        return RuntimeProfile(**profile.settings())
+    finally:
+        llama.close()
+
+    return RuntimeProfile(
+        **profile.settings(),
+        prefill_tokens_per_second=statistics.median(
+            len(tokens) / prefill for prefill, _ in timings
+        ),
+        decode_tokens_per_second=statistics.median(
+            decode_tokens / decode for _, decode in timings
+        ),
+    )
+
+
+def _generate(llama: Any, tokens: list[int], decode_tokens: int) -> tuple[float, float]:
+    """Prefill `tokens` from an empty context, then decode greedily.
+
+    Returns:
+        The prefill and decode times in seconds.
+    """
+    llama.reset()
+    start = time.perf_counter()
+    llama.eval(tokens)
+    prefill_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(decode_tokens):
+        llama.eval([llama.sample(top_k=1)])
+    return prefill_seconds, time.perf_counter() - start
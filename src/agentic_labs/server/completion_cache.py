@@ -0,0 +1,172 @@
+"""Deterministic completion cache for the local LLM server.
+
+Regression runs of the lab agents send the same prompts with greedy sampling over
+and over, and each one costs a full generation. When a request's sampling is
+deterministic (temperature 0 or a fixed seed), its response depends only on the
+model and the request, so `CompletionCache` stores it on disk and replays it on
+the next identical request without touching the model.
+
+Entries live in a SQLite database, capped in bytes and evicted
+least-recently-used. Streamed responses are stored as their list of chunks and
+replayed at full speed.
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "agentic-labs" / "completion-cache"
+
+# Request fields that do not change the generated output.
+_IGNORED_FIELDS = {"model", "user"}
+
+
+def is_deterministic(kwargs: dict[str, Any]) -> bool:
+    """Return True if a request's sampling always produces the same output."""
+    temperature = kwargs.get("temperature")
+    return (temperature is not None and temperature <= 0) or (
+        kwargs.get("seed") is not None
+    )
+
+
+# --------------------------------------------------------------------------------------
+# Completion Cache
+# --------------------------------------------------------------------------------------
+
+
+class CompletionCache:
+    """An on-disk cache of deterministic completion responses.
+
+    Args:
+        cache_dir: Directory holding the cache database.
+        capacity_bytes: Maximum bytes of stored responses.
+    """
+
+    def __init__(
+        self, cache_dir: Path = DEFAULT_CACHE_DIR, capacity_bytes: int = 1 << 30
+    ) -> None:
+        self.capacity_bytes = capacity_bytes
+        self.hits = 0
+        self.misses = 0
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            cache_dir / "completions.sqlite3",
+            check_same_thread=False,
+            isolation_level=None,
+        )
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS completions_last_used
+                ON completions (last_used);
+            """
+        )
+
+    @staticmethod
+    def key(model_settings: dict[str, Any], kwargs: dict[str, Any]) -> str:
+        """Hash the model and the request into a cache key.
+
+        The model file and chat format determine how the request is rendered into
+        a prompt, so together with the request they identify the output.
+        """
+        request = {k: v for k, v in kwargs.items() if k not in _IGNORED_FIELDS}
+        material = json.dumps(
+            {
+                "model": model_settings.get("model"),
+                "chat_format": model_settings.get("chat_format"),
+                "request": request,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        """Return a cached response (a dict, or a list of stream chunks)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE completions SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return json.loads(row[0])
+
+    def put(self, key: str, model: str, response: Any) -> None:
+        """Store a response and evict least-recently-used entries over capacity."""
+        data = json.dumps(response)
+        if len(data) > self.capacity_bytes:
+            return
+
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                    (key, model, data, len(data), time.time()),
+                )
+                self._evict()
+            except sqlite3.Error as e:
+                logger.warning("Failed to store completion: %s", e)
+
+    def stats(self) -> dict:
+        """Return hit/miss counts and occupancy."""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions"
+            ).fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": size,
+                "capacity_bytes": self.capacity_bytes,
+            }
+
+    def close(self) -> None:
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+
+    def _evict(self) -> None:
+        """Delete least-recently-used entries until the cache fits its capacity."""
+        (size,) = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM completions"
+        ).fetchone()
+        if size <= self.capacity_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM completions ORDER BY last_used"
+        ).fetchall()
+        evicted = []
+        for key, entry_size in rows:
+            if size <= self.capacity_bytes:
+                break
+            evicted.append((key,))
+            size -= entry_size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", evicted)
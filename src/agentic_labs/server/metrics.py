@@ -0,0 +1,383 @@
+"""Prometheus metrics for the local LLM server.
+
+Request-level measurements (time to first token, inter-token latency, token
+counts) are recorded as requests run. Server state (slot usage, queue depth, KV
+cache occupancy, model loads) is read from the scheduler and model pool when
+`/metrics` is scraped. Everything is rendered in the Prometheus text exposition
+format, so no client library is needed.
+"""
+
+import bisect
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from agentic_labs.server.completion_cache import CompletionCache
+from agentic_labs.server.residency import ResidentModelPool
+from agentic_labs.server.scheduler import SlotScheduler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+NAMESPACE = "agentic_labs_llm"
+
+TTFT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+INTER_TOKEN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+# --------------------------------------------------------------------------------------
+# Instruments
+# --------------------------------------------------------------------------------------
+
+
+class Counter:
+    """A monotonically increasing count, per label set."""
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._values: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add `amount` to the count for `labels`."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        """Return the exposition lines of this counter."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(_sample(self.name, labels, value))
+        return lines
+
+
+class Histogram:
+    """A distribution of observed values in cumulative buckets, per label set."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._counts: dict[Labels, list[int]] = {}
+        self._sums: dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for `labels`."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def render(self) -> list[str]:
+        """Return the exposition lines of this histogram."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, counts in self._counts.items():
+                cumulative = 0
+                for bound, count in zip(
+                    (*self.buckets, float("inf")), counts, strict=True
+                ):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(
+                        _sample(
+                            f"{self.name}_bucket", (*labels, ("le", le)), cumulative
+                        )
+                    )
+                lines.append(_sample(f"{self.name}_sum", labels, self._sums[labels]))
+                lines.append(_sample(f"{self.name}_count", labels, cumulative))
+        return lines
+
+
+# --------------------------------------------------------------------------------------
+# Server Metrics
+# --------------------------------------------------------------------------------------
+
+
+class ServerMetrics:
+    """Request metrics recorded by the completion routes."""
+
+    def __init__(self) -> None:
+        self.time_to_first_token = Histogram(
+            f"{NAMESPACE}_time_to_first_token_seconds",
+            "Time from request arrival (including queueing) to the first streamed "
+            "token, or to the whole response for non-streamed requests.",
+            TTFT_BUCKETS,
+        )
+        self.inter_token_latency = Histogram(
+            f"{NAMESPACE}_inter_token_latency_seconds",
+            "Time between consecutive streamed tokens (streamed requests only).",
+            INTER_TOKEN_BUCKETS,
+        )
+        self.requests = Counter(
+            f"{NAMESPACE}_requests_total",
+            "Completion requests, by model and outcome.",
+        )
+        self.prompt_tokens = Counter(
+            f"{NAMESPACE}_prompt_tokens_total",
+            "Prompt tokens processed.",
+        )
+        self.completion_tokens = Counter(
+            f"{NAMESPACE}_completion_tokens_total",
+            "Completion tokens generated.",
+        )
+        self.completion_cache = Counter(
+            f"{NAMESPACE}_completion_cache_requests_total",
+            "Deterministic requests looked up in the completion cache, by result.",
+        )
+
+    def request(self, model: str, arrived: float) -> "RequestRecorder":
+        """Start recording a request that arrived at `arrived` (`perf_counter`)."""
+        return RequestRecorder(self, model, arrived)
+
+    def render(
+        self,
+        pool: ResidentModelPool,
+        scheduler: SlotScheduler,
+        completion_cache: CompletionCache | None = None,
+    ) -> str:
+        """Render request metrics and current server state as Prometheus text."""
+        lines: list[str] = []
+        for instrument in (
+            self.time_to_first_token,
+            self.inter_token_latency,
+            self.requests,
+            self.prompt_tokens,
+            self.completion_tokens,
+            self.completion_cache,
+        ):
+            lines.extend(instrument.render())
+
+        lines.extend(_scheduler_lines(scheduler))
+        lines.extend(_pool_lines(pool))
+        if completion_cache is not None:
+            stats = completion_cache.stats()
+            lines.extend(
+                _gauge(
+                    "completion_cache_entries",
+                    "Responses in the completion cache.",
+                    [((), stats["entries"])],
+                )
+            )
+            lines.extend(
+                _gauge(
+                    "completion_cache_bytes",
+                    "Bytes of responses in the completion cache.",
+                    [((), stats["bytes"])],
+                )
+            )
+        return "\n".join(lines) + "\n"
+
+
+class RequestRecorder:
+    """Record the metrics of one completion request.
+
+    `chunk` and `finish` are called on the generation's worker thread.
+    """
+
+    def __init__(self, metrics: ServerMetrics, model: str, arrived: float) -> None:
+        self.metrics = metrics
+        self.model = model
+        self.arrived = arrived
+        self.completion_tokens = 0
+        self.prompt_tokens: int | None = None
+        self._last_token_at: float | None = None
+
+    def count_prompt(
+        self, input_ids: npt.NDArray[np.intc], scores: npt.NDArray[np.single]
+    ) -> npt.NDArray[np.single]:
+        """Logits processor: record the prompt length when the first token is sampled.
+
+        At that point the model has evaluated exactly the tokenized prompt, however
+        much of it was restored from the prefix cache.
+        """
+        if self.prompt_tokens is None:
+            self.prompt_tokens = len(input_ids)
+        return scores
+
+    def chunk(self, chunk: Any) -> None:
+        """Record the timing of a streamed chunk that carries a token."""
+        if not _has_token(chunk):
+            return
+        now = time.perf_counter()
+        if self._last_token_at is None:
+            self.metrics.time_to_first_token.observe(
+                now - self.arrived, model=self.model
+            )
+        else:
+            self.metrics.inter_token_latency.observe(
+                now - self._last_token_at, model=self.model
+            )
+        self._last_token_at = now
+        self.completion_tokens += 1
+
+    def finish(self, result: Any) -> None:
+        """Count tokens once the model call has ended.
+
+        Non-streamed results carry `usage`, and their time to first token is the
+        time to the whole response. For streams, each token chunk is one
+        completion token and the prompt length is recorded by `count_prompt`.
+        """
+        if result is not None:
+            self.metrics.time_to_first_token.observe(
+                time.perf_counter() - self.arrived, model=self.model
+            )
+            usage = result.get("usage") or {}
+            prompt_tokens = usage.get("prompt_tokens", 0)
+            completion_tokens = usage.get("completion_tokens", 0)
+        else:
+            completion_tokens = self.completion_tokens
+            prompt_tokens = self.prompt_tokens or 0
+
+        self.metrics.prompt_tokens.inc(prompt_tokens, model=self.model)
+        self.metrics.completion_tokens.inc(completion_tokens, model=self.model)
+
+    def done(self, outcome: str) -> None:
+        """Count the request as completed, cancelled, or failed."""
+        self.metrics.requests.inc(model=self.model, outcome=outcome)
+
+
+def _has_token(chunk: Any) -> bool:
+    """Whether a completion or chat completion chunk carries generated output."""
+    choices = chunk.get("choices") if isinstance(chunk, dict) else None
+    if not choices:
+        return False
+    choice = choices[0]
+    if "delta" in choice:
+        delta = choice["delta"] or {}
+        return bool(
+            delta.get("content")
+            or delta.get("tool_calls")
+            or delta.get("function_call")
+        )
+    return bool(choice.get("text"))
+
+
+def _scheduler_lines(scheduler: SlotScheduler) -> list[str]:
+    """Return slot usage, queue depth, and rejection metrics."""
+    stats = scheduler.stats()
+    return [
+        *_gauge("slots", "Decode slots.", [((), stats["slots"])]),
+        *_gauge("requests_in_flight", "Requests decoding.", [((), stats["in_flight"])]),
+        *_gauge(
+            "requests_queued",
+            "Requests waiting for a slot, by priority.",
+            [
+                ((("priority", name),), queued)
+                for name, queued in stats["queued_by_priority"].items()
+            ],
+        ),
+        *_gauge(
+            "requests_rejected_total",
+            "Requests answered with 429 Too Many Requests.",
+            [
+                ((("reason", "queue_full"),), stats["rejected_queue_full"]),
+                ((("reason", "timeout"),), stats["rejected_timeout"]),
+            ],
+            kind="counter",
+        ),
+    ]
+
+
+def _pool_lines(pool: ResidentModelPool) -> list[str]:
+    """Return KV cache occupancy and model residency and load metrics."""
+    kv_tokens, kv_capacity = [], []
+    for (alias, slot), llama in pool.resident_models().items():
+        labels = (("model", alias), ("slot", str(slot)))
+        kv_tokens.append((labels, llama.n_tokens))
+        kv_capacity.append((labels, llama.n_ctx()))
+
+    stats = pool.stats()
+    per_model = {alias: (("model", alias),) for alias in stats}
+    lines = [
+        *_gauge("kv_cache_tokens", "Tokens held in a replica's KV cache.", kv_tokens),
+        *_gauge(
+            "kv_cache_capacity_tokens", "KV cache size (context window).", kv_capacity
+        ),
+        *_gauge(
+            "resident_bytes",
+            "Estimated memory of a model's resident replicas.",
+            [
+                (labels, pool.resident_bytes(alias))
+                for alias, labels in per_model.items()
+            ],
+        ),
+        *_gauge(
+            "model_replicas",
+            "Resident replicas of a model.",
+            [(per_model[alias], s["replicas"]) for alias, s in stats.items()],
+        ),
+        f"# HELP {NAMESPACE}_model_load_seconds Time spent loading a model.",
+        f"# TYPE {NAMESPACE}_model_load_seconds summary",
+    ]
+    for alias, s in stats.items():
+        lines.append(
+            _sample(
+                f"{NAMESPACE}_model_load_seconds_sum",
+                per_model[alias],
+                s["total_load_seconds"],
+            )
+        )
+        lines.append(
+            _sample(
+                f"{NAMESPACE}_model_load_seconds_count", per_model[alias], s["loads"]
+            )
+        )
+    lines.extend(
+        _gauge(
+            "model_last_load_seconds",
+            "Duration of a model's most recent load.",
+            [(per_model[alias], s["last_load_seconds"]) for alias, s in stats.items()],
+        )
+    )
+    lines.extend(
+        _gauge(
+            "model_evictions_total",
+            "Replicas evicted to stay within the memory budget.",
+            [(per_model[alias], s["evictions"]) for alias, s in stats.items()],
+            kind="counter",
+        )
+    )
+    return lines
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _gauge(
+    name: str,
+    help: str,
+    samples: Iterable[tuple[Labels, float]],
+    kind: str = "gauge",
+) -> list[str]:
+    """Return the exposition lines of a metric read from server state."""
+    name = f"{NAMESPACE}_{name}"
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines.extend(_sample(name, labels, value) for labels, value in samples)
+    return lines
+
+
+def _sample(name: str, labels: Labels, value: float) -> str:
+    """Format one sample line."""
+    number = str(value) if isinstance(value, int) else repr(float(value))
+    if not labels:
+        return f"{name} {number}"
+    rendered = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+    return f"{name}{{{rendered}}} {number}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
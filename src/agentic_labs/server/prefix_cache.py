@@ -0,0 +1,363 @@
+"""Persistent prompt-prefix KV cache for the local LLM server.
+
+Agents send the same long system prompt on every request. llama-cpp-python can
+restore a saved model state (`LlamaState`) whose tokens share a prefix with a new
+prompt, skipping the prefill for that prefix. Its built-in caches are either
+RAM-only (lost on restart) or an unbounded-scan disk cache without LRU ordering.
+
+`TieredPrefixCache` combines both tiers:
+
+- RAM tier: recently used states, capped in bytes and evicted least-recently-used.
+- Disk tier: states that have been reused at least once (for example, known system
+  prompts), persisted so a restarted server can skip their prefill. Also capped in
+  bytes and evicted least-recently-used. States are written by a background
+  thread and read without holding the cache's lock, so a lookup never waits for
+  another lookup's multi-gigabyte state to be pickled or unpickled.
+
+Entries are keyed by model and a hash of the token prefix. The model key must
+identify everything that shapes a saved state (for example, the context size), so
+states are never restored into a model they do not fit.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from llama_cpp.llama import Llama, LlamaState
+from llama_cpp.llama_cache import BaseLlamaCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "agentic-labs" / "prefix-cache"
+
+TokenKey = tuple[int, ...]
+
+
+@dataclass
+class _DiskEntry:
+    """Location and size of a state persisted in the disk tier."""
+
+    digest: str
+    size: int
+
+
+# --------------------------------------------------------------------------------------
+# Tiered Prefix Cache
+# --------------------------------------------------------------------------------------
+
+
+class TieredPrefixCache(BaseLlamaCache):
+    """A RAM + disk prefix-state cache for one model.
+
+    Args:
+        model_key: Identifies the model; states are only reused by the same model.
+        ram_capacity_bytes: Maximum bytes of states kept in memory.
+        cache_dir: Root directory of the disk tier, or `None` for RAM only.
+        disk_capacity_bytes: Maximum bytes of states kept on disk.
+    """
+
+    def __init__(
+        self,
+        model_key: str,
+        ram_capacity_bytes: int = 2 << 30,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+        disk_capacity_bytes: int = 8 << 30,
+    ) -> None:
+        super().__init__(capacity_bytes=ram_capacity_bytes)
+        self.model_key = model_key
+        self.disk_capacity_bytes = disk_capacity_bytes
+
+        self._ram: OrderedDict[TokenKey, LlamaState] = OrderedDict()
+        self._ram_bytes = 0
+        self._disk: OrderedDict[TokenKey, _DiskEntry] = OrderedDict()
+        self._disk_bytes = 0
+        self._writing: set[TokenKey] = set()
+        # Disk states being read; the disk tier never evicts these.
+        self._reading: Counter[TokenKey] = Counter()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.prefix_tokens_matched = 0
+
+        self._dir: Path | None = None
+        self._writer: ThreadPoolExecutor | None = None
+        if cache_dir is not None and disk_capacity_bytes > 0:
+            self._dir = Path(cache_dir) / _slugify(model_key)
+            self._dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_index()
+            # One writer: states are large, and parallel writes only contend.
+            self._writer = ThreadPoolExecutor(1, thread_name_prefix="prefix-cache")
+
+    # ----------------------------------------------------------------------------------
+    # BaseLlamaCache Interface
+    # ----------------------------------------------------------------------------------
+
+    @property
+    def cache_size(self) -> int:
+        """Bytes of states held in the RAM tier."""
+        return self._ram_bytes
+
+    def __getitem__(self, key: Sequence[int]) -> LlamaState:
+        """Return the cached state sharing the longest token prefix with `key`."""
+        key = tuple(key)
+        with self._lock:
+            match, prefix_len = self._find_longest_prefix(key)
+            if match is None:
+                self.misses += 1
+                raise KeyError("Key not found")
+
+            if match not in self._ram:
+                # Read outside the lock; the reservation keeps the state on disk.
+                self._reading[match] += 1
+                digest = self._disk[match].digest
+            else:
+                digest = None
+                self._ram.move_to_end(match)
+                state = self._ram[match]
+                self.hits += 1
+                self.prefix_tokens_matched += prefix_len
+                # A reused state is a known prefix: persist it for warm restarts.
+                persist = (
+                    self._writer is not None
+                    and match not in self._disk
+                    and match not in self._writing
+                )
+                if persist:
+                    self._writing.add(match)
+
+        if digest is not None:
+            return self._get_from_disk(match, digest, prefix_len)
+        if persist:
+            # Cached states are never modified, so the writer can pickle this one
+            # while the caller loads it.
+            assert self._writer is not None
+            self._writer.submit(self._write_disk, match, state)
+        return state
+
+    def __contains__(self, key: Sequence[int]) -> bool:
+        with self._lock:
+            return self._find_longest_prefix(tuple(key))[0] is not None
+
+    def __setitem__(self, key: Sequence[int], value: LlamaState) -> None:
+        with self._lock:
+            self._put_ram(tuple(key), value)
+
+    # ----------------------------------------------------------------------------------
+    # Disk Writes
+    # ----------------------------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Wait until every state queued for the disk tier has been written."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+
+    # ----------------------------------------------------------------------------------
+    # Statistics
+    # ----------------------------------------------------------------------------------
+
+    def stats(self) -> dict:
+        """Return hit rate, matched prefix tokens, and tier occupancy.
+
+        `prefix_tokens_matched` sums the prefix lengths of the states returned. It
+        is not the number of prefill tokens saved: llama-cpp-python loads a
+        returned state only if it covers more of the prompt than the model has
+        already evaluated, and then skips only the tokens beyond that.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "prefix_tokens_matched": self.prefix_tokens_matched,
+                "ram_entries": len(self._ram),
+                "ram_bytes": self._ram_bytes,
+                "ram_capacity_bytes": self.capacity_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_capacity_bytes": self.disk_capacity_bytes if self._dir else 0,
+            }
+
+    # ----------------------------------------------------------------------------------
+    # RAM Tier
+    # ----------------------------------------------------------------------------------
+
+    def _find_longest_prefix(self, key: TokenKey) -> tuple[TokenKey | None, int]:
+        """Find the cached key (in either tier) sharing the longest prefix."""
+        best_key, best_len = None, 0
+        for candidate in (*self._ram.keys(), *self._disk.keys()):
+            prefix_len = Llama.longest_token_prefix(candidate, key)
+            if prefix_len > best_len:
+                best_key, best_len = candidate, prefix_len
+        return best_key, best_len
+
+    def _put_ram(self, key: TokenKey, state: LlamaState) -> None:
+        """Insert a state into the RAM tier and evict down to capacity."""
+        if key in self._ram:
+            self._ram_bytes -= _state_bytes(self._ram.pop(key))
+        self._ram[key] = state
+        self._ram_bytes += _state_bytes(state)
+
+        while self._ram_bytes > self.capacity_bytes and len(self._ram) > 1:
+            _, evicted = self._ram.popitem(last=False)
+            self._ram_bytes -= _state_bytes(evicted)
+
+    # ----------------------------------------------------------------------------------
+    # Disk Tier
+    # ----------------------------------------------------------------------------------
+
+    def _digest(self, key: TokenKey) -> str:
+        """Hash the model key and token prefix into a file name."""
+        tokens = array("i", key).tobytes()
+        return hashlib.sha256(self.model_key.encode() + b"\0" + tokens).hexdigest()
+
+    def _load_disk_index(self) -> None:
+        """Index the states already on disk, oldest access first.
+
+        A state is only complete once its tokens file exists, so state and
+        temporary files left behind by an interrupted write are removed.
+        """
+        assert self._dir is not None
+        entries = []
+        for tokens_path in self._dir.glob("*.tokens"):
+            state_path = tokens_path.with_suffix(".state")
+            try:
+                tokens = array("i")
+                tokens.frombytes(tokens_path.read_bytes())
+                stat = state_path.stat()
+            except (OSError, ValueError):
+                tokens_path.unlink(missing_ok=True)
+                state_path.unlink(missing_ok=True)
+                continue
+            entries.append(
+                (stat.st_mtime, tuple(tokens), tokens_path.stem, stat.st_size)
+            )
+
+        for _, key, digest, size in sorted(entries):
+            self._disk[key] = _DiskEntry(digest=digest, size=size)
+            self._disk_bytes += size
+
+        indexed = {entry.digest for entry in self._disk.values()}
+        for path in (*self._dir.glob("*.state"), *self._dir.glob("*.tmp")):
+            if path.suffix == ".tmp" or path.stem not in indexed:
+                path.unlink(missing_ok=True)
+
+        if self._disk:
+            logger.info(
+                "Prefix cache for %s: %d state(s) on disk (%.2f GiB)",
+                self.model_key,
+                len(self._disk),
+                self._disk_bytes / 2**30,
+            )
+
+    def _write_disk(self, key: TokenKey, state: LlamaState) -> None:
+        """Persist a state to disk and evict down to capacity.
+
+        Runs on the writer thread. Only the index update holds the lock. The
+        tokens file is written last: it marks the state as complete.
+        """
+        assert self._dir is not None
+        digest = self._digest(key)
+        state_path = self._dir / f"{digest}.state"
+        tokens_path = self._dir / f"{digest}.tokens"
+        state_tmp = self._dir / f"{digest}.state.tmp"
+        tokens_tmp = self._dir / f"{digest}.tokens.tmp"
+
+        try:
+            with state_tmp.open("wb") as file:
+                pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(state_tmp, state_path)
+            tokens_tmp.write_bytes(array("i", key).tobytes())
+            os.replace(tokens_tmp, tokens_path)
+            size = state_path.stat().st_size
+        except OSError as e:
+            logger.warning("Failed to persist prefix state: %s", e)
+            for path in (state_tmp, tokens_tmp, state_path):
+                path.unlink(missing_ok=True)
+            with self._lock:
+                self._writing.discard(key)
+            return
+
+        with self._lock:
+            self._writing.discard(key)
+            self._disk[key] = _DiskEntry(digest=digest, size=size)
+            self._disk_bytes += size
+
+            while self._disk_bytes > self.disk_capacity_bytes and len(self._disk) > 1:
+                # States being read are kept until their readers are done.
+                idle = next((k for k in self._disk if k not in self._reading), None)
+                if idle is None or idle == key:
+                    break
+                self._delete_disk(idle)
+
+    def _get_from_disk(self, key: TokenKey, digest: str, prefix_len: int) -> LlamaState:
+        """Read a state reserved in `_reading` and promote it to the RAM tier.
+
+        Unpickling runs without the lock; only the bookkeeping holds it.
+        """
+        assert self._dir is not None
+        state_path = self._dir / f"{digest}.state"
+        try:
+            with state_path.open("rb") as file:
+                state: LlamaState = pickle.load(file)
+            os.utime(state_path)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning("Discarding unreadable prefix state %s: %s", state_path, e)
+            with self._lock:
+                self._end_read(key)
+                self.misses += 1
+                if key in self._disk:
+                    self._delete_disk(key)
+            raise KeyError("Key not found") from e
+
+        with self._lock:
+            self._end_read(key)
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._put_ram(key, state)
+            self.hits += 1
+            self.prefix_tokens_matched += prefix_len
+        return state
+
+    def _end_read(self, key: TokenKey) -> None:
+        """Release a `_reading` reservation."""
+        self._reading[key] -= 1
+        if self._reading[key] <= 0:
+            del self._reading[key]
+
+    def _delete_disk(self, key: TokenKey) -> None:
+        """Remove a state from the disk tier."""
+        assert self._dir is not None
+        entry = self._disk.pop(key)
+        self._disk_bytes -= entry.size
+        (self._dir / f"{entry.digest}.state").unlink(missing_ok=True)
+        (self._dir / f"{entry.digest}.tokens").unlink(missing_ok=True)
+
+
+# --------------------------------------------------------------------------------------
+# Helper Functions
+# --------------------------------------------------------------------------------------
+
+
+def _state_bytes(state: LlamaState) -> int:
+    """Return the memory held by a state: the llama.cpp state and its logits.
+
+    With `logits_all`, the saved logits take context x vocabulary x 4 bytes and
+    can be larger than the KV cache itself.
+    """
+    return state.llama_state_size + state.scores.nbytes + state.input_ids.nbytes
+
+
+def _slugify(name: str) -> str:
+    """Turn a model name into a safe directory name."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "--", name).strip("-") or "model"
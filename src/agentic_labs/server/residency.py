@@ -0,0 +1,461 @@
+"""Multi-model residency for the local LLM server.
+
+Keeps several GGUF models loaded in a single server process. Models are loaded on
+their first request, stay resident while they fit inside a memory budget, and are
+evicted least-recently-used when a newly requested model needs the room.
+
+Each model can have one replica per decode slot. Replicas share the memory-mapped
+weights and own a separate KV cache, so several requests can decode in parallel.
+Replicas load outside the pool's lock, so a cold load never blocks requests for
+models that are already resident.
+When a draft model is configured, every replica of the other models gets its own
+draft replica for speculative decoding.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Iterator
+
+import llama_cpp
+from llama_cpp.llama_cache import BaseLlamaCache
+from llama_cpp.server.model import LlamaProxy
+from llama_cpp.server.settings import ModelSettings
+
+from agentic_labs.server.speculative import DraftStats, SmallModelDraft
+
+logger = logging.getLogger(__name__)
+
+# Bytes per element of the default (f16) KV cache.
+KV_CACHE_ELEMENT_BYTES = 2
+
+# Bytes per element of the logits buffer (f32).
+LOGITS_ELEMENT_BYTES = 4
+
+# A resident model replica: (model alias, decode slot).
+ReplicaKey = tuple[str, int]
+
+
+# --------------------------------------------------------------------------------------
+# Model Statistics
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class ModelStats:
+    """Residency statistics for a single served model."""
+
+    replicas: int = 0
+    weights_bytes: int = 0
+    kv_cache_bytes: int = 0
+    logits_bytes: int = 0
+    draft_bytes: int = 0
+    loads: int = 0
+    last_load_seconds: float = 0.0
+    total_load_seconds: float = 0.0
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+
+# --------------------------------------------------------------------------------------
+# Resident Model Pool
+# --------------------------------------------------------------------------------------
+
+
+class ResidentModelPool:
+    """A drop-in replacement for llama-cpp-python's `LlamaProxy`.
+
+    `LlamaProxy` holds exactly one model and closes it whenever a request names a
+    different model. This pool keeps every model that fits inside
+    `memory_budget_bytes` loaded at once and evicts the least-recently-used model
+    replica when a new load would exceed the budget. Replicas that are checked out
+    by an in-flight request are never evicted.
+
+    Args:
+        models: Settings for every model the server may serve. The first entry is
+            the default model, used when a request names an unknown model.
+        memory_budget_bytes: Maximum estimated RAM/VRAM used by resident models.
+            `None` keeps every requested model resident.
+        cache_factory: Optional callable that builds a prompt-prefix cache from a
+            model's settings. Each model's cache is created once, shared by its
+            replicas, and re-attached when the model is reloaded after an eviction.
+        draft_settings: Optional settings of a small model used to draft tokens for
+            speculative decoding of every other served model.
+        num_draft_tokens: Number of tokens the draft model proposes per step.
+    """
+
+    def __init__(
+        self,
+        models: list[ModelSettings],
+        memory_budget_bytes: int | None = None,
+        cache_factory: Callable[[ModelSettings], BaseLlamaCache] | None = None,
+        draft_settings: ModelSettings | None = None,
+        num_draft_tokens: int = 4,
+    ) -> None:
+        if not models:
+            raise ValueError("At least one model must be provided.")
+
+        self._settings: dict[str, ModelSettings] = {}
+        for settings in models:
+            settings.model_alias = settings.model_alias or settings.model
+            self._settings[settings.model_alias] = settings
+
+        self._draft_settings = draft_settings
+        self.num_draft_tokens = num_draft_tokens
+        if draft_settings is not None:
+            draft_settings.model_alias = (
+                draft_settings.model_alias or draft_settings.model
+            )
+            for alias, settings in self._settings.items():
+                if alias != draft_settings.model_alias:
+                    # Verifying draft tokens needs the logits of every position.
+                    settings.logits_all = True
+
+        self.default_alias: str = models[0].model_alias  # type: ignore[assignment]
+        self.memory_budget_bytes = memory_budget_bytes
+
+        self._resident: OrderedDict[ReplicaKey, llama_cpp.Llama] = OrderedDict()
+        self._drafts: dict[ReplicaKey, SmallModelDraft] = {}
+        self._retired_draft_stats: dict[str, DraftStats] = {}
+        self._checked_out: Counter[ReplicaKey] = Counter()
+        # Replicas being loaded, and the memory reserved for each of them.
+        self._loading: dict[ReplicaKey, threading.Event] = {}
+        self._reserved: dict[ReplicaKey, int] = {}
+        self._stats: dict[str, ModelStats] = {
+            alias: ModelStats() for alias in self._settings
+        }
+        self._cache_factory = cache_factory
+        self._caches: dict[str, BaseLlamaCache] = {}
+        self._lock = threading.RLock()
+
+    # ----------------------------------------------------------------------------------
+    # LlamaProxy Interface
+    # ----------------------------------------------------------------------------------
+
+    def __call__(self, model: str | None = None) -> llama_cpp.Llama:
+        """Return the first replica of the requested model, loading it on first use.
+
+        The replica is not checked out, so it may be evicted or generating for
+        another request. The server's routes use `checkout` instead.
+        """
+        return self._get((self.resolve_alias(model), 0))
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over the aliases of all servable models."""
+        return iter(self._settings)
+
+    def __getitem__(self, model: str) -> dict:
+        """Return the settings of a model as a dictionary."""
+        return self._settings[model].model_dump()
+
+    def free(self) -> None:
+        """Close every resident model."""
+        with self._lock:
+            while self._resident:
+                self._evict(next(iter(self._resident)))
+
+    # ----------------------------------------------------------------------------------
+    # Slot Checkout
+    # ----------------------------------------------------------------------------------
+
+    def checkout(self, model: str | None, slot: int) -> llama_cpp.Llama:
+        """Return the model replica for a decode slot and protect it from eviction.
+
+        Every `checkout` must be paired with a `checkin` once the request is done.
+        """
+        return self._get((self.resolve_alias(model), slot), checkout=True)
+
+    def checkin(self, model: str | None, slot: int) -> None:
+        """Release a replica returned by `checkout`."""
+        key = (self.resolve_alias(model), slot)
+        with self._lock:
+            self._checked_out[key] -= 1
+            if self._checked_out[key] <= 0:
+                del self._checked_out[key]
+
+    def draft(self, model: str | None, slot: int) -> SmallModelDraft | None:
+        """Return the draft model attached to a replica, if any."""
+        with self._lock:
+            return self._drafts.get((self.resolve_alias(model), slot))
+
+    # ----------------------------------------------------------------------------------
+    # Public Helpers
+    # ----------------------------------------------------------------------------------
+
+    def resolve_alias(self, model: str | None) -> str:
+        """Map a requested model name to a servable alias (or the default)."""
+        if model is None or model not in self._settings:
+            return self.default_alias
+        return model
+
+    def resident_models(self) -> dict[ReplicaKey, llama_cpp.Llama]:
+        """Return a snapshot of the loaded model replicas, least-recent first."""
+        with self._lock:
+            return dict(self._resident)
+
+    def stats(self) -> dict[str, dict]:
+        """Return per-model residency statistics."""
+        with self._lock:
+            return {
+                alias: asdict(stats) | {"model": self._settings[alias].model}
+                for alias, stats in self._stats.items()
+            }
+
+    def draft_stats(self) -> dict[str, dict]:
+        """Return drafted/accepted token totals per served model."""
+        with self._lock:
+            totals = {
+                alias: DraftStats(stats.drafted_tokens, stats.accepted_tokens)
+                for alias, stats in self._retired_draft_stats.items()
+            }
+            for (alias, _), draft in self._drafts.items():
+                total = totals.setdefault(alias, DraftStats())
+                total.drafted_tokens += draft.total_stats.drafted_tokens
+                total.accepted_tokens += draft.total_stats.accepted_tokens
+            return {alias: stats.as_dict() for alias, stats in totals.items()}
+
+    def caches(self) -> dict[str, BaseLlamaCache]:
+        """Return the prompt-prefix cache of every model that has one."""
+        with self._lock:
+            return dict(self._caches)
+
+    def resident_bytes(self, model: str | None = None) -> int:
+        """Return the estimated memory used by one or all resident models."""
+        if model is not None:
+            return self._footprint(model)
+        return sum(self._footprint(alias) for alias in self._settings)
+
+    # ----------------------------------------------------------------------------------
+    # Loading & Eviction
+    # ----------------------------------------------------------------------------------
+
+    def _get(self, key: ReplicaKey, checkout: bool = False) -> llama_cpp.Llama:
+        """Return a resident replica, loading it on a miss.
+
+        Only one thread loads a given replica; others asking for it wait for that
+        load to finish. The lock is held for bookkeeping only, never during a load.
+        """
+        alias, slot = key
+        stats = self._stats[alias]
+        while True:
+            with self._lock:
+                if key in self._resident:
+                    stats.hits += 1
+                    self._resident.move_to_end(key)
+                    if checkout:
+                        self._checked_out[key] += 1
+                    return self._resident[key]
+
+                loading = self._loading.get(key)
+                if loading is None:
+                    stats.misses += 1
+                    # Use the last known KV cache size; the first load only knows
+                    # the file size.
+                    needed = self._footprint(alias, stats.replicas + 1)
+                    needed -= self._footprint(alias)
+                    self._make_room(needed)
+                    self._loading[key] = threading.Event()
+                    self._reserved[key] = needed
+                    break
+            # Another thread is loading this replica; it may still fail or be
+            # evicted before we get it, so look again once it is done.
+            loading.wait()
+
+        try:
+            llama, draft, elapsed = self._load(key)
+        except BaseException:
+            with self._lock:
+                del self._reserved[key]
+                self._loading.pop(key).set()
+            raise
+
+        with self._lock:
+            stats.replicas += 1
+            stats.loads += 1
+            stats.last_load_seconds = elapsed
+            stats.total_load_seconds += elapsed
+            stats.weights_bytes = _file_size(self._settings[alias].model)
+            stats.kv_cache_bytes = estimate_kv_cache_bytes(llama)
+            stats.logits_bytes = estimate_logits_bytes(
+                llama, self._settings[alias].logits_all
+            )
+            if draft is not None:
+                self._drafts[key] = draft
+                stats.draft_bytes = _file_size(
+                    self._draft_settings.model  # type: ignore[union-attr]
+                ) + estimate_kv_cache_bytes(draft.llama)
+
+            if self._cache_factory is not None:
+                if alias not in self._caches:
+                    self._caches[alias] = self._cache_factory(self._settings[alias])
+                llama.set_cache(self._caches[alias])
+
+            self._resident[key] = llama
+            if checkout:
+                self._checked_out[key] += 1
+            del self._reserved[key]
+            # The measured KV cache may exceed the estimate; never evict the
+            # replica being handed to the caller.
+            self._make_room(0, exclude=key)
+            self._loading.pop(key).set()
+
+        logger.info(
+            "Loaded model %s (slot %d) in %.2fs (~%.2f GiB resident)",
+            alias,
+            slot,
+            elapsed,
+            self.resident_bytes() / 2**30,
+        )
+        return llama
+
+    def _load(
+        self, key: ReplicaKey
+    ) -> tuple[llama_cpp.Llama, SmallModelDraft | None, float]:
+        """Load a model replica and its draft model, if any.
+
+        Runs without the pool's lock. Returns the replica, its draft, and the load
+        time in seconds.
+        """
+        alias, slot = key
+        logger.info("Loading model %s (slot %d)", alias, slot)
+        start = time.perf_counter()
+        llama = LlamaProxy.load_llama_from_model_settings(self._settings[alias])
+
+        draft = None
+        if self._uses_draft(alias):
+            assert self._draft_settings is not None
+            try:
+                draft_llama = LlamaProxy.load_llama_from_model_settings(
+                    self._draft_settings
+                )
+            except BaseException:
+                llama.close()
+                raise
+            llama.draft_model = draft = SmallModelDraft(
+                draft_llama, self.num_draft_tokens
+            )
+
+        return llama, draft, time.perf_counter() - start
+
+    def _footprint(self, alias: str, replicas: int | None = None) -> int:
+        """Estimate the memory used by `replicas` replicas of a model.
+
+        Memory-mapped weights are shared by all replicas, unless layers are
+        offloaded to the GPU: then every replica uploads its own copy of the
+        offloaded weights to VRAM. Each replica has its own KV cache, logits buffer,
+        and draft model.
+        """
+        settings = self._settings[alias]
+        stats = self._stats[alias]
+        replicas = stats.replicas if replicas is None else replicas
+        if replicas == 0:
+            return 0
+
+        weights = stats.weights_bytes or _file_size(settings.model)
+        shared = settings.use_mmap and settings.n_gpu_layers == 0
+        weight_copies = 1 if shared else replicas
+        draft = stats.draft_bytes
+        if not draft and self._uses_draft(alias):
+            draft = _file_size(self._draft_settings.model)  # type: ignore[union-attr]
+        per_replica = stats.kv_cache_bytes + stats.logits_bytes + draft
+        return weights * weight_copies + per_replica * replicas
+
+    def _uses_draft(self, alias: str) -> bool:
+        """Return True if replicas of this model get a speculative-decoding draft."""
+        return (
+            self._draft_settings is not None
+            and alias != self._draft_settings.model_alias
+        )
+
+    def _make_room(self, needed_bytes: int, exclude: ReplicaKey | None = None) -> None:
+        """Evict least-recently-used idle replicas until `needed_bytes` fits.
+
+        The replica `exclude`, if given, is never evicted.
+        """
+        if self.memory_budget_bytes is None:
+            return
+
+        # Replicas still loading have their memory reserved.
+        needed_bytes += sum(self._reserved.values())
+        while self.resident_bytes() + needed_bytes > self.memory_budget_bytes:
+            idle = [
+                key
+                for key in self._resident
+                if key not in self._checked_out and key != exclude
+            ]
+            if not idle:
+                break
+            self._evict(idle[0])
+
+        if self.resident_bytes() + needed_bytes > self.memory_budget_bytes:
+            logger.warning(
+                "Resident models need ~%.2f GiB, exceeding the %.2f GiB memory budget",
+                (self.resident_bytes() + needed_bytes) / 2**30,
+                self.memory_budget_bytes / 2**30,
+            )
+
+    def _evict(self, key: ReplicaKey) -> None:
+        """Close and forget a resident model replica."""
+        llama = self._resident.pop(key)
+        llama.close()
+
+        draft = self._drafts.pop(key, None)
+        if draft is not None:
+            retired = self._retired_draft_stats.setdefault(key[0], DraftStats())
+            retired.drafted_tokens += draft.total_stats.drafted_tokens
+            retired.accepted_tokens += draft.total_stats.accepted_tokens
+            draft.llama.close()
+
+        stats = self._stats[key[0]]
+        stats.replicas -= 1
+        stats.evictions += 1
+        logger.info("Evicted model %s (slot %d)", *key)
+
+
+# --------------------------------------------------------------------------------------
+# Memory Estimates
+# --------------------------------------------------------------------------------------
+
+
+def estimate_kv_cache_bytes(llama: llama_cpp.Llama) -> int:
+    """Estimate the KV cache size of a loaded model from its GGUF metadata.
+
+    2 (K and V) x layers x context x KV heads x head size x element size.
+    """
+    metadata = llama.metadata or {}
+    arch = metadata.get("general.architecture", "llama")
+    try:
+        n_layer = int(metadata[f"{arch}.block_count"])
+        n_embd = int(metadata[f"{arch}.embedding_length"])
+        n_head = int(metadata[f"{arch}.attention.head_count"])
+        n_head_kv = int(metadata.get(f"{arch}.attention.head_count_kv", n_head))
+    except (KeyError, ValueError):
+        return 0
+
+    head_dim = n_embd // n_head
+    return 2 * n_layer * llama.n_ctx() * n_head_kv * head_dim * KV_CACHE_ELEMENT_BYTES
+
+
+def estimate_logits_bytes(llama: llama_cpp.Llama, logits_all: bool) -> int:
+    """Estimate the logits buffer of a loaded model with `logits_all` set.
+
+    Keeping the logits of every position (needed to verify draft tokens) takes
+    context x vocabulary x 4 bytes, about 4 GiB at 8k context and a 128k
+    vocabulary. Without `logits_all`, the buffer holds one batch and is small.
+    """
+    if not logits_all:
+        return 0
+    return llama.n_ctx() * llama.n_vocab() * LOGITS_ELEMENT_BYTES
+
+
+def _file_size(path: str) -> int:
+    """Return the size of a model file, or 0 if it cannot be read."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
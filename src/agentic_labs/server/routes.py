@@ -0,0 +1,599 @@
+"""OpenAI-compatible completion routes for the local LLM server.
+
+These routes replace llama-cpp-python's `/v1/completions` and
+`/v1/chat/completions`. Instead of holding one global model lock, each request is
+admitted by the `SlotScheduler`, checks out the model replica of its decode slot,
+and generates on a worker thread, so requests in different slots run in parallel.
+
+A request whose client disconnects is withdrawn from the queue or, once it is
+generating, stopped at the next token, so its slot goes to the next request.
+
+The embedding and tokenizer routes are replaced too, so they also run on a
+checked-out replica rather than on one that may be generating for another request.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import threading
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from typing import Any, TypeVar
+
+import llama_cpp
+import numpy as np
+import numpy.typing as npt
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse, Response
+from llama_cpp.server import app as llama_app
+from llama_cpp.server.errors import RouteErrorHandler
+from llama_cpp.server.types import (
+    CreateChatCompletionRequest,
+    CreateCompletionRequest,
+    CreateEmbeddingRequest,
+    DetokenizeInputRequest,
+    DetokenizeInputResponse,
+    TokenizeInputCountResponse,
+    TokenizeInputRequest,
+    TokenizeInputResponse,
+)
+from sse_starlette.sse import EventSourceResponse
+from starlette.concurrency import run_in_threadpool
+
+from agentic_labs.server.completion_cache import CompletionCache, is_deterministic
+from agentic_labs.server.metrics import ServerMetrics
+from agentic_labs.server.residency import ResidentModelPool
+from agentic_labs.server.scheduler import (
+    DEFAULT_PRIORITY,
+    PRIORITIES,
+    SchedulerBusyError,
+    SlotScheduler,
+)
+from agentic_labs.server.speculative import DraftStats
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=RouteErrorHandler)
+
+OPENAI_V1_TAG = "OpenAI V1"
+EXTRAS_TAG = "Extras"
+
+# Request fields that llama-cpp-python's completion methods do not accept.
+CHAT_EXCLUDE = {"n", "logit_bias_type", "user", "min_tokens"}
+COMPLETION_EXCLUDE = {"n", "best_of", "logit_bias_type", "user", "min_tokens"}
+
+CompletionBody = CreateChatCompletionRequest | CreateCompletionRequest
+
+T = TypeVar("T")
+
+# Marks the end of a streamed generation.
+_END = object()
+
+# How often a waiting non-streamed request checks whether its client is still there.
+DISCONNECT_POLL_SECONDS = 0.25
+
+# Non-standard status (as used by nginx) for requests whose client went away.
+CLIENT_CLOSED_REQUEST = 499
+
+
+# --------------------------------------------------------------------------------------
+# Routes
+# --------------------------------------------------------------------------------------
+
+
+@router.post(
+    "/v1/chat/completions",
+    summary="Chat",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=[OPENAI_V1_TAG],
+)
+async def create_chat_completion(
+    request: Request,
+    body: CreateChatCompletionRequest,
+) -> Any:
+    """Create a chat completion, streamed or not."""
+    kwargs = body.model_dump(exclude=CHAT_EXCLUDE)
+    return await _complete(
+        request, body, kwargs, llama_cpp.Llama.create_chat_completion
+    )
+
+
+@router.post(
+    "/v1/completions",
+    summary="Completion",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=[OPENAI_V1_TAG],
+)
+async def create_completion(
+    request: Request,
+    body: CreateCompletionRequest,
+) -> Any:
+    """Create a text completion, streamed or not."""
+    if isinstance(body.prompt, list):
+        if len(body.prompt) > 1:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Only one prompt per request is supported.",
+            )
+        body.prompt = body.prompt[0] if body.prompt else ""
+
+    kwargs = body.model_dump(exclude=COMPLETION_EXCLUDE)
+    return await _complete(request, body, kwargs, llama_cpp.Llama.__call__)
+
+
+@router.post(
+    "/v1/embeddings",
+    summary="Embedding",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=[OPENAI_V1_TAG],
+)
+async def create_embedding(request: Request, body: CreateEmbeddingRequest) -> Any:
+    """Embed the input with the requested model."""
+    kwargs = body.model_dump(exclude={"user"})
+    return await _on_replica(
+        request, body.model, body.user, lambda llama: llama.create_embedding(**kwargs)
+    )
+
+
+@router.post(
+    "/extras/tokenize",
+    summary="Tokenize",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=[EXTRAS_TAG],
+)
+async def tokenize(request: Request, body: TokenizeInputRequest) -> Any:
+    """Tokenize the input with the requested model's vocabulary."""
+    tokens = await _on_replica(
+        request, body.model, None, lambda llama: _tokenize(llama, body.input)
+    )
+    if isinstance(tokens, Response):
+        return tokens
+    return TokenizeInputResponse(tokens=tokens)
+
+
+@router.post(
+    "/extras/tokenize/count",
+    summary="Tokenize Count",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=[EXTRAS_TAG],
+)
+async def count_query_tokens(request: Request, body: TokenizeInputRequest) -> Any:
+    """Count the tokens of the input in the requested model's vocabulary."""
+    tokens = await _on_replica(
+        request, body.model, None, lambda llama: _tokenize(llama, body.input)
+    )
+    if isinstance(tokens, Response):
+        return tokens
+    return TokenizeInputCountResponse(count=len(tokens))
+
+
+@router.post(
+    "/extras/detokenize",
+    summary="Detokenize",
+    dependencies=[Depends(llama_app.authenticate)],
+    tags=[EXTRAS_TAG],
+)
+async def detokenize(request: Request, body: DetokenizeInputRequest) -> Any:
+    """Turn tokens of the requested model's vocabulary back into text."""
+    text = await _on_replica(
+        request,
+        body.model,
+        None,
+        lambda llama: llama.detokenize(body.tokens).decode("utf-8"),
+    )
+    if isinstance(text, Response):
+        return text
+    return DetokenizeInputResponse(text=text)
+
+
+def _tokenize(llama: llama_cpp.Llama, text: str) -> list[int]:
+    """Tokenize text the way llama-cpp-python's tokenizer routes do."""
+    return llama.tokenize(text.encode("utf-8"), special=True)
+
+
+# --------------------------------------------------------------------------------------
+# Request Handling
+# --------------------------------------------------------------------------------------
+
+
+async def _complete(
+    request: Request,
+    body: CompletionBody,
+    kwargs: dict[str, Any],
+    llama_call: Callable[..., Any],
+) -> Any:
+    """Admit a request to a decode slot and run it on that slot's model replica."""
+    arrived = time.perf_counter()
+    scheduler: SlotScheduler = request.app.state.scheduler
+    pool: ResidentModelPool = request.app.state.model_pool
+    metrics: ServerMetrics = request.app.state.metrics
+    completion_cache: CompletionCache | None = request.app.state.completion_cache
+    model = pool.resolve_alias(body.model)
+    stream = bool(kwargs.get("stream", False))
+    priority = request_priority(request)
+    recorder = metrics.request(model, arrived)
+    headers: dict[str, str] = {}
+
+    cache_key = None
+    if completion_cache is not None and is_deterministic(kwargs):
+        cache_key = completion_cache.key(pool[model], kwargs)
+        cached = await run_in_threadpool(completion_cache.get, cache_key)
+        metrics.completion_cache.inc(
+            model=model, result="miss" if cached is None else "hit"
+        )
+        if cached is not None:
+            recorder.done("cached")
+            return _replay(cached, stream, {"X-Completion-Cache": "hit"})
+        headers["X-Completion-Cache"] = "miss"
+
+    try:
+        slot = await _acquire_slot(request, client_id(request, body.user), priority)
+    except ClientDisconnected:
+        recorder.done("cancelled")
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    try:
+        llama = await run_in_threadpool(pool.checkout, body.model, slot)
+    except BaseException:
+        scheduler.release(slot)
+        recorder.done("error")
+        raise
+
+    def finish() -> None:
+        # The pool's lock may be held for bookkeeping; never wait for it here.
+        asyncio.get_running_loop().run_in_executor(None, pool.checkin, body.model, slot)
+        scheduler.release(slot)
+
+    try:
+        await run_in_threadpool(prepare_kwargs, llama, body, kwargs)
+        draft = await run_in_threadpool(pool.draft, body.model, slot)
+    except BaseException:
+        finish()
+        recorder.done("error")
+        raise
+
+    draft_stats = DraftStats()
+    if draft is not None:
+        draft.reset_request_stats()
+
+    chunks: list[Any] = []
+    response: Any = None
+
+    def record_chunk(chunk: Any) -> None:
+        """Worker thread: time a streamed chunk and keep it for the cache."""
+        recorder.chunk(chunk)
+        if cache_key is not None:
+            chunks.append(chunk)
+
+    def record_stats(result: Any) -> None:
+        """Worker thread: record this request's metrics and draft acceptance."""
+        nonlocal response
+        response = chunks if result is None else result
+        recorder.finish(result)
+        if draft is None:
+            return
+        draft_stats.drafted_tokens = draft.request_stats.drafted_tokens
+        draft_stats.accepted_tokens = draft.request_stats.accepted_tokens
+        logger.info(
+            "Speculative decoding: %d/%d draft tokens accepted (%.0f%%)",
+            draft_stats.accepted_tokens,
+            draft_stats.drafted_tokens,
+            draft_stats.acceptance_rate * 100,
+        )
+
+    def done() -> None:
+        finish()
+        recorder.done(generation.outcome)
+        if cache_key is not None and generation.outcome == "completed":
+            asyncio.get_running_loop().run_in_executor(
+                None, completion_cache.put, cache_key, model, response
+            )
+
+    if stream:
+        # Streamed chunks carry no usage; count the prompt as it is sampled from.
+        processors = kwargs.get("logits_processor") or llama_cpp.LogitsProcessorList()
+        processors.append(recorder.count_prompt)
+        kwargs["logits_processor"] = processors
+
+    generation = Generation(
+        llama_call,
+        llama,
+        kwargs,
+        on_done=done,
+        on_chunk=record_chunk,
+        on_finish=record_stats,
+    )
+
+    if stream:
+        return EventSourceResponse(
+            generation.events(),
+            sep="\n",
+            ping_message_factory=request.app.state.ping_message_factory,
+            headers=headers,
+        )
+
+    try:
+        result = await _unless_disconnected(request, generation.result())
+    except ClientDisconnected:
+        generation.cancelled.set()
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    if draft is not None:
+        headers["X-Draft-Acceptance-Rate"] = f"{draft_stats.acceptance_rate:.3f}"
+        headers["X-Draft-Tokens"] = (
+            f"{draft_stats.accepted_tokens}/{draft_stats.drafted_tokens}"
+        )
+    if not headers:
+        return result
+    return JSONResponse(content=result, headers=headers)
+
+
+async def _on_replica(
+    request: Request,
+    model: str | None,
+    user: str | None,
+    call: Callable[[llama_cpp.Llama], T],
+) -> T | Response:
+    """Run a short call on the checked-out replica of a decode slot."""
+    scheduler: SlotScheduler = request.app.state.scheduler
+    pool: ResidentModelPool = request.app.state.model_pool
+    try:
+        slot = await _acquire_slot(
+            request, client_id(request, user), request_priority(request)
+        )
+    except ClientDisconnected:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+
+    def run() -> T:
+        llama = pool.checkout(model, slot)
+        try:
+            return call(llama)
+        finally:
+            pool.checkin(model, slot)
+
+    try:
+        return await run_in_threadpool(run)
+    finally:
+        scheduler.release(slot)
+
+
+async def _acquire_slot(request: Request, client: str, priority: int) -> int:
+    """Wait for a decode slot.
+
+    Raises:
+        HTTPException: 429 Too Many Requests if the scheduler is busy.
+        ClientDisconnected: The client disconnected while waiting.
+    """
+    scheduler: SlotScheduler = request.app.state.scheduler
+    try:
+        return await _unless_disconnected(request, scheduler.acquire(client, priority))
+    except SchedulerBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        ) from e
+
+
+def prepare_kwargs(
+    llama: llama_cpp.Llama, body: CompletionBody, kwargs: dict[str, Any]
+) -> None:
+    """Translate the request fields llama-cpp-python's server handles itself.
+
+    Mirrors its completion routes: token-keyed logit biases are mapped to token
+    ids, grammars are compiled, and `min_tokens` becomes a logits processor.
+    """
+    if body.logit_bias is not None:
+        kwargs["logit_bias"] = (
+            _logit_bias_token_ids(llama, body.logit_bias)
+            if body.logit_bias_type == "tokens"
+            else body.logit_bias
+        )
+
+    if body.grammar is not None:
+        kwargs["grammar"] = llama_cpp.LlamaGrammar.from_string(body.grammar)
+
+    if body.min_tokens > 0:
+        processors = kwargs.get("logits_processor") or llama_cpp.LogitsProcessorList()
+        processors.append(
+            llama_cpp.MinTokensLogitsProcessor(body.min_tokens, llama.token_eos())
+        )
+        kwargs["logits_processor"] = processors
+
+
+def _logit_bias_token_ids(
+    llama: llama_cpp.Llama, logit_bias: dict[str, float]
+) -> dict[str, float]:
+    """Map logit biases keyed by token text to biases keyed by token id."""
+    biases = {}
+    for token, score in logit_bias.items():
+        for token_id in llama.tokenize(
+            token.encode("utf-8"), add_bos=False, special=True
+        ):
+            biases[str(token_id)] = score
+    return biases
+
+
+def _replay(cached: Any, stream: bool, headers: dict[str, str]) -> Any:
+    """Return a cached response, replaying stream chunks without delay."""
+    if not stream:
+        return JSONResponse(content=cached, headers=headers)
+
+    async def events() -> AsyncIterator[dict[str, str]]:
+        for chunk in cached:
+            yield {"data": json.dumps(chunk)}
+        yield {"data": "[DONE]"}
+
+    return EventSourceResponse(events(), sep="\n", headers=headers)
+
+
+def request_priority(request: Request) -> int:
+    """Return the scheduling priority requested by the `X-Priority` header.
+
+    Raises:
+        HTTPException: The header names an unknown priority class.
+    """
+    name = request.headers.get("x-priority", DEFAULT_PRIORITY).strip().lower()
+    if name not in PRIORITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown X-Priority '{name}'. "
+            f"Expected one of: {', '.join(PRIORITIES)}.",
+        )
+    return PRIORITIES[name]
+
+
+def client_id(request: Request, user: str | None) -> str:
+    """Identify the client for fair scheduling.
+
+    Uses the OpenAI `user` field, then an `X-Client-Id` header, then the client's
+    address.
+    """
+    if user:
+        return user
+    if header := request.headers.get("x-client-id"):
+        return header
+    return request.client.host if request.client else "anonymous"
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client goes away while its request is pending."""
+
+
+async def _unless_disconnected(request: Request, awaitable: Awaitable[T]) -> T:
+    """Await `awaitable`, cancelling it if the client disconnects first.
+
+    Raises:
+        ClientDisconnected: The client disconnected before `awaitable` finished.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                task.cancel()
+                try:
+                    # The task may have finished before the cancellation landed.
+                    return await task
+                except asyncio.CancelledError:
+                    raise ClientDisconnected() from None
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+# --------------------------------------------------------------------------------------
+# Generation
+# --------------------------------------------------------------------------------------
+
+
+class Generation:
+    """Run one llama-cpp-python completion call on a worker thread.
+
+    The call starts immediately. Results are handed back to the event loop through a
+    queue. On the worker thread, `on_chunk` sees every streamed chunk and
+    `on_finish` runs right after the model call ends (with the non-streamed result,
+    or `None` for streams) before the final result is queued. `on_done` runs on the
+    event loop once the worker thread has finished with the model, so the model
+    replica is never shared between two generations. By then `outcome` is
+    "completed", "cancelled", or "error".
+
+    Setting `cancelled` stops the generation at its next token: streams stop
+    reading chunks, and a logits processor forces end-of-sequence so non-streamed
+    calls return early too.
+    """
+
+    def __init__(
+        self,
+        llama_call: Callable[..., Any],
+        llama: llama_cpp.Llama,
+        kwargs: dict[str, Any],
+        on_done: Callable[[], None],
+        on_chunk: Callable[[Any], None] | None = None,
+        on_finish: Callable[[Any], None] | None = None,
+    ) -> None:
+        self.cancelled = threading.Event()
+        self.outcome = "completed"
+        self._on_chunk = on_chunk
+        self._on_finish = on_finish
+        self._llama_call = llama_call
+        self._llama = llama
+        self._kwargs = kwargs
+        processors = kwargs.get("logits_processor") or llama_cpp.LogitsProcessorList()
+        processors.append(self._stop_if_cancelled)
+        kwargs["logits_processor"] = processors
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue[Any] = asyncio.Queue()
+
+        self._worker = self._loop.run_in_executor(None, self._run)
+        self._worker.add_done_callback(lambda _: on_done())
+
+    async def result(self) -> Any:
+        """Wait for and return a non-streamed completion."""
+        item = await self._queue.get()
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    async def events(self) -> AsyncIterator[dict[str, str]]:
+        """Yield server-sent events for a streamed completion."""
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is _END:
+                    yield {"data": "[DONE]"}
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield {"data": json.dumps(item)}
+        finally:
+            self.cancelled.set()
+
+    def _run(self) -> None:
+        """Worker thread: call the model and queue its output."""
+        try:
+            result = self._llama_call(self._llama, **self._kwargs)
+            if not isinstance(result, Iterator):
+                if self.cancelled.is_set():
+                    self.outcome = "cancelled"
+                self._finish(result)
+                self._put(result)
+                return
+
+            try:
+                for chunk in result:
+                    if self._on_chunk is not None:
+                        self._on_chunk(chunk)
+                    self._put(chunk)
+                    if self.cancelled.is_set():
+                        self.outcome = "cancelled"
+                        break
+            finally:
+                result.close()  # type: ignore[attr-defined]
+            self._finish(None)
+            self._put(_END)
+
+        except Exception as e:
+            self.outcome = "error"
+            self._put(e)
+
+    def _stop_if_cancelled(
+        self, input_ids: npt.NDArray[np.intc], scores: npt.NDArray[np.single]
+    ) -> npt.NDArray[np.single]:
+        """Worker thread: force end-of-sequence once the request is cancelled."""
+        if self.cancelled.is_set():
+            scores[:] = -np.inf
+            scores[self._llama.token_eos()] = 0.0
+        return scores
+
+    def _finish(self, result: Any) -> None:
+        """Worker thread: run the `on_finish` hook."""
+        if self._on_finish is not None:
+            self._on_finish(result)
+
+    def _put(self, item: Any) -> None:
+        """Hand an item to the event loop."""
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
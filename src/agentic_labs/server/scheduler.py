@@ -0,0 +1,207 @@
+"""Decode-slot scheduler for the local LLM server.
+
+llama-cpp-python's server serializes every completion behind one global lock. The
+`SlotScheduler` instead hands out `N` decode slots, each backed by its own model
+replica, so up to `N` requests decode in parallel. Requests that arrive while all
+slots are busy wait in a bounded admission queue. Higher-priority requests (such as
+interactive sessions) are admitted before lower-priority ones (such as batch
+evaluations); within a priority, the queue is served round-robin across clients,
+so one busy client cannot starve the others.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass
+
+# Request priority classes; lower values are admitted first.
+PRIORITIES = {"interactive": 0, "batch": 1}
+DEFAULT_PRIORITY = "interactive"
+
+# --------------------------------------------------------------------------------------
+# Errors
+# --------------------------------------------------------------------------------------
+
+
+class SchedulerBusyError(Exception):
+    """Raised when a request cannot be admitted; maps to HTTP 429."""
+
+    def __init__(self, message: str, retry_after: float) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# --------------------------------------------------------------------------------------
+# Scheduler Statistics
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class SchedulerStats:
+    """Admission statistics for the scheduler."""
+
+    admitted: int = 0
+    rejected_queue_full: int = 0
+    rejected_timeout: int = 0
+    total_queue_wait_seconds: float = 0.0
+    max_queue_wait_seconds: float = 0.0
+
+
+# --------------------------------------------------------------------------------------
+# Slot Scheduler
+# --------------------------------------------------------------------------------------
+
+
+class SlotScheduler:
+    """Admit requests to a fixed number of decode slots by priority, then fairly.
+
+    Args:
+        slots: Number of requests that may decode at the same time.
+        max_queue: Maximum number of requests waiting for a slot. Requests beyond
+            this are rejected immediately.
+        max_wait_seconds: Maximum time a request may wait for a slot before it is
+            rejected.
+    """
+
+    def __init__(self, slots: int, max_queue: int, max_wait_seconds: float) -> None:
+        if slots < 1:
+            raise ValueError("The scheduler needs at least one slot.")
+
+        self.slots = slots
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+
+        self._free: list[int] = list(reversed(range(slots)))
+        self._waiting: dict[int, OrderedDict[str, deque[asyncio.Future[int]]]] = {
+            priority: OrderedDict() for priority in sorted(PRIORITIES.values())
+        }
+        self._queued = 0
+        self._stats = SchedulerStats()
+
+    # ----------------------------------------------------------------------------------
+    # Admission
+    # ----------------------------------------------------------------------------------
+
+    async def acquire(
+        self, client_id: str, priority: int = PRIORITIES[DEFAULT_PRIORITY]
+    ) -> int:
+        """Wait for a free decode slot and return its index.
+
+        Raises:
+            SchedulerBusyError: The queue is full or the wait exceeded the limit.
+        """
+        start = time.perf_counter()
+
+        if self._free and not self._queued:
+            return self._admit(self._free.pop(), start)
+
+        if self._queued >= self.max_queue:
+            self._stats.rejected_queue_full += 1
+            raise SchedulerBusyError(
+                f"Server is busy: {self._queued} requests are already queued.",
+                retry_after=self.max_wait_seconds,
+            )
+
+        future: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        waiting = self._waiting[priority]
+        waiting.setdefault(client_id, deque()).append(future)
+        self._queued += 1
+
+        try:
+            await asyncio.wait({future}, timeout=self.max_wait_seconds)
+        except asyncio.CancelledError:
+            # The client went away; give back a slot handed over in the meantime.
+            if future.done() and not future.cancelled():
+                self.release(future.result())
+            else:
+                self._withdraw(waiting, client_id, future)
+            raise
+
+        if not future.done():
+            self._withdraw(waiting, client_id, future)
+            self._stats.rejected_timeout += 1
+            raise SchedulerBusyError(
+                f"Timed out after waiting {self.max_wait_seconds:g}s for a free slot.",
+                retry_after=self.max_wait_seconds,
+            )
+
+        return self._admit(future.result(), start)
+
+    def release(self, slot: int) -> None:
+        """Return a slot and hand it to the next client in priority order.
+
+        Within a priority, clients take turns in round-robin order.
+        """
+        for waiting in self._waiting.values():
+            while waiting:
+                client_id, queue = next(iter(waiting.items()))
+                future = queue.popleft()
+                self._queued -= 1
+
+                if queue:
+                    waiting.move_to_end(client_id)
+                else:
+                    del waiting[client_id]
+
+                if not future.done():
+                    future.set_result(slot)
+                    return
+
+        self._free.append(slot)
+
+    # ----------------------------------------------------------------------------------
+    # Statistics
+    # ----------------------------------------------------------------------------------
+
+    @property
+    def in_flight(self) -> int:
+        """Number of slots currently decoding."""
+        return self.slots - len(self._free)
+
+    @property
+    def queued(self) -> int:
+        """Number of requests waiting for a slot."""
+        return self._queued
+
+    def stats(self) -> dict:
+        """Return slot usage, queue depth, and admission counters."""
+        return asdict(self._stats) | {
+            "slots": self.slots,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "queued_by_priority": {
+                name: sum(len(queue) for queue in self._waiting[priority].values())
+                for name, priority in PRIORITIES.items()
+            },
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait_seconds,
+        }
+
+    # ----------------------------------------------------------------------------------
+    # Helpers
+    # ----------------------------------------------------------------------------------
+
+    def _admit(self, slot: int, start: float) -> int:
+        """Record an admission and return the slot."""
+        waited = time.perf_counter() - start
+        self._stats.admitted += 1
+        self._stats.total_queue_wait_seconds += waited
+        self._stats.max_queue_wait_seconds = max(
+            self._stats.max_queue_wait_seconds, waited
+        )
+        return slot
+
+    def _withdraw(
+        self,
+        waiting: OrderedDict[str, deque[asyncio.Future[int]]],
+        client_id: str,
+        future: asyncio.Future[int],
+    ) -> None:
+        """Remove a waiting request that timed out or was cancelled."""
+        future.cancel()
+        queue = waiting.get(client_id)
+        if queue is not None and future in queue:
+            queue.remove(future)
+            self._queued -= 1
+            if not queue:
+                del waiting[client_id]
@@ -0,0 +1,111 @@
+"""Speculative decoding with a small draft model for the local LLM server.
+
+llama-cpp-python verifies draft tokens proposed by a `LlamaDraftModel`, but only
+ships a prompt-lookup drafter. `SmallModelDraft` proposes tokens with a second,
+smaller GGUF model (for example, a 1B Llama drafting for a 3B Llama with the same
+vocabulary). The served model checks all draft tokens in one batch and keeps the
+ones it agrees with, so every accepted token saves a full decode step.
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from llama_cpp import Llama
+from llama_cpp.llama_speculative import LlamaDraftModel
+
+# --------------------------------------------------------------------------------------
+# Draft Statistics
+# --------------------------------------------------------------------------------------
+
+
+@dataclass
+class DraftStats:
+    """Counts of drafted and accepted tokens."""
+
+    drafted_tokens: int = 0
+    accepted_tokens: int = 0
+
+    @property
+    def acceptance_rate(self) -> float:
+        """Fraction of drafted tokens accepted by the served model."""
+        if not self.drafted_tokens:
+            return 0.0
+        return self.accepted_tokens / self.drafted_tokens
+
+    def as_dict(self) -> dict:
+        """Return the counts and acceptance rate as a dictionary."""
+        return asdict(self) | {"acceptance_rate": self.acceptance_rate}
+
+
+# --------------------------------------------------------------------------------------
+# Small Model Draft
+# --------------------------------------------------------------------------------------
+
+
+class SmallModelDraft(LlamaDraftModel):
+    """Draft tokens greedily with a smaller model sharing the served vocabulary.
+
+    Args:
+        llama: The loaded draft model.
+        num_draft_tokens: Number of tokens proposed per decode step.
+    """
+
+    def __init__(self, llama: Llama, num_draft_tokens: int) -> None:
+        self.llama = llama
+        self.num_draft_tokens = num_draft_tokens
+
+        self.request_stats = DraftStats()
+        self.total_stats = DraftStats()
+        self._lock = threading.Lock()
+        self._last_input: npt.NDArray[np.intc] = np.array([], dtype=np.intc)
+        self._last_draft: npt.NDArray[np.intc] = np.array([], dtype=np.intc)
+
+    def __call__(
+        self, input_ids: npt.NDArray[np.intc], /, **kwargs: Any
+    ) -> npt.NDArray[np.intc]:
+        """Return up to `num_draft_tokens` tokens continuing `input_ids`."""
+        self._record_acceptance(input_ids)
+
+        draft: list[int] = []
+        # `generate` reuses the draft model's KV cache for the shared prefix.
+        for token in self.llama.generate(input_ids.tolist(), top_k=1, temp=0.0):
+            if token == self.llama.token_eos():
+                break
+            draft.append(token)
+            if len(draft) >= self.num_draft_tokens:
+                break
+
+        self._last_input = input_ids.copy()
+        self._last_draft = np.array(draft, dtype=np.intc)
+        return self._last_draft
+
+    def reset_request_stats(self) -> None:
+        """Start counting acceptance for a new request."""
+        with self._lock:
+            self.request_stats = DraftStats()
+            self._last_draft = np.array([], dtype=np.intc)
+
+    def _record_acceptance(self, input_ids: npt.NDArray[np.intc]) -> None:
+        """Count how many of the previous draft tokens the served model kept.
+
+        The served model calls the drafter again with its accepted tokens appended,
+        so the previous draft's accepted length is its common prefix with the new
+        tail of `input_ids`.
+        """
+        n_last = len(self._last_input)
+        if not len(self._last_draft) or len(input_ids) <= n_last:
+            return
+        if not np.array_equal(input_ids[:n_last], self._last_input):
+            return  # A new sequence, not a continuation of the last draft.
+
+        appended = input_ids[n_last : n_last + len(self._last_draft)]
+        matches = appended == self._last_draft[: len(appended)]
+        accepted = len(matches) if matches.all() else int(np.argmin(matches))
+
+        with self._lock:
+            for stats in (self.request_stats, self.total_stats):
+                stats.drafted_tokens += len(self._last_draft)
+                stats.accepted_tokens += accepted
@@ -0,0 +1,56 @@
+"""Tests for `agentic_labs.cli.main`."""
+
+import ast
+import importlib.util
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from agentic_labs.cli.main import COMMANDS
+
+
+def command_docstring(import_path: str) -> str:
+    """Read a command function's docstring without importing its module."""
+    module_name, function_name = import_path.split(":")
+    source = Path(importlib.util.find_spec(module_name).origin).read_text()
+    function = next(
+        node
+        for node in ast.parse(source).body
+        if isinstance(node, ast.FunctionDef) and node.name == function_name
+    )
+    return ast.get_docstring(function)
+
+
+@pytest.mark.parametrize("name", COMMANDS)
+def test_registry_help_matches_command_docstring(name):
+    lazy = COMMANDS[name]
+    summary = command_docstring(lazy.import_path).split("\n\n")[0]
+
+    assert lazy.help == " ".join(summary.split())
+
+
+def test_help_does_not_import_commands():
+    modules = [lazy.import_path.split(":")[0] for lazy in COMMANDS.values()]
+    code = (
+        "import sys\n"
+        "from agentic_labs.cli.main import cli\n"
+        "try:\n"
+        "    cli(['--help'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        f"print([m for m in {modules!r} if m in sys.modules])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+
+    assert result.stdout.splitlines()[-1] == "[]"
+    for name in COMMANDS:
+        assert name in result.stdout
@@ -0,0 +1,32 @@
+"""Fixtures for the database agent tooling tests."""
+
+import sqlite3
+
+import pytest
+
+from agentic_labs.db_agent.pool import ConnectionPool
+
+NUM_ITEMS = 250
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """A database with an `items` table of `NUM_ITEMS` rows (ids 1..NUM_ITEMS)."""
+    path = tmp_path / "items.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, qty INTEGER)"
+        )
+        conn.executemany(
+            "INSERT INTO items VALUES (?, ?, ?)",
+            [(i, f"item {i}", i % 7) for i in range(1, NUM_ITEMS + 1)],
+        )
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path)
+    yield pool
+    pool.close()
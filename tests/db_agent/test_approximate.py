@@ -0,0 +1,80 @@
+"""Tests for `agentic_labs.db_agent.approximate`."""
+
+import sqlite3
+
+import pytest
+
+from agentic_labs.db_agent.approximate import (
+    ApproximationError,
+    estimate_aggregate,
+)
+
+# Rowids 1..100_500: 100 full blocks and a last block of 500 rows.
+NUM_ROWS = 100_500
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / "sales.db")
+    conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY, amount INTEGER)")
+    conn.execute(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+        f"WHERE i < {NUM_ROWS}) INSERT INTO sales SELECT i, i % 10 FROM n"
+    )
+    yield conn
+    conn.close()
+
+
+def exact(conn: sqlite3.Connection, sql: str) -> float:
+    return conn.execute(sql).fetchone()[0]
+
+
+def test_full_sample_is_exact(conn):
+    result = estimate_aggregate(conn, "sales", "avg", "amount", sample_fraction=1)
+
+    assert result["exact"]
+    assert result["estimate"] == exact(conn, "SELECT AVG(amount) FROM sales")
+
+
+def test_partial_last_block_is_counted_as_is(conn):
+    result = estimate_aggregate(conn, "sales", "count")
+
+    assert not result["exact"]
+    assert result["estimate"] == NUM_ROWS
+    assert result["ci_low"] <= NUM_ROWS <= result["ci_high"]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_interval_covers_count_with_rowid_gaps(conn, seed):
+    # A run of deleted rows that most samples miss entirely.
+    conn.execute("DELETE FROM sales WHERE id BETWEEN 50001 AND 51000")
+    truth = exact(conn, "SELECT COUNT(*) FROM sales")
+
+    result = estimate_aggregate(conn, "sales", "count", seed=seed)
+
+    assert result["ci_low"] <= truth <= result["ci_high"]
+    assert result["ci_low"] < result["ci_high"]
+
+
+@pytest.mark.parametrize("aggregate", ["count", "sum", "avg"])
+def test_interval_covers_aggregates_with_scattered_gaps(conn, aggregate):
+    conn.execute("DELETE FROM sales WHERE id % 7 = 0 OR id % 11 = 0")
+    truth = exact(conn, f"SELECT {aggregate.upper()}(amount) FROM sales")
+
+    result = estimate_aggregate(conn, "sales", aggregate, "amount", 0.3)
+
+    assert result["ci_low"] <= truth <= result["ci_high"]
+
+
+def test_agreeing_sum_blocks_warn(conn):
+    result = estimate_aggregate(conn, "sales", "sum", "1")
+
+    assert result["estimate"] == NUM_ROWS
+    assert "warnings" in result
+
+
+def test_invalid_arguments(conn):
+    with pytest.raises(ApproximationError):
+        estimate_aggregate(conn, "sales", "sum")
+    with pytest.raises(ApproximationError):
+        estimate_aggregate(conn, "no_such_table", "count")
@@ -0,0 +1,46 @@
+"""Tests for `agentic_labs.db_agent.guard`."""
+
+import sqlite3
+
+import pytest
+
+from agentic_labs.db_agent.guard import full_scans
+
+SQL = "SELECT * FROM items i WHERE qty = 3"
+
+
+class PlanConnection(sqlite3.Connection):
+    """A connection whose query plans are the given `details` lines."""
+
+    details: list[str] = []
+
+    def execute(self, sql, *args):
+        if sql.startswith("EXPLAIN QUERY PLAN"):
+            return [(0, 0, 0, detail) for detail in self.details]
+        return super().execute(sql, *args)
+
+
+def test_full_scan_of_aliased_table(db_path):
+    with sqlite3.connect(db_path) as conn:
+        assert full_scans(conn, SQL) == [("items", 250)]
+    conn.close()
+
+
+@pytest.mark.parametrize(
+    ("detail", "scanned"),
+    [
+        ("SCAN i", True),
+        ("SCAN items", True),
+        ("SCAN i USING COVERING INDEX items_qty", False),
+        # SQLite before 3.36.
+        ("SCAN TABLE items AS i", True),
+        ("SCAN TABLE items", True),
+        ("SCAN TABLE items AS i USING COVERING INDEX items_qty", False),
+    ],
+)
+def test_plan_formats(db_path, monkeypatch, detail, scanned):
+    monkeypatch.setattr(PlanConnection, "details", [detail])
+    conn = sqlite3.connect(db_path, factory=PlanConnection)
+
+    assert full_scans(conn, SQL) == ([("items", 250)] if scanned else [])
+    conn.close()
@@ -0,0 +1,45 @@
+"""Tests for `agentic_labs.db_agent.plan_cache`."""
+
+import pytest
+
+from agentic_labs.db_agent.plan_cache import MAX_QUERIES, PlanCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PlanCache(tmp_path)
+    yield cache
+    cache.close()
+
+
+def test_question_is_normalized(cache):
+    cache.put("How many products?", "v1", ["SELECT COUNT(*) FROM products"])
+
+    assert cache.get("  how MANY products ", "v1") == ["SELECT COUNT(*) FROM products"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_put_replaces_earlier_queries(cache):
+    cache.put("q", "v1", ["SELECT 1"])
+    cache.put("q", "v1", [f"SELECT {i}" for i in range(2, 10)])
+
+    assert cache.get("q", "v1") == [f"SELECT {i}" for i in range(2, 2 + MAX_QUERIES)]
+
+
+def test_entry_for_another_schema_is_dropped(cache):
+    cache.put("q", "v1", ["SELECT 1"])
+
+    assert cache.get("q", "v2") is None
+    assert cache.get("q", "v1") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = PlanCache(tmp_path, max_entries=2)
+    for question in ("a", "b", "c"):
+        cache.put(question, "v1", ["SELECT 1"])
+
+    assert cache.get("a", "v1") is None
+    assert cache.stats()["entries"] == 2
+    cache.close()
@@ -0,0 +1,42 @@
+"""Tests for `agentic_labs.db_agent.results`."""
+
+import pytest
+
+from agentic_labs.db_agent.results import InvalidCursorError, fetch_page
+
+SQL = "SELECT id, name FROM items ORDER BY id"
+NUM_ITEMS = 250
+
+
+def test_pages_through_all_rows(pool):
+    ids = []
+    cursor = None
+    with pool.connection() as conn:
+        while True:
+            page = fetch_page(conn, SQL, cursor=cursor, max_rows=100)
+            assert page["columns"] == ["id", "name"]
+            assert page["total_rows"] == NUM_ITEMS
+            ids += [row[0] for row in page["rows"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert ids == list(range(1, NUM_ITEMS + 1))
+
+
+def test_cursor_survives_whitespace_changes(pool):
+    with pool.connection() as conn:
+        cursor = fetch_page(conn, SQL, max_rows=10)["next_cursor"]
+        page = fetch_page(conn, f"  {SQL.replace(' ', '   ')} ;", cursor=cursor)
+
+    assert page["rows"][0][0] == 11
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "eyJxIjoiMCIsIm8iOjF9"])
+def test_invalid_cursor(pool, cursor):
+    with pool.connection() as conn, pytest.raises(InvalidCursorError) as raised:
+        fetch_page(conn, SQL, cursor=cursor)
+
+    error = raised.value.to_dict()
+    assert error["error"] == "invalid_cursor"
+    assert error["message"]
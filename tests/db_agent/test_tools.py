@@ -0,0 +1,37 @@
+"""Tests for `agentic_labs.db_agent.tools`."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("pydantic_ai")
+
+from agentic_labs.db_agent import tools as tools_module  # noqa: E402
+from agentic_labs.db_agent.plan_cache import PlanCache  # noqa: E402
+from agentic_labs.db_agent.tools import DatabaseTools  # noqa: E402
+
+
+@pytest.fixture
+def tools(db_path, tmp_path):
+    tools = DatabaseTools(db_path, plan_cache=PlanCache(tmp_path / "plans"))
+    yield tools
+    tools.close()
+
+
+def test_plan_lookups_of_unfinished_runs_are_bounded(tools):
+    # Runs that fail before answering never record their plan.
+    async def start_runs() -> None:
+        for run_id in range(tools_module.MAX_OPEN_RUNS + 10):
+            await tools.plan_instructions(str(run_id), "How many items?")
+
+    asyncio.run(start_runs())
+
+    assert len(tools._run_plans) == tools_module.MAX_OPEN_RUNS
+
+
+def test_query_rejects_statements_other_than_select(tools):
+    with pytest.raises(ValueError):
+        asyncio.run(tools.query("DELETE FROM items"))
+
+    result = asyncio.run(tools.query("SELECT COUNT(*) FROM items"))
+    assert result["rows"] == [[250]]
@@ -0,0 +1,25 @@
+"""Fixtures for the lab agent tests."""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+LABS_DIR = Path(__file__).parents[2] / "labs" / "agent"
+
+
+@pytest.fixture
+def database_agent(tmp_path, monkeypatch):
+    """The database agent lab module, with its plan cache in `tmp_path`."""
+    from agentic_labs.db_agent import tools
+
+    monkeypatch.setenv("OPENAI_API_KEY", "unused")
+    cache_class = tools.PlanCache
+    monkeypatch.setattr(tools, "PlanCache", lambda: cache_class(tmp_path / "plans"))
+    spec = importlib.util.spec_from_file_location(
+        "database_agent", LABS_DIR / "database.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    yield module
+    module.tools.close()
@@ -0,0 +1,100 @@
+"""Tests for the database agent lab, driven by a scripted model."""
+
+import pytest
+
+pytest.importorskip("pydantic_ai")
+
+from pydantic_ai.messages import (  # noqa: E402
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel  # noqa: E402
+
+from agentic_labs.db_agent.schema import schema_fingerprint  # noqa: E402
+
+
+def tool_returns(messages: list[ModelMessage]) -> list[ToolReturnPart]:
+    return [
+        part
+        for message in messages
+        for part in message.parts
+        if isinstance(part, ToolReturnPart)
+    ]
+
+
+def test_invalid_cursor_is_returned_to_the_model(database_agent):
+    def model(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if not tool_returns(messages):
+            return ModelResponse(
+                parts=[
+                    ToolCallPart(
+                        "query_database",
+                        {"sql": "SELECT 1", "cursor": "not a cursor"},
+                    )
+                ]
+            )
+        return ModelResponse(parts=[TextPart("done")])
+
+    result = database_agent.agent.run_sync(
+        "How many products are there?", model=FunctionModel(model)
+    )
+
+    assert result.output == "done"
+    [tool_return] = tool_returns(result.all_messages())
+    assert tool_return.content["error"] == "invalid_cursor"
+    assert tool_return.content["message"]
+
+
+def scripted_model(*rounds: list[dict[str, str]]) -> FunctionModel:
+    """A model that makes one round of `query_database` calls per step, then
+    answers."""
+
+    def model(messages: list[ModelMessage], info: AgentInfo) -> ModelResponse:
+        step = sum(isinstance(message, ModelRequest) for message in messages) - 1
+        if step < len(rounds):
+            return ModelResponse(
+                parts=[ToolCallPart("query_database", args) for args in rounds[step]]
+            )
+        return ModelResponse(parts=[TextPart("done")])
+
+    return FunctionModel(model)
+
+
+def test_plan_records_only_the_queries_the_answer_used(database_agent):
+    question = "How many products are there?"
+    model = scripted_model(
+        [{"sql": "SELECT * FROM products LIMIT 3"}],
+        [
+            {"sql": "SELECT COUNT(*) FROM products"},
+            {"sql": "SELECT COUNT(id) FROM products", "cursor": "not a cursor"},
+        ],
+    )
+
+    database_agent.agent.run_sync(question, model=model)
+
+    # Looked up once, at the start of the run, and recorded once, at the end.
+    cache = database_agent.tools.plan_cache
+    assert cache.stats()["hits"] == 0
+    assert cache.stats()["misses"] == 1
+    with database_agent.tools.pool.connection() as conn:
+        queries = cache.get(question, schema_fingerprint(conn))
+    assert queries == ["SELECT COUNT(*) FROM products"]
+
+
+def test_repeated_question_is_answered_from_the_plan(database_agent):
+    question = "How many products are there?"
+    database_agent.agent.run_sync(
+        question, model=scripted_model([{"sql": "SELECT COUNT(*) FROM products"}])
+    )
+    hits = database_agent.tools.plan_cache.stats()["hits"]
+
+    result = database_agent.agent.run_sync(question, model=scripted_model())
+
+    assert database_agent.tools.plan_cache.stats()["hits"] == hits + 1
+    [request] = [m for m in result.all_messages() if isinstance(m, ModelRequest)]
+    assert "SELECT COUNT(*) FROM products" in request.instructions
+    assert "Result:" in request.instructions
@@ -0,0 +1,45 @@
+"""Fixtures for the sample database tests."""
+
+import datetime
+import sqlite3
+
+import pytest
+
+from agentic_labs.cli.create_database import create_database
+from agentic_labs.sample_db import generate
+
+
+@pytest.fixture(scope="session")
+def small_vocab():
+    """A vocabulary with small pools, which is much faster to build."""
+    return generate.Vocabulary.build(size=50)
+
+
+@pytest.fixture
+def build(tmp_path, monkeypatch, small_vocab):
+    """Return a function that creates a small sample database and opens it.
+
+    Keyword arguments are passed to `create_database`, on top of small row counts.
+    """
+    monkeypatch.setattr(
+        generate.Vocabulary, "build", staticmethod(lambda seed: small_vocab)
+    )
+    path = tmp_path / "sample.db"
+    connections = []
+
+    def build(**options) -> sqlite3.Connection:
+        options = {
+            "num_customers": 40,
+            "num_products": 15,
+            "num_purchases": 400,
+            "until": datetime.datetime(2025, 1, 31),
+            **options,
+        }
+        create_database(path=path, **options)
+        conn = sqlite3.connect(path)
+        connections.append(conn)
+        return conn
+
+    yield build
+    for conn in connections:
+        conn.close()
@@ -0,0 +1,135 @@
+"""Tests for `agentic_labs.cli.create_database` building and appending to databases."""
+
+import datetime
+
+import pytest
+import typer
+
+from agentic_labs.sample_db.search import SEARCH_INDEXES
+
+UNTIL = datetime.datetime(2025, 1, 31)
+
+
+def assert_rollups_match_purchases(conn):
+    (purchases, units) = conn.execute(
+        "SELECT COUNT(*), SUM(qty_purchased) FROM purchases"
+    ).fetchone()
+    assert conn.execute(
+        "SELECT SUM(num_purchases), SUM(units_sold) FROM daily_product_sales"
+    ).fetchone() == (purchases, units)
+    assert conn.execute(
+        "SELECT SUM(num_purchases), SUM(units_purchased) FROM customer_lifetime_value"
+    ).fetchone() == (purchases, units)
+    # Each rollup row agrees with the purchases it summarizes.
+    assert not conn.execute(
+        """
+        SELECT r.purchase_date, r.product_id
+        FROM daily_product_sales r
+        LEFT JOIN (
+            SELECT purchase_date, product_id, COUNT(*) AS n, SUM(qty_purchased) AS u
+            FROM purchases GROUP BY purchase_date, product_id
+        ) p USING (purchase_date, product_id)
+        WHERE p.n IS NOT r.num_purchases OR p.u IS NOT r.units_sold
+        """
+    ).fetchall()
+
+
+def assert_search_indexes_intact(conn):
+    for name in SEARCH_INDEXES:
+        conn.execute(f"INSERT INTO {name}({name}) VALUES ('integrity-check')")
+
+
+def assert_ids_contiguous(conn, counts):
+    for table, count in counts.items():
+        assert conn.execute(
+            f"SELECT COUNT(*), MIN(id), MAX(id) FROM {table}"
+        ).fetchone() == (count, 1, count)
+
+
+def test_build_with_rollups_and_search(build):
+    conn = build(rollups=True, search=True)
+
+    assert_ids_contiguous(conn, {"customers": 40, "products": 15, "purchases": 400})
+    assert_rollups_match_purchases(conn)
+    assert_search_indexes_intact(conn)
+    (first, last) = conn.execute(
+        "SELECT MIN(purchase_date), MAX(purchase_date) FROM purchases"
+    ).fetchone()
+    assert first >= "2023-02-01"
+    assert last <= UNTIL.date().isoformat()
+
+
+def test_build_is_reproducible(build):
+    rows = build().execute("SELECT * FROM purchases ORDER BY id").fetchall()
+
+    assert build().execute("SELECT * FROM purchases ORDER BY id").fetchall() == rows
+
+
+def test_sharded_build_merges_disjoint_ids(build):
+    conn = build(workers=3, num_customers=41, num_purchases=401, rollups=True)
+
+    assert_ids_contiguous(conn, {"customers": 41, "products": 15, "purchases": 401})
+    assert_rollups_match_purchases(conn)
+    # Every shard's purchases reference customers and products of the whole database.
+    assert conn.execute(
+        "SELECT MAX(customer_id), MAX(product_id) FROM purchases"
+    ).fetchone() == (41, 15)
+
+
+def test_append_updates_stock_rollups_and_search(build):
+    stock = dict(
+        build(rollups=True, search=True).execute(
+            "SELECT id, in_stock_qty FROM products"
+        )
+    )
+    conn = build(
+        append=True,
+        num_customers=10,
+        num_purchases=150,
+        until=UNTIL + datetime.timedelta(days=30),
+    )
+
+    assert_ids_contiguous(conn, {"customers": 50, "products": 15, "purchases": 550})
+    assert_rollups_match_purchases(conn)
+    assert_search_indexes_intact(conn)
+    # The appended purchases continue the history from the day after the last one.
+    (first, last) = conn.execute(
+        "SELECT MIN(purchase_date), MAX(purchase_date) FROM purchases WHERE id > 400"
+    ).fetchone()
+    assert first >= "2025-02-01"
+    assert last <= "2025-03-02"
+    # Units sold by the appended purchases are taken out of stock.
+    sold = dict(
+        conn.execute(
+            "SELECT product_id, SUM(qty_purchased) FROM purchases WHERE id > 400 "
+            "GROUP BY product_id"
+        )
+    )
+    assert dict(conn.execute("SELECT id, in_stock_qty FROM products")) == {
+        i: max(qty - sold.get(i, 0), 0) for i, qty in stock.items()
+    }
+    # New customers are searchable.
+    (last_name,) = conn.execute(
+        "SELECT last_name FROM customers WHERE id = 50"
+    ).fetchone()
+    matches = conn.execute(
+        "SELECT rowid FROM customers_search WHERE customers_search MATCH ?",
+        (f'last_name:"{last_name}"',),
+    ).fetchall()
+    assert (50,) in matches
+
+
+def test_append_rejects_overlapping_history(build):
+    conn = build(rollups=True)
+    before = conn.execute("SELECT COUNT(*) FROM purchases").fetchone()
+
+    # The database already has purchases through --until, so nothing is appended.
+    with pytest.raises(typer.Exit):
+        build(append=True, num_customers=5, num_purchases=10)
+
+    assert conn.execute("SELECT COUNT(*) FROM purchases").fetchone() == before
+
+
+def test_append_needs_an_existing_database(build):
+    with pytest.raises(typer.Exit):
+        build(append=True)
@@ -0,0 +1,47 @@
+"""Tests for `agentic_labs.sample_db.export`."""
+
+import csv
+
+import pytest
+
+from agentic_labs.sample_db.export import export_table
+from agentic_labs.sample_db.load import TABLES
+
+ROWS = [(3, 2, 1, f"2025-01-0{i}") for i in range(1, 8)]
+
+
+def test_csv_export_numbers_rows_from_start_id(tmp_path):
+    batches = []
+    path = export_table(
+        tmp_path,
+        "purchases",
+        iter(ROWS),
+        11,
+        "csv",
+        batch_size=3,
+        on_batch=batches.append,
+    )
+
+    with path.open() as f:
+        rows = list(csv.reader(f))
+    assert path.name == "purchases.csv"
+    assert rows[0] == ["id", *TABLES["purchases"]]
+    assert rows[1:] == [[str(i), *map(str, row)] for i, row in enumerate(ROWS, 11)]
+    assert batches == [3, 3, 1]
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_pyarrow_export_round_trips(tmp_path, fmt):
+    pa = pytest.importorskip("pyarrow")
+    path = export_table(tmp_path, "purchases", iter(ROWS), 1, fmt, batch_size=3)
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path)
+    else:
+        with pa.ipc.open_file(path) as reader:
+            table = reader.read_all()
+    assert table.column_names == ["id", *TABLES["purchases"]]
+    assert table.column("id").to_pylist() == list(range(1, 8))
+    assert table.column("qty_purchased").to_pylist() == [1] * 7
@@ -0,0 +1,49 @@
+"""Tests for `agentic_labs.sample_db.generate`."""
+
+import datetime
+from itertools import islice
+
+from agentic_labs.sample_db import generate
+from agentic_labs.sample_db.load import TABLES
+
+TODAY = datetime.date(2025, 1, 31)
+
+
+def test_rows_are_reproducible_per_seed_and_shard(small_vocab):
+    def rows(seed, shard=0):
+        rng = generate.table_rng(seed, "customers", shard)
+        return list(generate.customers(small_vocab, rng, 20, today=TODAY))
+
+    assert rows(1) == rows(1)
+    assert rows(1) != rows(2)
+    assert rows(1) != rows(1, shard=1)
+
+
+def test_rows_match_the_schema(small_vocab):
+    rng = generate.table_rng(1, "products")
+    products = list(generate.products(small_vocab, rng, 30, start_id=101))
+
+    assert all(len(row) == len(TABLES["products"]) for row in products)
+    assert products[0][0].startswith("SKU-000101-")
+    assert len({row[0] for row in products}) == 30
+
+
+def test_purchases_stay_in_range():
+    rng = generate.table_rng(1, "purchases")
+    start = datetime.date(2025, 1, 1)
+    # More than one chunk, so chunk boundaries are covered.
+    rows = list(generate.purchases(rng, generate.CHUNK_ROWS + 10, 9, 4, start, TODAY))
+
+    assert len(rows) == generate.CHUNK_ROWS + 10
+    customer_ids, product_ids, quantities, dates = zip(*rows, strict=True)
+    assert set(customer_ids) == set(range(1, 10))
+    assert set(product_ids) == set(range(1, 5))
+    assert set(quantities) == set(range(1, 6))
+    assert min(dates) == "2025-01-01" and max(dates) == "2025-01-31"
+
+
+def test_customers_are_generated_lazily(small_vocab):
+    rng = generate.table_rng(1, "customers")
+    first = next(islice(generate.customers(small_vocab, rng, 10**9, today=TODAY), 1))
+
+    assert len(first) == len(TABLES["customers"])
@@ -0,0 +1,54 @@
+"""Tests for `agentic_labs.sample_db.shards`."""
+
+import datetime
+import sqlite3
+
+from agentic_labs.sample_db.load import SCHEMA, TABLES
+from agentic_labs.sample_db.shards import merge_shard, plan_shards, write_shard
+
+TODAY = datetime.date(2025, 1, 31)
+
+
+def plan(num_shards):
+    return plan_shards(
+        23, 7, 101, num_shards, seed=1, today=TODAY, purchases_from=TODAY.replace(day=1)
+    )
+
+
+def test_shards_split_ids_into_consecutive_ranges():
+    shards = plan(4)
+
+    for table, total in (("customers", 23), ("products", 7), ("purchases", 101)):
+        ranges = [getattr(shard, table) for shard in shards]
+        assert [r.start for r in ranges] == [
+            1 + sum(r.count for r in ranges[:i]) for i in range(4)
+        ]
+        assert sum(r.count for r in ranges) == total
+        assert max(r.count for r in ranges) - min(r.count for r in ranges) <= 1
+
+
+def test_merged_shards_form_one_database(tmp_path, small_vocab):
+    conn = sqlite3.connect(tmp_path / "merged.db")
+    conn.executescript(SCHEMA)
+    for shard in plan(3):
+        merge_shard(
+            conn, write_shard(tmp_path / f"{shard.index}.db", shard, small_vocab)
+        )
+
+    for table, count in (("customers", 23), ("products", 7), ("purchases", 101)):
+        ids = [
+            row_id for (row_id,) in conn.execute(f"SELECT id FROM {table} ORDER BY id")
+        ]
+        assert ids == list(range(1, count + 1))
+    assert conn.execute(
+        "SELECT MIN(purchase_date) >= '2025-01-01', MAX(purchase_date) <= '2025-01-31', "
+        "MAX(customer_id) <= 23, MAX(product_id) <= 7 FROM purchases"
+    ).fetchone() == (1, 1, 1, 1)
+    assert conn.execute("SELECT COUNT(DISTINCT sku) FROM products").fetchone() == (7,)
+    conn.close()
+
+
+def test_shard_rows_have_the_tables_columns(small_vocab):
+    for table, ids, rows in plan(1)[0].tables(small_vocab):
+        assert all(len(row) == len(TABLES[table]) for row in rows)
+        assert ids.count > 0
@@ -0,0 +1,83 @@
+"""Tests for `agentic_labs.server.autotune`."""
+
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from llama_cpp.server.model import LlamaProxy  # noqa: E402
+from llama_cpp.server.settings import ModelSettings  # noqa: E402
+
+from agentic_labs.server import autotune  # noqa: E402
+from agentic_labs.server.autotune import RuntimeProfile, benchmark  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeLlama:
+    """Stands in for `llama_cpp.Llama`; each generation takes its own time per token.
+
+    A generation starts with `reset`; `seconds_per_token[i]` is the time per token
+    of the i-th generation.
+    """
+
+    def __init__(self, clock: FakeClock, seconds_per_token: list[float]) -> None:
+        self.clock = clock
+        self.seconds_per_token = seconds_per_token
+        self.generations = 0
+
+    def tokenize(self, text: bytes) -> list[int]:
+        return list(range(len(text.split())))
+
+    def reset(self) -> None:
+        self.generations += 1
+
+    def eval(self, tokens: list[int]) -> None:
+        self.clock.now += len(tokens) * self.seconds_per_token[self.generations - 1]
+
+    def sample(self, top_k: int) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def load(tmp_path, monkeypatch):
+    """Make model loads return a `FakeLlama` with the given per-token times."""
+    clock = FakeClock()
+    monkeypatch.setattr(autotune.time, "perf_counter", clock)
+
+    def load(seconds_per_token: list[float]) -> ModelSettings:
+        llama = FakeLlama(clock, seconds_per_token)
+        monkeypatch.setattr(
+            LlamaProxy, "load_llama_from_model_settings", staticmethod(lambda _: llama)
+        )
+        path = tmp_path / "model.gguf"
+        path.write_bytes(b"")
+        return ModelSettings(model=str(path), n_ctx=4096)
+
+    return load
+
+
+def test_benchmark_skips_warm_up_and_keeps_median(load):
+    # A slow first (warm-up) generation, then timed runs at 1, 4 and 2 s/token.
+    settings = load([100.0, 1.0, 4.0, 2.0])
+
+    result = benchmark(settings, RuntimeProfile(n_threads=1, n_threads_batch=1))
+
+    assert result.prefill_tokens_per_second == pytest.approx(0.5)
+    assert result.decode_tokens_per_second == pytest.approx(0.5)
+
+
+def test_benchmark_warms_up_once_then_times_each_run(load):
+    settings = load([1.0] * 6)
+
+    benchmark(settings, RuntimeProfile(n_threads=1, n_threads_batch=1), runs=5)
+
+    assert LlamaProxy.load_llama_from_model_settings(settings).generations == 6
@@ -0,0 +1,50 @@
+"""Tests for `agentic_labs.server.metrics`."""
+
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from agentic_labs.server.metrics import ServerMetrics  # noqa: E402
+
+
+def rendered(metrics: ServerMetrics) -> str:
+    return "\n".join(
+        [
+            *metrics.time_to_first_token.render(),
+            *metrics.prompt_tokens.render(),
+            *metrics.completion_tokens.render(),
+        ]
+    )
+
+
+def test_non_streamed_request_records_time_to_response():
+    metrics = ServerMetrics()
+    recorder = metrics.request("m", time.perf_counter())
+
+    recorder.finish({"usage": {"prompt_tokens": 7, "completion_tokens": 3}})
+
+    text = rendered(metrics)
+    assert 'time_to_first_token_seconds_count{model="m"} 1' in text
+    assert 'prompt_tokens_total{model="m"} 7.0' in text
+    assert 'completion_tokens_total{model="m"} 3.0' in text
+
+
+def test_streamed_request_counts_the_prompt_it_sampled_from():
+    metrics = ServerMetrics()
+    recorder = metrics.request("m", time.perf_counter())
+    scores = np.zeros(4, dtype=np.single)
+
+    # The prompt has 5 tokens; later calls see the generated tokens too.
+    recorder.count_prompt(np.arange(5, dtype=np.intc), scores)
+    recorder.chunk({"choices": [{"text": "a"}]})
+    recorder.count_prompt(np.arange(6, dtype=np.intc), scores)
+    recorder.chunk({"choices": [{"text": "b"}]})
+    recorder.finish(None)
+
+    text = rendered(metrics)
+    assert 'prompt_tokens_total{model="m"} 5.0' in text
+    assert 'completion_tokens_total{model="m"} 2.0' in text
+    assert 'time_to_first_token_seconds_count{model="m"} 1' in text
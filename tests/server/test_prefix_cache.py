@@ -0,0 +1,130 @@
+"""Tests for `agentic_labs.server.prefix_cache`."""
+
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from llama_cpp.llama import LlamaState  # noqa: E402
+
+from agentic_labs.server import prefix_cache  # noqa: E402
+from agentic_labs.server.prefix_cache import TieredPrefixCache  # noqa: E402
+
+
+def make_state(tokens: tuple[int, ...]) -> LlamaState:
+    return LlamaState(
+        input_ids=np.array(tokens, dtype=np.intc),
+        scores=np.zeros((len(tokens), 1), dtype=np.single),
+        n_tokens=len(tokens),
+        llama_state=b"\0" * 100,
+        llama_state_size=100,
+        seed=0,
+    )
+
+
+def test_returns_state_with_longest_prefix(tmp_path):
+    cache = TieredPrefixCache("model", cache_dir=tmp_path)
+    cache[(1, 2)] = make_state((1, 2))
+    cache[(1, 2, 3, 4)] = make_state((1, 2, 3, 4))
+
+    state = cache[(1, 2, 3, 9)]
+
+    assert state.n_tokens == 4
+    assert cache.stats()["prefix_tokens_matched"] == 3
+    with pytest.raises(KeyError):
+        cache[(7,)]
+
+
+def test_reused_state_survives_restart(tmp_path):
+    cache = TieredPrefixCache("model", cache_dir=tmp_path)
+    cache[(1, 2, 3)] = make_state((1, 2, 3))
+    cache[(1, 2, 3)]
+    cache.flush()
+
+    restarted = TieredPrefixCache("model", cache_dir=tmp_path)
+
+    assert restarted.stats()["disk_entries"] == 1
+    assert restarted[(1, 2, 3, 4)].n_tokens == 3
+
+
+def test_disk_write_does_not_hold_the_lock(tmp_path, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+    dump = prefix_cache.pickle.dump
+
+    def slow_dump(*args, **kwargs):
+        started.set()
+        release.wait(timeout=10)
+        dump(*args, **kwargs)
+
+    monkeypatch.setattr(prefix_cache.pickle, "dump", slow_dump)
+    cache = TieredPrefixCache("model", cache_dir=tmp_path)
+    cache[(1, 2, 3)] = make_state((1, 2, 3))
+    cache[(1, 2, 3)]
+    assert started.wait(timeout=10)
+
+    # Lookups and stores proceed while the state is being written.
+    cache[(4, 5)] = make_state((4, 5))
+    assert cache[(1, 2, 3)].n_tokens == 3
+    assert cache.stats()["disk_entries"] == 0
+
+    release.set()
+    cache.flush()
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_disk_read_does_not_hold_the_lock(tmp_path, monkeypatch):
+    cache = TieredPrefixCache("model", cache_dir=tmp_path)
+    cache[(1, 2, 3)] = make_state((1, 2, 3))
+    cache[(1, 2, 3)]
+    cache.flush()
+
+    started, release = threading.Event(), threading.Event()
+    load = prefix_cache.pickle.load
+
+    def slow_load(*args, **kwargs):
+        started.set()
+        release.wait(timeout=10)
+        return load(*args, **kwargs)
+
+    monkeypatch.setattr(prefix_cache.pickle, "load", slow_load)
+    restarted = TieredPrefixCache("model", cache_dir=tmp_path)
+    reader = threading.Thread(target=lambda: restarted[(1, 2, 3)])
+    reader.start()
+    assert started.wait(timeout=10)
+
+    # Lookups and stores proceed while the state is being read.
+    restarted[(4, 5)] = make_state((4, 5))
+    assert restarted[(4, 5)].n_tokens == 2
+
+    release.set()
+    reader.join(timeout=10)
+    assert restarted.stats()["ram_entries"] == 2
+
+
+def test_ram_tier_counts_saved_logits(tmp_path):
+    cache = TieredPrefixCache("model", cache_dir=None)
+    state = make_state((1, 2, 3))
+
+    cache[(1, 2, 3)] = state
+
+    assert cache.cache_size == (100 + state.scores.nbytes + state.input_ids.nbytes)
+
+
+def test_interrupted_writes_are_cleaned_up_on_open(tmp_path):
+    cache = TieredPrefixCache("model", cache_dir=tmp_path)
+    cache[(1, 2, 3)] = make_state((1, 2, 3))
+    cache[(1, 2, 3)]
+    cache.flush()
+    model_dir = next(tmp_path.iterdir())
+    (model_dir / "orphan.state").write_bytes(b"\0")
+    (model_dir / "orphan.state.tmp").write_bytes(b"\0")
+
+    restarted = TieredPrefixCache("model", cache_dir=tmp_path)
+
+    assert restarted.stats()["disk_entries"] == 1
+    assert sorted(path.suffix for path in model_dir.iterdir()) == [
+        ".state",
+        ".tokens",
+    ]
@@ -0,0 +1,151 @@
+"""Tests for `agentic_labs.server.residency`."""
+
+import threading
+
+import pytest
+
+pytest.importorskip("llama_cpp")
+
+from llama_cpp.server.model import LlamaProxy  # noqa: E402
+from llama_cpp.server.settings import ModelSettings  # noqa: E402
+
+from agentic_labs.server import residency  # noqa: E402
+from agentic_labs.server.residency import ResidentModelPool  # noqa: E402
+
+# One layer, one 64-wide head: 2 x 1 x n_ctx x 1 x 64 x 2 bytes of KV cache.
+METADATA = {
+    "general.architecture": "llama",
+    "llama.block_count": "1",
+    "llama.embedding_length": "64",
+    "llama.attention.head_count": "1",
+}
+VOCAB_SIZE = 32
+
+
+class FakeLlama:
+    """Stands in for `llama_cpp.Llama`; only what the pool touches."""
+
+    def __init__(self, n_ctx: int) -> None:
+        self.metadata = METADATA
+        self.closed = False
+        self._n_ctx = n_ctx
+
+    def n_ctx(self) -> int:
+        return self._n_ctx
+
+    def n_vocab(self) -> int:
+        return VOCAB_SIZE
+
+    def set_cache(self, cache: object) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture
+def model_settings(tmp_path, monkeypatch):
+    def make(alias: str, n_ctx: int = 4096, **kwargs) -> ModelSettings:
+        path = tmp_path / f"{alias}.gguf"
+        path.write_bytes(b"\0" * 1_000)
+        return ModelSettings(model=str(path), model_alias=alias, n_ctx=n_ctx, **kwargs)
+
+    monkeypatch.setattr(
+        LlamaProxy,
+        "load_llama_from_model_settings",
+        staticmethod(lambda settings: FakeLlama(settings.n_ctx)),
+    )
+    return make
+
+
+def test_model_larger_than_budget_is_not_evicted_on_load(model_settings):
+    # The KV cache (1 MiB at 4096 context) is only known after the load and
+    # alone exceeds the budget.
+    pool = ResidentModelPool([model_settings("big")], memory_budget_bytes=10_000)
+
+    llama = pool.checkout("big", 0)
+
+    assert not llama.closed
+    assert pool.resident_models() == {("big", 0): llama}
+    pool.checkin("big", 0)
+
+
+def test_load_evicts_least_recently_used_idle_replica(model_settings):
+    settings = [model_settings("a", n_ctx=16), model_settings("b", n_ctx=16)]
+    kv_bytes = residency.estimate_kv_cache_bytes(FakeLlama(16))
+    pool = ResidentModelPool(settings, memory_budget_bytes=1_000 + kv_bytes + 500)
+
+    first = pool("a")
+    second = pool("b")
+
+    assert first.closed
+    assert not second.closed
+    assert list(pool.resident_models()) == [("b", 0)]
+
+
+def test_footprint_counts_logits_of_models_verified_by_a_draft(model_settings):
+    # The draft model forces logits_all on the target model, which then keeps
+    # the logits of every position.
+    pool = ResidentModelPool(
+        [model_settings("target", n_ctx=16)],
+        draft_settings=model_settings("draft", n_ctx=16),
+    )
+
+    llama = pool("target")
+
+    kv_bytes = residency.estimate_kv_cache_bytes(llama)
+    logits_bytes = 16 * VOCAB_SIZE * residency.LOGITS_ELEMENT_BYTES
+    draft_bytes = 1_000 + kv_bytes
+    assert pool.stats()["target"]["logits_bytes"] == logits_bytes
+    assert pool.resident_bytes("target") == (
+        1_000 + kv_bytes + logits_bytes + draft_bytes
+    )
+
+
+def test_offloaded_weights_are_counted_per_replica(model_settings):
+    # Every replica uploads its own copy of the offloaded layers to VRAM, even
+    # though the weights file is memory-mapped.
+    pool = ResidentModelPool(
+        [model_settings("gpu", n_ctx=16, n_gpu_layers=-1, logits_all=False)]
+    )
+
+    llama = pool.checkout("gpu", 0)
+    pool.checkout("gpu", 1)
+
+    kv_bytes = residency.estimate_kv_cache_bytes(llama)
+    assert pool.resident_bytes("gpu") == 2 * (1_000 + kv_bytes)
+
+
+def test_load_does_not_hold_the_lock(model_settings, monkeypatch):
+    loading = threading.Event()
+    finish_load = threading.Event()
+
+    def slow_load(settings: ModelSettings) -> FakeLlama:
+        loading.set()
+        finish_load.wait()
+        return FakeLlama(settings.n_ctx)
+
+    monkeypatch.setattr(
+        LlamaProxy, "load_llama_from_model_settings", staticmethod(slow_load)
+    )
+    pool = ResidentModelPool([model_settings("cold", n_ctx=16)])
+    replicas = []
+    loaders = [
+        threading.Thread(target=lambda: replicas.append(pool.checkout("cold", 0)))
+        for _ in range(2)
+    ]
+    for loader in loaders:
+        loader.start()
+    assert loading.wait(timeout=5)
+
+    # Stats and checkins stay available while the replica loads.
+    reader = threading.Thread(target=pool.stats)
+    reader.start()
+    reader.join(timeout=5)
+    assert not reader.is_alive()
+
+    finish_load.set()
+    for loader in loaders:
+        loader.join(timeout=5)
+    assert replicas[0] is replicas[1]
+    assert pool.stats()["cold"]["loads"] == 1